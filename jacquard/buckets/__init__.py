@@ -1,15 +1,28 @@
 """System for partitioning users into buckets."""
 
+from jacquard.buckets.entry import decode_entry
+from jacquard.buckets.index import BucketIndex, load_index
 from jacquard.buckets.models import Bucket
-from jacquard.buckets.utils import user_bucket, release, close
+from jacquard.buckets.utils import (
+    close,
+    release,
+    rebucket,
+    user_bucket,
+    get_num_buckets,
+)
 from jacquard.buckets.constants import NUM_BUCKETS
 from jacquard.buckets.exceptions import NotEnoughBucketsException
 
 __all__ = (
     "user_bucket",
     "NUM_BUCKETS",
+    "get_num_buckets",
     "Bucket",
+    "BucketIndex",
+    "decode_entry",
+    "load_index",
     "release",
     "close",
+    "rebucket",
     "NotEnoughBucketsException",
 )
@@ -2,10 +2,9 @@
 
 import yaml
 
-from jacquard.commands import BaseCommand
+from jacquard.commands import BaseCommand, CommandError
 from jacquard.constraints import Constraints
-from jacquard.buckets.utils import close, release
-from jacquard.buckets.constants import NUM_BUCKETS
+from jacquard.buckets.utils import close, release, rebucket, get_num_buckets
 
 
 class Rollout(BaseCommand):
@@ -60,13 +59,13 @@ class Rollout(BaseCommand):
         value = yaml.safe_load(options.value)
         settings = {options.setting: value}
 
-        buckets_per_percent = NUM_BUCKETS // 100
+        with config.storage.transaction() as store:
+            buckets_per_percent = get_num_buckets(store) // 100
 
-        branch_configuration = (
-            ("__ROLLOUT__", buckets_per_percent * options.percent, settings),
-        )
+            branch_configuration = (
+                ("__ROLLOUT__", buckets_per_percent * options.percent, settings),
+            )
 
-        with config.storage.transaction() as store:
             if options.rollback or options.commit:
                 close(store, rollout_key, constraints, branch_configuration)
 
@@ -76,3 +75,28 @@ class Rollout(BaseCommand):
                     store["defaults"] = defaults
             else:
                 release(store, rollout_key, constraints, branch_configuration)
+
+
+class Rebucket(BaseCommand):
+    """
+    Change the number of buckets.
+
+    More buckets allow for finer-grained experiments and rollouts. The new
+    number of buckets must be a multiple of the current number, which keeps
+    every user on the same settings through the change, so the number of
+    buckets can never be reduced.
+    """
+
+    help = "change the number of buckets"
+
+    def add_arguments(self, parser):
+        """Add argparse arguments."""
+        parser.add_argument("num_buckets", type=int, help="new number of buckets")
+
+    def handle(self, config, options):
+        """Run command."""
+        with config.storage.transaction() as store:
+            try:
+                rebucket(store, options.num_buckets)
+            except ValueError as e:
+                raise CommandError(str(e))
@@ -2,4 +2,10 @@
 
 
 # LCM of 2, 3, 4, 5, 6, 10, 100
+#
+# This is the default number of buckets, used for stores which have never
+# been re-bucketed. The number in use for a given store is kept under
+# `NUM_BUCKETS_KEY`; it is always a multiple of this.
 NUM_BUCKETS = 300
+
+NUM_BUCKETS_KEY = "num-buckets"
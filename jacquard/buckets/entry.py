@@ -1,20 +1,42 @@
 """Supporting classes to represent single keys within buckets."""
 
+import types
 import collections
 
 from jacquard.constraints import Constraints
 
 Entry = collections.namedtuple("Entry", ("key", "settings", "constraints"))
 
+# An entry whose settings and constraints are stored separately, as shared
+# documents; see `jacquard.buckets.shared`.
+EntryReference = collections.namedtuple(
+    "EntryReference", ("key", "settings_id", "constraints_id")
+)
+
 
 def decode_entry(json):
-    """Convert from a JSON-representation to an Entry."""
+    """
+    Convert from a JSON-representation to an Entry or EntryReference.
+
+    Entries with their settings and constraints inline are from older
+    versions of Jacquard, and are still supported. Their settings are
+    read-only, since decoded entries are shared between readers.
+    """
     key, settings, constraints = json
+
+    if isinstance(settings, str):
+        return EntryReference(key=key, settings_id=settings, constraints_id=constraints)
+
     return Entry(
-        key=key, settings=settings, constraints=Constraints.from_json(constraints)
+        key=key,
+        settings=types.MappingProxyType(settings),
+        constraints=Constraints.from_json(constraints),
     )
 
 
 def encode_entry(entry):
-    """Convert from an entry to a JSON-representation."""
-    return [entry.key, entry.settings, entry.constraints.to_json()]
+    """Convert from an Entry or EntryReference to a JSON-representation."""
+    if isinstance(entry, EntryReference):
+        return [entry.key, entry.settings_id, entry.constraints_id]
+
+    return [entry.key, dict(entry.settings), entry.constraints.to_json()]
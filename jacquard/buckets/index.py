@@ -0,0 +1,169 @@
+"""Index of the buckets occupied by each key."""
+
+import collections
+
+from jacquard.odm import EMPTY
+from jacquard.constraints import Constraints
+from jacquard.buckets.models import Bucket
+
+BUCKET_INDEX_KEY = "bucket-index"
+
+# Summary of one key's entries: the names of the settings it determines and
+# the constraints under which it does so.
+Summary = collections.namedtuple("Summary", ("key", "settings", "constraints"))
+
+
+class BucketIndex(object):
+    """
+    Mapping from keys to the buckets they occupy.
+
+    Keys are the `[name, branch]` pairs used for entries in buckets. This is
+    kept in storage alongside the buckets themselves and updated by `release`
+    and `close`, so that finding the buckets for a given key does not mean
+    loading every bucket.
+
+    Alongside each key's buckets is a `Summary` of its entries, which is enough
+    to tell whether a bucket is free for a new release without loading it.
+    """
+
+    def __init__(self, entries=()):
+        """Construct from an iterable of (summary, bucket indices) pairs."""
+        self._entries_by_key = {}
+
+        for summary, indices in entries:
+            self.add(summary.key, indices, summary.settings, summary.constraints)
+
+    @classmethod
+    def from_json(cls, description):
+        """Decode from the storage representation."""
+        return cls(
+            (
+                Summary(
+                    key=key,
+                    settings=settings,
+                    constraints=Constraints.from_json(constraints),
+                ),
+                indices,
+            )
+            for key, indices, settings, constraints in description
+        )
+
+    def to_json(self):
+        """Encode into the storage representation."""
+        return [
+            [
+                list(key),
+                sorted(indices),
+                sorted(summary.settings),
+                summary.constraints.to_json(),
+            ]
+            for key, (summary, indices) in sorted(self._entries_by_key.items())
+        ]
+
+    @classmethod
+    def build(cls, session, num_buckets):
+        """Build from scratch by scanning every bucket in a session."""
+        index = cls()
+
+        buckets = session.get_many(Bucket, range(num_buckets), default=EMPTY)
+
+        for bucket in buckets:
+            for entry in bucket.decoded_entries():
+                index.add(entry.key, (bucket.pk,), entry.settings, entry.constraints)
+
+        return index
+
+    def buckets(self, key):
+        """Indices of the buckets occupied by a given key."""
+        try:
+            _, indices = self._entries_by_key[tuple(key)]
+        except KeyError:
+            return frozenset()
+        return indices
+
+    def covers(self, key, bucket_idx):
+        """Whether a given key occupies a given bucket."""
+        return bucket_idx in self.buckets(key)
+
+    def summaries_by_bucket(self):
+        """Map of bucket indices to the summaries of the keys in them."""
+        summaries_by_bucket = {}
+
+        for summary, indices in self._entries_by_key.values():
+            for idx in indices:
+                summaries_by_bucket.setdefault(idx, []).append(summary)
+
+        return summaries_by_bucket
+
+    def add(self, key, bucket_indices, settings, constraints):
+        """
+        Record a key as occupying some (more) buckets.
+
+        `settings` is an iterable of the names of the settings determined by
+        the key, and `constraints` the constraints they apply under.
+        """
+        key = tuple(key)
+        settings = frozenset(settings)
+
+        try:
+            summary, indices = self._entries_by_key[key]
+        except KeyError:
+            indices = frozenset()
+        else:
+            settings |= summary.settings
+
+        self._entries_by_key[key] = (
+            Summary(key=list(key), settings=settings, constraints=constraints),
+            indices | frozenset(bucket_indices),
+        )
+
+    def rebucketed(self, old_num_buckets, new_num_buckets):
+        """
+        Copy of this index after re-bucketing.
+
+        `new_num_buckets` must be a multiple of `old_num_buckets`. Each bucket
+        `idx` in the copy contains the keys in bucket `idx % old_num_buckets`.
+        """
+        factor = new_num_buckets // old_num_buckets
+
+        return type(self)(
+            (
+                summary,
+                [
+                    idx + multiple * old_num_buckets
+                    for idx in indices
+                    for multiple in range(factor)
+                ],
+            )
+            for summary, indices in self._entries_by_key.values()
+        )
+
+    def remove(self, key):
+        """Forget a key entirely, returning the buckets it occupied."""
+        try:
+            _, indices = self._entries_by_key.pop(tuple(key))
+        except KeyError:
+            return frozenset()
+        return indices
+
+
+def load_index(store, session, num_buckets):
+    """
+    Load the bucket index from a store.
+
+    If there is no index in the store - for instance, because the data were
+    written by an older version of Jacquard - one is built by scanning all
+    `num_buckets` buckets through `session`. It is not written back; callers
+    which are making changes should `save_index` themselves.
+    """
+    try:
+        description = store[BUCKET_INDEX_KEY]
+    except KeyError:
+        return BucketIndex.build(session, num_buckets)
+
+    return BucketIndex.from_json(description)
+
+
+def save_index(store, index):
+    """Write the bucket index to a store."""
+    store[BUCKET_INDEX_KEY] = index.to_json()
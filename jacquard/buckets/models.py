@@ -1,16 +1,34 @@
 """The actual Bucket ODM model itself."""
 
+import types
+
 from jacquard.odm import Model, ListField, EncodeDecodeField
-from jacquard.buckets.entry import Entry, decode_entry, encode_entry
+from jacquard.buckets.entry import Entry, decode_entry, encode_entry, EntryReference
+from jacquard.buckets.shared import (
+    load_settings,
+    save_settings,
+    load_constraints,
+    save_constraints,
+)
 
 
 class Bucket(Model):
-    """A single partition of user space, with associated settings."""
+    """
+    A single partition of user space, with associated settings.
+
+    `entries` holds the entries as stored, which generally refer to shared
+    settings and constraints by ID; `decoded_entries` resolves them. Settings
+    in either are read-only mappings.
+    """
 
     entries = ListField(
         null=False,
         field=EncodeDecodeField(
-            encode=encode_entry, decode=decode_entry, null=False, default=[]
+            encode=encode_entry,
+            decode=decode_entry,
+            immutable=True,
+            null=False,
+            default=[],
         ),
         default=(),
     )
@@ -24,11 +42,27 @@ class Bucket(Model):
             return {"entries": data}
         return data
 
+    def decoded_entries(self):
+        """All entries, with their settings and constraints resolved."""
+        return tuple(self._decode_entry(x) for x in self.entries)
+
+    def _decode_entry(self, entry):
+        if not isinstance(entry, EntryReference):
+            return entry
+
+        return Entry(
+            key=entry.key,
+            settings=types.MappingProxyType(
+                load_settings(self.session, entry.settings_id)
+            ),
+            constraints=load_constraints(self.session, entry.constraints_id),
+        )
+
     def get_settings(self, user_entry):
         """Look up settings by user entry."""
         settings = {"__bucket__": self.pk}
 
-        for entry in self.entries:
+        for entry in self.decoded_entries():
             if not entry.constraints or entry.constraints.matches_user(user_entry):
                 settings.update(entry.settings)
 
@@ -41,23 +75,59 @@ class Bucket(Model):
         All settings determined in this bucket, by the constraints that they
         apply under.
         """
-        return {x.constraints: frozenset(x.settings.keys()) for x in self.entries}
+        return {
+            x.constraints: frozenset(x.settings.keys()) for x in self.decoded_entries()
+        }
+
+    def needed_user_attributes(self):
+        """
+        Names of the `UserEntry` attributes needed to get settings.
+
+        Constrained entries whose settings are all overridden by later,
+        unconstrained entries can never affect the result, so are ignored.
+        """
+        unconditional_settings = set()
+        attributes = set()
+
+        for entry in reversed(self.decoded_entries()):
+            if not entry.constraints:
+                unconditional_settings.update(entry.settings.keys())
+            elif not unconditional_settings.issuperset(entry.settings.keys()):
+                attributes.update(entry.constraints.user_attributes())
+
+        return frozenset(attributes)
 
     def needs_constraints(self):
         """Whether any settings in this bucket involve constraint lookups."""
-        return any(x.constraints for x in self.entries)
+        return bool(self.needed_user_attributes())
 
     def add(self, key, settings, constraints):
-        """Add a new, keyed entry."""
-        self.entries = self.entries + (
-            Entry(key=key, settings=settings, constraints=constraints),
-        )
-        self.mark_dirty()
+        """
+        Add a new, keyed entry.
+
+        If this bucket belongs to a session, the settings and constraints are
+        stored as shared documents through it; otherwise they are kept inline.
+        """
+        if self.session is None:
+            entry = Entry(key=key, settings=settings, constraints=constraints)
+        else:
+            entry = EntryReference(
+                key=key,
+                settings_id=save_settings(self.session, settings),
+                constraints_id=save_constraints(self.session, constraints),
+            )
+
+        self.entries = self.entries + (entry,)
 
     def remove(self, key):
-        """Remove any matching, keyed entry."""
-        self.entries = [x for x in self.entries if x.key != key]
-        self.mark_dirty()
+        """Remove any matching, keyed entry, returning the entries removed."""
+        entries = [x for x in self.entries if x.key != key]
+        removed_entries = [x for x in self.entries if x.key == key]
+
+        if removed_entries:
+            self.entries = entries
+
+        return removed_entries
 
     def covers(self, key):
         """Whether a given key is covered under this bucket."""
@@ -0,0 +1,133 @@
+"""
+Settings and constraints shared between bucket entries.
+
+A release puts the same settings and constraints into every bucket it
+selects. Rather than copying them into each bucket, they are stored once, as
+documents keyed by a digest of their contents, and bucket entries refer to
+them by that digest.
+
+Since the documents are content-addressed they never change once written, so
+decoded values can be cached across sessions and transactions. Documents are
+deleted once no bucket entry refers to them, by `delete_unreferenced`.
+"""
+
+import json
+import hashlib
+
+from jacquard.odm import Model, JSONField, EncodeDecodeField
+from jacquard.utils import LRUCache
+from jacquard.constraints import Constraints
+from jacquard.buckets.entry import EntryReference
+
+# Number of decoded shared documents retained in the process-wide cache.
+CACHE_SIZE = 1024
+
+
+def _digest(description):
+    encoded = json.dumps(description, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class SharedSettings(Model):
+    """Settings dict, shared between bucket entries."""
+
+    settings = JSONField(null=False, default={})
+
+
+class SharedConstraints(Model):
+    """Constraints, shared between bucket entries."""
+
+    constraints = EncodeDecodeField(
+        encode=lambda x: x.to_json(),
+        decode=Constraints.from_json,
+        immutable=True,
+        null=False,
+        default=Constraints(),
+    )
+
+
+_CACHE = LRUCache(CACHE_SIZE)
+
+
+def clear_cache():
+    """Drop all cached shared documents."""
+    _CACHE.clear()
+
+
+def _save(session, model, field_name, value, description):
+    pk = _digest(description)
+
+    if session.get(model, pk, default=None) is None:
+        session.add(model(pk, **{field_name: value}))
+
+    return pk
+
+
+def _load(session, model, field_name, pk):
+    cache_key = (model, pk)
+
+    try:
+        return _CACHE.get(cache_key)
+    except KeyError:
+        pass
+
+    value = getattr(session.get(model, pk), field_name)
+    _CACHE.put(cache_key, value)
+    return value
+
+
+def save_settings(session, settings):
+    """Store shared settings through a session, returning their ID."""
+    return _save(session, SharedSettings, "settings", settings, settings)
+
+
+def save_constraints(session, constraints):
+    """Store shared constraints through a session, returning their ID."""
+    return _save(
+        session,
+        SharedConstraints,
+        "constraints",
+        constraints,
+        constraints.to_json(),
+    )
+
+
+def load_settings(session, settings_id):
+    """
+    Look up shared settings by ID.
+
+    The result is shared with other callers, and must not be mutated.
+    """
+    return _load(session, SharedSettings, "settings", settings_id)
+
+
+def load_constraints(session, constraints_id):
+    """Look up shared constraints by ID."""
+    return _load(session, SharedConstraints, "constraints", constraints_id)
+
+
+def _references(entries):
+    references = set()
+
+    for entry in entries:
+        if isinstance(entry, EntryReference):
+            references.add((SharedSettings, entry.settings_id))
+            references.add((SharedConstraints, entry.constraints_id))
+
+    return references
+
+
+def delete_unreferenced(session, removed_entries, remaining_entries):
+    """
+    Delete shared documents which removed bucket entries referred to.
+
+    Documents still referred to by any of `remaining_entries`, which should be
+    every entry left in any bucket, are kept.
+    """
+    unreferenced = _references(removed_entries) - _references(remaining_entries)
+
+    for model, pk in unreferenced:
+        instance = session.get(model, pk, default=None)
+
+        if instance is not None:
+            session.remove(instance)
@@ -3,7 +3,8 @@ import pytest
 from jacquard.odm import Session
 from jacquard.buckets import Bucket
 from jacquard.constraints import Constraints
-from jacquard.buckets.utils import release
+from jacquard.buckets.utils import close, release
+from jacquard.buckets.shared import clear_cache
 from jacquard.buckets.constants import NUM_BUCKETS
 from jacquard.buckets.exceptions import NotEnoughBucketsException
 
@@ -49,3 +50,171 @@ def test_conflict_on_release():
         )
 
     assert e.value.conflicts == {"foo", "bar"}
+
+
+def test_release_shares_settings_between_buckets():
+    store = {}
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(excluded_tags=["excluded"]),
+        branches=[
+            ("a", NUM_BUCKETS // 2, {"setting": "a" * 100}),
+            ("b", NUM_BUCKETS // 2, {"setting": "b" * 100}),
+        ],
+    )
+
+    shared_settings = [x for x in store if x.startswith("shared_settings/")]
+    shared_constraints = [x for x in store if x.startswith("shared_constraints/")]
+
+    assert len(shared_settings) == 2
+    assert len(shared_constraints) == 1
+    assert "a" * 100 not in str(store["buckets/0"])
+
+
+def test_shared_entries_decode_to_settings():
+    store = {}
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS, {"setting": "value"})],
+    )
+    clear_cache()
+
+    bucket = Session(store).get(Bucket, 10)
+
+    assert bucket.get_settings(None) == {"__bucket__": 10, "setting": "value"}
+    assert not bucket.needs_constraints()
+
+
+def test_can_get_settings_from_inline_entries():
+    session = Session(
+        {
+            "buckets/1": {
+                "entries": [
+                    [["foo", "a"], {"setting": "value"}, {"required_tags": ["x"]}]
+                ]
+            }
+        }
+    )
+    bucket = session.get(Bucket, 1)
+
+    assert bucket.needs_constraints()
+    assert bucket.get_settings(None) == {"__bucket__": 1}
+
+
+def test_shared_documents_are_cached_between_sessions():
+    store = {}
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS, {"setting": "value"})],
+    )
+    clear_cache()
+
+    Session(store).get(Bucket, 10).get_settings(None)
+
+    shared_keys = [x for x in store if x.startswith("shared_")]
+    for key in shared_keys:
+        del store[key]
+
+    bucket = Session(store).get(Bucket, 11)
+
+    assert bucket.get_settings(None) == {"__bucket__": 11, "setting": "value"}
+
+
+def test_removing_absent_key_does_not_write_bucket():
+    writes = []
+    store = {"buckets/1": {"entries": [[["foo", "a"], {"setting": "a"}, {}]]}}
+    session = Session(
+        get=store.__getitem__,
+        put=lambda key, value: writes.append(key),
+        delete=store.__delitem__,
+    )
+
+    session.get(Bucket, 1).remove(["bar", "b"])
+    session.flush()
+
+    assert writes == []
+
+
+def test_needed_user_attributes_ignores_overridden_constrained_entries():
+    bucket = Bucket(pk=1)
+    bucket.add(["foo", "a"], {"setting": "a"}, Constraints(required_tags=["x"]))
+    bucket.add(["bar", "b"], {"setting": "b"}, Constraints())
+
+    assert bucket.needed_user_attributes() == set()
+    assert not bucket.needs_constraints()
+
+
+def test_needed_user_attributes_of_constrained_entries():
+    bucket = Bucket(pk=1)
+    bucket.add(["foo", "a"], {"setting": "a"}, Constraints(required_tags=["x"]))
+    bucket.add(["bar", "b"], {"other": "b"}, Constraints(era="new"))
+
+    assert bucket.needed_user_attributes() == {"tags", "join_date"}
+    assert bucket.needs_constraints()
+
+
+def test_close_deletes_unreferenced_shared_documents():
+    store = {}
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS // 3, {"setting": "foo"})],
+    )
+    release(
+        store=store,
+        name="bar",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS // 3, {"other_setting": "bar"})],
+    )
+
+    close(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS // 3, {"setting": "foo"})],
+    )
+
+    shared_settings = [
+        store[x]["settings"] for x in store if x.startswith("shared_settings/")
+    ]
+    shared_constraints = [x for x in store if x.startswith("shared_constraints/")]
+
+    assert shared_settings == [{"other_setting": "bar"}]
+    assert len(shared_constraints) == 1
+
+    close(
+        store=store,
+        name="bar",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS // 3, {"other_setting": "bar"})],
+    )
+
+    assert not [x for x in store if x.startswith("shared_")]
+
+
+def test_entry_settings_are_read_only():
+    store = {}
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a", NUM_BUCKETS, {"setting": "value"})],
+    )
+    store["buckets/1"] = {"entries": [[["bar", "a"], {"setting": "inline"}, {}]]}
+    session = Session(store)
+
+    for bucket_idx in (1, 10):
+        bucket = session.get(Bucket, bucket_idx)
+
+        for entry in bucket.entries + bucket.decoded_entries():
+            if hasattr(entry, "settings"):
+                with pytest.raises(TypeError):
+                    entry.settings["setting"] = "mutated"
+
+        assert bucket.get_settings(None)["setting"] != "mutated"
@@ -0,0 +1,149 @@
+import pytest
+
+from jacquard.odm import Session
+from jacquard.buckets import Bucket, BucketIndex, load_index
+from jacquard.constraints import Constraints
+from jacquard.buckets.index import BUCKET_INDEX_KEY, Summary
+from jacquard.buckets.utils import close, release
+from jacquard.buckets.constants import NUM_BUCKETS
+from jacquard.buckets.exceptions import NotEnoughBucketsException
+
+
+def _release_foo(store):
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[
+            ("a", NUM_BUCKETS // 4, {"setting": "a"}),
+            ("b", NUM_BUCKETS // 4, {"setting": "b"}),
+        ],
+    )
+
+
+def _buckets_covering(store, key):
+    session = Session(store)
+    return {
+        idx
+        for idx in range(NUM_BUCKETS)
+        if session.get(Bucket, idx, default=None) is not None
+        and session.get(Bucket, idx).covers(key)
+    }
+
+
+def test_release_records_buckets_in_index():
+    store = {}
+    _release_foo(store)
+
+    index = load_index(store, Session(store), NUM_BUCKETS)
+
+    assert len(index.buckets(["foo", "a"])) == NUM_BUCKETS // 4
+    assert index.buckets(["foo", "a"]) == _buckets_covering(store, ["foo", "a"])
+    assert index.buckets(["foo", "b"]) == _buckets_covering(store, ["foo", "b"])
+
+
+def test_close_removes_keys_from_index():
+    store = {}
+    _release_foo(store)
+
+    close(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a",), ("b",)],
+    )
+
+    index = load_index(store, Session(store), NUM_BUCKETS)
+
+    assert not index.buckets(["foo", "a"])
+    assert not index.buckets(["foo", "b"])
+    assert not _buckets_covering(store, ["foo", "a"])
+
+
+def test_close_only_touches_indexed_buckets():
+    store = {}
+    _release_foo(store)
+    index = load_index(store, Session(store), NUM_BUCKETS)
+
+    untouched_idx = min(
+        set(range(NUM_BUCKETS))
+        - index.buckets(["foo", "a"])
+        - index.buckets(["foo", "b"])
+    )
+    store["buckets/{idx}".format(idx=untouched_idx)] = "sentinel"
+
+    close(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[("a",), ("b",)],
+    )
+
+    assert store["buckets/{idx}".format(idx=untouched_idx)] == "sentinel"
+
+
+def test_index_is_rebuilt_when_missing():
+    store = {}
+    _release_foo(store)
+    expected = store.pop(BUCKET_INDEX_KEY)
+
+    index = load_index(store, Session(store), NUM_BUCKETS)
+
+    assert index.to_json() == expected
+    assert BUCKET_INDEX_KEY not in store
+
+
+def test_index_round_trips_through_json():
+    index = BucketIndex(
+        [
+            (Summary(["foo", "a"], {"x"}, Constraints()), {1, 2}),
+            (Summary(["bar", "b"], {"x", "y"}, Constraints(era="new")), {3}),
+        ]
+    )
+
+    assert BucketIndex.from_json(index.to_json()).to_json() == index.to_json()
+
+
+def test_release_only_loads_selected_buckets():
+    store = {}
+    _release_foo(store)
+
+    loaded = set()
+    written = set()
+
+    class RecordingStore(dict):
+        def __getitem__(self, key):
+            loaded.add(key)
+            return super().__getitem__(key)
+
+        def __setitem__(self, key, value):
+            written.add(key)
+            super().__setitem__(key, value)
+
+    release(
+        store=RecordingStore(store),
+        name="bar",
+        constraints=Constraints(),
+        branches=[("c", 3, {"other-setting": "c"})],
+    )
+
+    loaded_buckets = {x for x in loaded if x.startswith("buckets/")}
+    written_buckets = {x for x in written if x.startswith("buckets/")}
+
+    assert loaded_buckets <= written_buckets
+    assert len(written_buckets) == 3
+
+
+def test_release_reports_conflicts_from_index():
+    store = {}
+    _release_foo(store)
+
+    with pytest.raises(NotEnoughBucketsException) as e:
+        release(
+            store=store,
+            name="bar",
+            constraints=Constraints(),
+            branches=[("c", NUM_BUCKETS, {"setting": "c"})],
+        )
+
+    assert e.value.conflicts == {"foo"}
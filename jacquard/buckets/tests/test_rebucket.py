@@ -0,0 +1,74 @@
+import pytest
+
+from jacquard.odm import EMPTY, Session
+from jacquard.buckets import Bucket, release, rebucket, user_bucket, get_num_buckets
+from jacquard.constraints import Constraints
+from jacquard.buckets.constants import NUM_BUCKETS
+
+
+def _settings_for_user(store, user_id):
+    bucket_idx = user_bucket(user_id, get_num_buckets(store))
+    bucket = Session(store).get(Bucket, bucket_idx, default=EMPTY)
+    settings = bucket.get_settings(None)
+    del settings["__bucket__"]
+    return settings
+
+
+def _released_store():
+    store = {}
+    release(
+        store=store,
+        name="foo",
+        constraints=Constraints(),
+        branches=[
+            ("a", NUM_BUCKETS // 3, {"setting": "a"}),
+            ("b", NUM_BUCKETS // 3, {"setting": "b"}),
+        ],
+    )
+    return store
+
+
+def test_default_number_of_buckets():
+    assert get_num_buckets({}) == NUM_BUCKETS
+
+
+def test_rebucket_keeps_user_settings():
+    store = _released_store()
+    before = {x: _settings_for_user(store, x) for x in range(1000)}
+
+    rebucket(store, NUM_BUCKETS * 10)
+
+    assert get_num_buckets(store) == NUM_BUCKETS * 10
+    assert {x: _settings_for_user(store, x) for x in range(1000)} == before
+
+
+def test_rebucket_updates_index():
+    store = _released_store()
+
+    rebucket(store, NUM_BUCKETS * 2)
+
+    release(
+        store=store,
+        name="bar",
+        constraints=Constraints(),
+        branches=[("c", NUM_BUCKETS * 2 // 3, {"setting": "c"})],
+    )
+
+    assert len({_settings_for_user(store, x)["setting"] for x in range(1000)}) == 3
+
+
+def test_rebucket_to_non_multiple_fails():
+    store = _released_store()
+
+    with pytest.raises(ValueError):
+        rebucket(store, NUM_BUCKETS + 1)
+
+
+@pytest.mark.parametrize("num_buckets", (NUM_BUCKETS // 2, 0, -NUM_BUCKETS))
+def test_rebucket_to_fewer_buckets_fails(num_buckets):
+    store = _released_store()
+
+    with pytest.raises(ValueError):
+        rebucket(store, num_buckets)
+
+    assert get_num_buckets(store) == NUM_BUCKETS
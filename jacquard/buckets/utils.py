@@ -3,17 +3,25 @@
 import random
 import hashlib
 
-from jacquard.odm import CREATE, Session
+from jacquard.odm import EMPTY, CREATE, Session
+from jacquard.buckets.index import load_index, save_index
 from jacquard.buckets.models import Bucket
-from jacquard.buckets.constants import NUM_BUCKETS
+from jacquard.buckets.shared import delete_unreferenced
+from jacquard.buckets.constants import NUM_BUCKETS, NUM_BUCKETS_KEY
 from jacquard.buckets.exceptions import NotEnoughBucketsException
 
 
-def user_bucket(user_id):
+def get_num_buckets(store):
+    """Number of buckets in use in a given store."""
+    return store.get(NUM_BUCKETS_KEY, NUM_BUCKETS)
+
+
+def user_bucket(user_id, num_buckets=NUM_BUCKETS):
     """
     Find bucket ID for a given user ID.
 
-    Based on a hash of the user ID.
+    Based on a hash of the user ID. `num_buckets` should be the number of
+    buckets in use in the store, from `get_num_buckets`.
     """
     user_id = str(user_id)
 
@@ -23,7 +31,7 @@ def user_bucket(user_id):
     key = int.from_bytes(hasher.digest(), byteorder="big")
 
     # Marked noqa because the zealous pep3101 checker thinks `key` is a string
-    return key % NUM_BUCKETS  # noqa
+    return key % num_buckets  # noqa
 
 
 def release(store, name, constraints, branches):
@@ -37,26 +45,34 @@ def release(store, name, constraints, branches):
 
     The utility will select buckets which are not already covering the given
     settings, which allows for partial rollout before running a test.
+
+    Candidate buckets are chosen using the summaries in the bucket index, so
+    only the buckets actually selected are loaded and written. The bucket
+    index is updated to match.
     """
     session = Session(store)
+    num_buckets = get_num_buckets(store)
+    index = load_index(store, session, num_buckets)
 
     # Branches is a list of (name, n_buckets, settings) tuples
-    all_buckets = [session.get(Bucket, x, default=CREATE) for x in range(NUM_BUCKETS)]
+    summaries_by_bucket = index.summaries_by_bucket()
 
     edited_settings = set.union(*[set(x[2].keys()) for x in branches])
 
     conflicting_experiments = set()
     valid_bucket_indices = []
 
-    for idx, bucket in enumerate(all_buckets):
-        if is_valid_bucket(bucket, edited_settings, constraints):
+    for idx in range(num_buckets):
+        summaries = summaries_by_bucket.get(idx, ())
+
+        if are_valid_entries(summaries, edited_settings, constraints):
             valid_bucket_indices.append(idx)
         else:
-            for entry in bucket.entries:
+            for summary in summaries:
                 # Determine if this entry is a potential conflict
-                if set(entry.settings.keys()).isdisjoint(edited_settings):
+                if summary.settings.isdisjoint(edited_settings):
                     continue
-                conflicting_experiment_id, _ = entry.key
+                conflicting_experiment_id, _ = summary.key
                 conflicting_experiments.add(conflicting_experiment_id)
 
     random.shuffle(valid_bucket_indices)
@@ -70,12 +86,13 @@ def release(store, name, constraints, branches):
 
         valid_bucket_indices = valid_bucket_indices[n_buckets:]
 
-        for bucket_idx in bucket_indices:
-            bucket = all_buckets[bucket_idx]
-
+        for bucket in session.get_many(Bucket, bucket_indices, default=CREATE):
             bucket.add(key, settings, constraints)
 
+        index.add(key, bucket_indices, settings.keys(), constraints)
+
     session.flush()
+    save_index(store, index)
 
 
 def is_valid_bucket(bucket, new_settings, new_constraints):
@@ -85,16 +102,24 @@ def is_valid_bucket(bucket, new_settings, new_constraints):
     Note that this is best-effort only: if it returns True then an overlap
     _is_ safe; if it does not then an overlap _may_ be unsafe.
     """
-    existing = bucket.affected_settings_by_constraints()
+    return are_valid_entries(bucket.decoded_entries(), new_settings, new_constraints)
 
-    for constraints, settings in existing.items():
 
-        settings_disjoint = frozenset.isdisjoint(settings, new_settings)
-        constraints_disjoint = constraints.is_provably_disjoint_from_constraints(
-            new_constraints
-        )
+def are_valid_entries(entries, new_settings, new_constraints):
+    """
+    Determine if new settings under constraints can join existing entries.
 
-        if not (constraints_disjoint or settings_disjoint):
+    `entries` may be bucket entries or bucket index summaries: anything with
+    `settings` and `constraints`. The same caveats apply as to
+    `is_valid_bucket`.
+    """
+    for entry in entries:
+        if frozenset(entry.settings).isdisjoint(new_settings):
+            continue
+
+        constraints = entry.constraints
+
+        if not constraints.is_provably_disjoint_from_constraints(new_constraints):
             return False
 
     return True
@@ -110,15 +135,78 @@ def close(store, name, constraints, branches):
     is an iterable of (branch ID, num buckets, settings) triples.
 
     Deliberately looks like `release` and works to counteract its effects.
+
+    Only the buckets which the bucket index lists for the given keys are
+    touched, other than to check which shared settings and constraints are
+    still in use: any which are not are deleted.
     """
     session = Session(store)
+    index = load_index(store, session, get_num_buckets(store))
 
     keys = [[name, x[0]] for x in branches]
+    removed_entries = []
+
+    for key in keys:
+        buckets = session.get_many(Bucket, sorted(index.remove(key)), default=None)
+
+        for bucket in buckets:
+            if bucket is not None:
+                removed_entries.extend(bucket.remove(key))
+
+    if removed_entries:
+        occupied_indices = sorted(index.summaries_by_bucket())
+        remaining_entries = [
+            entry
+            for bucket in session.get_many(Bucket, occupied_indices, default=EMPTY)
+            for entry in bucket.entries
+        ]
+        delete_unreferenced(session, removed_entries, remaining_entries)
+
+    session.flush()
+    save_index(store, index)
+
+
+def rebucket(store, num_buckets):
+    """
+    Change the number of buckets in use in a store.
+
+    `num_buckets` must be a multiple of the number currently in use, and no
+    fewer. Since the bucket for a user is their hash modulo the number of
+    buckets, new bucket `idx` then contains exactly the users who were in old
+    bucket `idx % old_num_buckets`; each new bucket gets a copy of the entries
+    in that old bucket, and so every user keeps the same settings.
+    """
+    session = Session(store)
+    old_num_buckets = get_num_buckets(store)
+
+    if num_buckets < old_num_buckets:
+        raise ValueError(
+            "Cannot re-bucket from {old} to {new} buckets: the number of "
+            "buckets cannot be reduced.".format(old=old_num_buckets, new=num_buckets)
+        )
+
+    if num_buckets % old_num_buckets != 0:
+        raise ValueError(
+            "Cannot re-bucket from {old} to {new} buckets: the new number of "
+            "buckets must be a multiple of the old.".format(
+                old=old_num_buckets, new=num_buckets
+            )
+        )
+
+    index = load_index(store, session, old_num_buckets)
+
+    occupied_indices = sorted(index.summaries_by_bucket())
+    buckets = session.get_many(Bucket, occupied_indices, default=None)
+
+    for bucket in buckets:
+        if bucket is None:
+            continue
+
+        new_indices = range(bucket.pk + old_num_buckets, num_buckets, old_num_buckets)
 
-    for idx in range(NUM_BUCKETS):
-        bucket = session.get(Bucket, idx, default=None)
-        if bucket is not None:
-            for key in keys:
-                bucket.remove(key)
+        for new_bucket in session.get_many(Bucket, new_indices, default=CREATE):
+            new_bucket.entries = bucket.entries
 
     session.flush()
+    save_index(store, index.rebucketed(old_num_buckets, num_buckets))
+    store[NUM_BUCKETS_KEY] = num_buckets
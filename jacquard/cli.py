@@ -8,18 +8,23 @@ import argparse
 import functools
 import contextlib
 
-import pkg_resources
-
 from jacquard.config import load_config
-from jacquard.plugin import plug_all
+from jacquard.plugin import plug_all, importlib_metadata
 from jacquard.commands import CommandError
 from jacquard.constants import DEFAULT_CONFIG_FILE_PATH
 
 SUBCOMMAND_GROUPS = (("list", "show lists of various topics"), ("show", "show items"))
 
 
-def _add_subparsers_from_plugins(subparsers, plugin_group):
+def _add_subparsers_from_plugins(subparsers, plugin_group, selected=None):
     for name, plugin in plug_all(plugin_group):
+        if selected is not None and selected != (plugin_group, name):
+            # Stand-in for an unselected command, so that the command module
+            # need not be imported. It is never run, and its options never
+            # parsed.
+            subparsers.add_parser(name)
+            continue
+
         command_class = plugin()
         command = command_class()
 
@@ -44,15 +49,13 @@ def _add_help_command(parser, subparsers):
 
     def _help(config, options):
         help_subcommand = list(options.command) + ["--help"]
-        parser.parse_args(help_subcommand)
+        argument_parser().parse_args(help_subcommand)
 
     subparser.set_defaults(func=_help)
     subparser.add_argument("command", nargs="*", help="command to ask about")
 
 
-@functools.lru_cache()
-def _build_argument_parser(cwd=None):
-    parser = argparse.ArgumentParser(description="Split testing server")
+def _add_global_arguments(parser):
     parser.add_argument(
         "-v",
         "--verbose",
@@ -81,14 +84,64 @@ def _build_argument_parser(cwd=None):
         "--version",
         help="show version and exit",
         action="version",
-        version=str(pkg_resources.working_set.by_key["jacquard-split"]),
+        version="jacquard-split {version}".format(
+            version=importlib_metadata.version("jacquard-split")
+        ),
     )
+
+
+def _selected_command(args):
+    """
+    Plugin group and name of the command selected by some arguments.
+
+    Returns None where no particular command is selected, as for `--help` or
+    the `help` command, in which case all commands need to be loaded.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    _add_global_arguments(parser)
+
+    _, remaining_args = parser.parse_known_args(args)
+
+    words = []
+
+    for arg in remaining_args:
+        if arg in ("-h", "--help"):
+            # Help for a command group lists all the commands in it
+            return None
+
+        if arg.startswith("-"):
+            continue
+
+        words.append(arg)
+
+        if words[0] not in dict(SUBCOMMAND_GROUPS) or len(words) == 2:
+            break
+
+    if not words or words[0] == "help":
+        return None
+
+    if len(words) == 1:
+        if words[0] in dict(SUBCOMMAND_GROUPS):
+            return None
+
+        return "commands", words[0]
+
+    plugin_group = "commands.{subcommand}".format(subcommand=words[0])
+    return plugin_group, words[1]
+
+
+@functools.lru_cache()
+def _build_argument_parser(cwd=None, selected=None):
+    parser = argparse.ArgumentParser(description="Split testing server")
+    _add_global_arguments(parser)
     parser.set_defaults(func=None)
 
     subparsers = parser.add_subparsers(metavar="command", title="subcommands")
 
     # Top-level plugins
-    _add_subparsers_from_plugins(subparsers=subparsers, plugin_group="commands")
+    _add_subparsers_from_plugins(
+        subparsers=subparsers, plugin_group="commands", selected=selected
+    )
 
     # Subcommand plugins
     for subcommand, subcommand_help in SUBCOMMAND_GROUPS:
@@ -100,6 +153,7 @@ def _build_argument_parser(cwd=None):
         _add_subparsers_from_plugins(
             subparsers=subsubcommands,
             plugin_group="commands.{subcommand}".format(subcommand=subcommand),
+            selected=selected,
         )
 
     _add_help_command(parser, subparsers)
@@ -107,17 +161,22 @@ def _build_argument_parser(cwd=None):
     return parser
 
 
-def argument_parser():
+def argument_parser(args=None):
     """
     Generate an argparse `ArgumentParser` for the CLI.
 
     This will look through all defined `jacquard.commands` entry points for
     subcommands; these are subclasses of `jacquard.commands.BaseCommand`.
     Using this mechanism, plugins can add their own subcommands.
+
+    If `args` is given, only the command they select is actually loaded: the
+    parser is then only suitable for parsing those arguments.
     """
+    selected = None if args is None else _selected_command(args)
+
     # We parameterise this by cwd to persuade `lru_cache` that this is
     # important.
-    return _build_argument_parser(os.getcwd())
+    return _build_argument_parser(os.getcwd(), selected)
 
 
 def _configure_process_and_load_config_from_options(options, override_config=None):
@@ -154,7 +213,7 @@ def main(args=sys.argv[1:], config=None):
 
     If `config` is given, it is used in place of loading a configuration file.
     """
-    parser = argument_parser()
+    parser = argument_parser(args)
     options = parser.parse_args(args)
 
     config = _configure_process_and_load_config_from_options(
@@ -2,18 +2,26 @@
 
 import io
 import json
+import timeit
+import datetime
 import functools
 import itertools
 import contextlib
 
+import dateutil.tz
+import dateutil.parser
 from werkzeug.test import Client
 from werkzeug.wrappers import BaseResponse
 
 from jacquard.cli import main as run_command
+from jacquard.plugin import REGISTRY, plug_all
+from jacquard.buckets import decode_entry
 from jacquard.service import get_wsgi_app
 from jacquard.storage import DummyStore, copy_data
 from jacquard.commands import BaseCommand, CommandError
+from jacquard.utils import parse_timestamp
 from jacquard.utils_dev import shrink
+from jacquard.constraints import Constraints
 
 
 class _DuplicateStorageConfig(object):
@@ -234,3 +242,124 @@ class Bugpoint(BaseCommand):
             yield
         finally:
             copy_data(backup, storage)
+
+
+class BenchmarkDecoding(BaseCommand):
+    """
+    Time decoding of bucket entries.
+
+    Decodes a batch of synthetic bucket entries with date constraints, and
+    parses their timestamps both with Jacquard's own timestamp parsing and
+    with dateutil's general-purpose parser, reporting the best time for each.
+    """
+
+    help = "benchmark decoding of bucket entries"
+
+    plumbing = True
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument(
+            "--entries", type=int, default=1000, help="number of entries to decode"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="number of timing runs"
+        )
+
+    def handle(self, config, options):
+        """Run command."""
+        now = datetime.datetime.now(dateutil.tz.tzutc())
+        constraints = Constraints(
+            joined_after=now - datetime.timedelta(days=7), joined_before=now
+        )
+
+        entries = [
+            [
+                ["experiment-{n}".format(n=n), "branch"],
+                {"setting": n},
+                constraints.to_json(),
+            ]
+            for n in range(options.entries)
+        ]
+
+        timestamps = [
+            timestamp
+            for _, _, description in entries
+            for timestamp in (description["joined_after"], description["joined_before"])
+        ]
+
+        def best_time(fn, inputs):
+            def run():
+                for x in inputs:
+                    fn(x)
+
+            return min(timeit.repeat(run, number=1, repeat=options.repeat))
+
+        decode_time = best_time(decode_entry, entries)
+        fast_time = best_time(parse_timestamp, timestamps)
+        dateutil_time = best_time(dateutil.parser.parse, timestamps)
+
+        for label, duration in (
+            ("decoding", decode_time),
+            ("timestamps (jacquard)", fast_time),
+            ("timestamps (dateutil)", dateutil_time),
+        ):
+            print(
+                "{label}: {per_entry:.2f}µs per entry".format(
+                    label=label, per_entry=1e6 * duration / options.entries
+                )
+            )
+
+        print(
+            "Timestamp parsing speedup: {ratio:.1f}x".format(
+                ratio=dateutil_time / fast_time
+            )
+        )
+
+
+class PluginTimings(BaseCommand):
+    """
+    Time loading of plugins.
+
+    Loads every plugin in each of Jacquard's plugin groups, and shows how long
+    each took to load, slowest first. Plugins share imports, so the cost of
+    importing a module is borne by whichever plugin first needs it.
+    """
+
+    help = "show time taken to load each plugin"
+
+    plumbing = True
+
+    groups = (
+        "commands",
+        "commands.list",
+        "commands.show",
+        "storage_engines",
+        "directory_engines",
+        "http_endpoints",
+        "trace_hooks",
+    )
+
+    def handle(self, config, options):
+        """Run command."""
+        for group in self.groups:
+            for name, plugin in plug_all(group, config=config):
+                try:
+                    plugin()
+                except ImportError as e:
+                    print(
+                        "Could not load {group} plugin {name}: {error}".format(
+                            group=group, name=name, error=e
+                        )
+                    )
+
+        load_times = sorted(
+            REGISTRY.load_times.items(), key=lambda x: x[1], reverse=True
+        )
+
+        for (group, name), duration in load_times:
+            print(
+                "{duration:8.2f}ms  {group}: {name}".format(
+                    duration=1000 * duration, group=group, name=name
+                )
+            )
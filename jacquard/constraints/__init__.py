@@ -3,10 +3,13 @@
 import warnings
 import collections
 
-import dateutil.tz
-import dateutil.parser
+from jacquard.tags import VOCABULARY, tag_mask
+from jacquard.utils import check_keys, parse_timestamp
 
-from jacquard.utils import check_keys
+# Number of specialisations kept by each `Constraints`. In practice there is
+# generally only one context per set of constraints: the launch date of the
+# experiment they belong to.
+MAX_CACHED_SPECIALISATIONS = 16
 
 ConstraintContext = collections.namedtuple("ConstraintContext", ("era_start_date",))
 
@@ -65,6 +68,11 @@ class Constraints(object):
         self.joined_before = joined_before
         self.joined_after = joined_after
 
+        # Precomputed for `matches_user` and friends, which are on hot paths.
+        self._required_mask = VOCABULARY.intern(self.required_tags)
+        self._excluded_mask = VOCABULARY.intern(self.excluded_tags)
+        self._specialisations = {}
+
     def __bool__(self):
         """Whether these constraints are non-universal."""
         if (
@@ -106,7 +114,7 @@ class Constraints(object):
             except KeyError:
                 return None
 
-            parsed_date = dateutil.parser.parse(string_date)
+            parsed_date = parse_timestamp(string_date)
 
             if parsed_date.tzinfo is None:
                 raise ValueError("Constraint dates must explicitly include timezones.")
@@ -146,8 +154,42 @@ class Constraints(object):
 
         return description
 
+    def user_attributes(self):
+        """
+        Names of the `UserEntry` attributes these constraints depend on.
+
+        Empty for the universal constraints.
+        """
+        attributes = set()
+
+        if self.era or self.joined_before or self.joined_after:
+            attributes.add("join_date")
+
+        if self.required_tags or self.excluded_tags:
+            attributes.add("tags")
+
+        return frozenset(attributes)
+
     def specialise(self, context):
-        """A copy, specialised for a given context."""
+        """
+        A copy, specialised for a given context.
+
+        Specialisations are cached, so repeated calls with the same context
+        return the same object.
+        """
+        try:
+            return self._specialisations[context]
+        except KeyError:
+            pass
+
+        if len(self._specialisations) >= MAX_CACHED_SPECIALISATIONS:
+            self._specialisations.clear()
+
+        specialised = self._specialise(context)
+        self._specialisations[context] = specialised
+        return specialised
+
+    def _specialise(self, context):
         joined_before_dates = []
         joined_after_dates = []
 
@@ -195,19 +237,22 @@ class Constraints(object):
         if self.joined_after and user.join_date < self.joined_after:
             return False
 
-        if any(x not in user.tags for x in self.required_tags):
-            return False
+        if self._required_mask or self._excluded_mask:
+            user_mask = tag_mask(user.tags)
 
-        if any(x in user.tags for x in self.excluded_tags):
-            return False
+            if user_mask & self._required_mask != self._required_mask:
+                return False
+
+            if user_mask & self._excluded_mask:
+                return False
 
         return True
 
     def is_provably_disjoint_from_constraints(self, other_constraints):
         """Test whether constraints are provably disjoint."""
         if (
-            set(self.required_tags) & set(other_constraints.excluded_tags)
-            or set(self.excluded_tags) & set(other_constraints.required_tags)
+            self._required_mask & other_constraints._excluded_mask
+            or self._excluded_mask & other_constraints._required_mask
         ):
             return True
 
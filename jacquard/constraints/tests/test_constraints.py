@@ -3,6 +3,7 @@ import datetime
 import pytest
 import dateutil.tz
 
+from jacquard.tags import TagSet
 from jacquard.constraints import Constraints, ConstraintContext
 from jacquard.directory.base import UserEntry
 
@@ -214,3 +215,41 @@ def test_disjoint_when_doubly_bounded_and_actually_non_overlapping():
             "joined_before": "2018-05-04 00:00+0000",
         },
     ) is True
+
+
+def test_specialisations_are_cached_per_context():
+    constraints = Constraints(era="new")
+
+    assert constraints.specialise(CONTEXT) is constraints.specialise(CONTEXT)
+
+
+@pytest.mark.parametrize("tags_type", (tuple, frozenset, TagSet))
+def test_tags_can_be_any_container(tags_type):
+    constraints = Constraints(required_tags=("foo",), excluded_tags=("bar",))
+
+    assert constraints.matches_user(
+        NAMED_NEW_USER._replace(tags=tags_type(["foo", "baz"]))
+    )
+    assert not constraints.matches_user(
+        NAMED_NEW_USER._replace(tags=tags_type(["foo", "bar"]))
+    )
+    assert not constraints.matches_user(
+        NAMED_NEW_USER._replace(tags=tags_type(["baz"]))
+    )
+
+
+@pytest.mark.parametrize(
+    "description, attributes",
+    (
+        ({}, set()),
+        ({"era": "new"}, {"join_date"}),
+        ({"joined_before": "2017-01-01T00:00:00Z"}, {"join_date"}),
+        ({"required_tags": ["foo"]}, {"tags"}),
+        (
+            {"excluded_tags": ["foo"], "joined_after": "2017-01-01T00:00:00Z"},
+            {"tags", "join_date"},
+        ),
+    ),
+)
+def test_user_attributes(description, attributes):
+    assert Constraints.from_json(description).user_attributes() == attributes
@@ -13,7 +13,12 @@ Internally this is a `collections.namedtuple`.
 
 UserEntry.id.__doc__ = """String user ID."""
 UserEntry.join_date.__doc__ = """Date at which the user is considered to have joined."""
-UserEntry.tags.__doc__ = """Container of tags which apply to this user, defined by the directory."""
+UserEntry.tags.__doc__ = """
+Container of tags which apply to this user, defined by the directory.
+
+This should be a `jacquard.tags.TagSet` for fast matching against
+constraints, though any container of strings will work.
+"""
 
 
 class Directory(metaclass=abc.ABCMeta):
@@ -49,3 +54,37 @@ class Directory(metaclass=abc.ABCMeta):
         corresponding `UserEntry`.
         """
         raise NotImplementedError
+
+    def warm_up(self):
+        """
+        Open any connections needed for lookups, ahead of the first lookup.
+
+        This is called when a server is warming up, so that the first requests
+        are not slowed by connecting. The default implementation does nothing.
+        """
+        pass
+
+    def may_contain(self, user_id):
+        """
+        Whether a user ID could possibly be in this directory.
+
+        This must be cheap, and is used to skip lookups for IDs which are
+        obviously not present - for instance, if they are in the wrong
+        format. It must only return False if `lookup` would return None.
+
+        The default implementation always returns True.
+        """
+        return True
+
+    def lookup_many(self, user_ids):
+        """
+        Look up several users by ID.
+
+        Returns a dict mapping each of the given IDs to its `UserEntry`, or to
+        None for missing users.
+
+        The default implementation just calls `lookup` for each ID in turn;
+        directories which make round-trips to a database or other service
+        should override this to batch the queries.
+        """
+        return {user_id: self.lookup(user_id) for user_id in user_ids}
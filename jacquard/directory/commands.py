@@ -26,4 +26,4 @@ class ShowDirectoryEntry(BaseCommand):
         if not entry.tags:
             print("No tags")
         else:
-            print("Tags: ", ", ".join(entry.tags))
+            print("Tags: ", ", ".join(sorted(entry.tags)))
@@ -13,10 +13,12 @@ intricate Django user directory.
 
 import logging
 import functools
+import collections
 
 import sqlalchemy
 import sqlalchemy.sql
 
+from jacquard.tags import TagSet
 from jacquard.directory.base import Directory, UserEntry
 
 LOGGER = logging.getLogger("jacquard.directory.django")
@@ -53,7 +55,19 @@ class DjangoDirectory(Directory):
         if row.is_superuser:
             tags.append("superuser")
 
-        return UserEntry(id=row.id, join_date=row.date_joined, tags=tuple(tags))
+        return UserEntry(id=row.id, join_date=row.date_joined, tags=TagSet(tags))
+
+    def warm_up(self):
+        """Open a connection, which is then kept in the engine's pool."""
+        self.engine.connect().close()
+
+    def may_contain(self, user_id):
+        """Whether a user ID could be present: Django user IDs are integers."""
+        try:
+            int(user_id)
+        except ValueError:
+            return False
+        return True
 
     @functools.lru_cache(maxsize=1024)
     def lookup(self, user_id):
@@ -82,3 +96,41 @@ class DjangoDirectory(Directory):
 
         LOGGER.debug("Got row: %s", row)
         return self.describe_user(row)
+
+    def lookup_many(self, user_ids):
+        """
+        Look up several users by ID.
+
+        This makes a single DB query for all the given IDs, bypassing the LRU
+        cache used by `lookup`.
+        """
+        results = {}
+        raw_ids_by_id = collections.defaultdict(list)
+
+        for raw_user_id in user_ids:
+            results[raw_user_id] = None
+
+            try:
+                user_id = int(raw_user_id)
+            except ValueError:
+                continue
+
+            raw_ids_by_id[user_id].append(raw_user_id)
+
+        if not raw_ids_by_id:
+            return results
+
+        query = sqlalchemy.sql.text(self.query + " WHERE id IN :users").bindparams(
+            sqlalchemy.sql.bindparam("users", expanding=True)
+        )
+
+        LOGGER.debug("Lookup %d users", len(raw_ids_by_id))
+        result = self.engine.execute(query, users=list(raw_ids_by_id.keys()))
+
+        for row in result:
+            user_entry = self.describe_user(row)
+
+            for raw_user_id in raw_ids_by_id[row.id]:
+                results[raw_user_id] = user_entry
+
+        return results
@@ -71,3 +71,25 @@ def test_get_non_numeric_key_gives_none():
     user_hats = directory.lookup("hats")
 
     assert user_hats is None
+
+
+@pytest.mark.skipif(sqlalchemy is None, reason="sqlalchemy not installed")
+@unittest.mock.patch("sqlalchemy.create_engine", lambda *args: test_database)
+def test_lookup_many():
+    directory = DjangoDirectory("")
+
+    users = directory.lookup_many(["1", "2", "4", "bees"])
+
+    assert list(users["1"].tags) == ["superuser"]
+    assert list(users["2"].tags) == []
+    assert users["4"] is None
+    assert users["bees"] is None
+
+
+@pytest.mark.skipif(sqlalchemy is None, reason="sqlalchemy not installed")
+@unittest.mock.patch("sqlalchemy.create_engine", lambda *args: test_database)
+def test_may_contain_only_integer_ids():
+    directory = DjangoDirectory("")
+
+    assert directory.may_contain("1")
+    assert not directory.may_contain("anonymous-session")
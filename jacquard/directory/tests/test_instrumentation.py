@@ -0,0 +1,33 @@
+from jacquard.directory import open_directory
+from jacquard.directory.utils import LOOKUP_DURATION, InstrumentedDirectory
+from jacquard.directory.dummy import DummyDirectory
+
+
+def test_opened_directories_record_lookups():
+    lookup_before = LOOKUP_DURATION.count(engine="dummy", method="lookup")
+    lookup_many_before = LOOKUP_DURATION.count(engine="dummy", method="lookup_many")
+
+    directory = open_directory(None, "dummy", {})
+
+    assert isinstance(directory, InstrumentedDirectory)
+    assert isinstance(directory.directory, DummyDirectory)
+
+    directory.lookup("1")
+    directory.lookup_many(["1", "2"])
+
+    assert LOOKUP_DURATION.count(engine="dummy", method="lookup") == lookup_before + 1
+    assert (
+        LOOKUP_DURATION.count(engine="dummy", method="lookup_many")
+        == lookup_many_before + 1
+    )
+
+
+def test_union_subdirectories_are_not_recorded_separately():
+    union_before = LOOKUP_DURATION.count(engine="union", method="lookup")
+    dummy_before = LOOKUP_DURATION.count(engine="dummy", method="lookup")
+
+    directory = open_directory(None, "union", {"engine[0]": "dummy"})
+    directory.lookup("1")
+
+    assert LOOKUP_DURATION.count(engine="union", method="lookup") == union_before + 1
+    assert LOOKUP_DURATION.count(engine="dummy", method="lookup") == dummy_before
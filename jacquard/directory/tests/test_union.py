@@ -62,7 +62,8 @@ def test_construction_from_config():
     config = object()
 
     with mock.patch(
-        "jacquard.directory.union.open_directory", mock.Mock(side_effect=(dir1, dir2))
+        "jacquard.directory.union.construct_directory",
+        mock.Mock(side_effect=(dir1, dir2)),
     ) as patched:
         union_directory = UnionDirectory.from_configuration(
             config,
@@ -82,3 +83,39 @@ def test_construction_from_config():
 
         assert union_directory.lookup(1) is user_1
         assert union_directory.lookup(2) is user_2
+
+
+def test_union_lookup_many_takes_earlier_directories_first():
+    user_1 = UserEntry(id=1, join_date=None, tags=("earlier",))
+    user_1_later = UserEntry(id=1, join_date=None, tags=("later",))
+    user_2 = UserEntry(id=2, join_date=None, tags=("later",))
+
+    dir1 = DummyDirectory(users=[user_1])
+    dir2 = DummyDirectory(users=[user_1_later, user_2])
+
+    union_directory = UnionDirectory(subdirectories=[dir1, dir2])
+
+    assert union_directory.lookup_many([1, 2, 3]) == {
+        1: user_1,
+        2: user_2,
+        3: None,
+    }
+
+
+def test_union_may_contain_if_any_subdirectory_may():
+    dir1 = mock.Mock(may_contain=mock.Mock(return_value=False))
+    dir2 = mock.Mock(may_contain=mock.Mock(return_value=True))
+
+    assert UnionDirectory(subdirectories=[dir1, dir2]).may_contain(1)
+    assert not UnionDirectory(subdirectories=[dir1]).may_contain(1)
+
+
+def test_union_warms_up_all_subdirectories():
+    dir1 = mock.Mock()
+    dir2 = mock.Mock()
+
+    union_directory = UnionDirectory(subdirectories=[dir1, dir2])
+    union_directory.warm_up()
+
+    dir1.warm_up.assert_called_once_with()
+    dir2.warm_up.assert_called_once_with()
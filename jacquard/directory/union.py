@@ -13,7 +13,7 @@ import re
 import collections
 
 from jacquard.directory.base import Directory
-from jacquard.directory.utils import open_directory
+from jacquard.directory.utils import construct_directory
 
 INDEXED_KEY_RE = re.compile(r"^([^\[]+)\[([0-9]+)]$")
 
@@ -37,7 +37,7 @@ class UnionDirectory(Directory):
         # We extract this in three logical stages:
         # (1) Calculate the maximum index,
         # (2) Construct the dict of indices -> configurations,
-        # (3) Call `open_directory` on each.
+        # (3) Call `construct_directory` on each.
         # For the sake of simplicitly steps (1) and (2) are combined using
         # some defaultdict trickery.
         sub_configurations = collections.defaultdict(dict)
@@ -62,7 +62,7 @@ class UnionDirectory(Directory):
         for subdirectory_index in range(maximum_index + 1):
             sub_configuration = sub_configurations[subdirectory_index]
             engine = sub_configuration.pop("engine")
-            yield open_directory(config, engine, sub_configuration)
+            yield construct_directory(config, engine, sub_configuration)
 
     @classmethod
     def from_configuration(cls, config, options):
@@ -98,3 +98,36 @@ class UnionDirectory(Directory):
                 return user_entry
 
         return None
+
+    def warm_up(self):
+        """Warm up all subdirectories."""
+        for subdirectory in self._subdirectories:
+            subdirectory.warm_up()
+
+    def may_contain(self, user_id):
+        """Whether a user ID could be present in any subdirectory."""
+        return any(x.may_contain(user_id) for x in self._subdirectories)
+
+    def lookup_many(self, user_ids):
+        """
+        Look up several users by ID.
+
+        Each subdirectory is queried in one batch for the users not found in
+        any of the subdirectories before it.
+        """
+        results = {user_id: None for user_id in user_ids}
+        remaining = list(results.keys())
+
+        for subdirectory in self._subdirectories:
+            if not remaining:
+                break
+
+            found = subdirectory.lookup_many(remaining)
+
+            for user_id, user_entry in found.items():
+                if user_entry is not None:
+                    results[user_id] = user_entry
+
+            remaining = [x for x in remaining if results[x] is None]
+
+        return results
@@ -1,14 +1,82 @@
 """User directory miscellaneous utilities."""
 
+import contextlib
+
 from jacquard.plugin import plug
+from jacquard.tracing import span
+from jacquard.metrics import Histogram
+from jacquard.directory.base import Directory
 
+LOOKUP_DURATION = Histogram(
+    "jacquard_directory_lookup_duration_seconds",
+    "Time taken by user directory lookups, by engine and method.",
+    labelnames=("engine", "method"),
+)
 
-def open_directory(config, engine, kwargs):
+
+class InstrumentedDirectory(Directory):
     """
-    Open a given directory, with engine and kwargs.
+    Wrapper around a directory which records the latency of its lookups.
+
+    Calls to `lookup` and `lookup_many` are timed in `LOOKUP_DURATION`, and
+    recorded as tracing spans, labelled with the name of the engine. Calls
+    the wrapped directory makes to its own methods are not recorded.
+    """
+
+    def __init__(self, directory, engine):
+        """Wrap a given directory, opened with a given engine."""
+        self.directory = directory
+        self.engine = engine
+
+    @contextlib.contextmanager
+    def _instrument(self, method_name):
+        span_name = "directory.{method}".format(method=method_name)
+
+        with LOOKUP_DURATION.time(engine=self.engine, method=method_name):
+            with span(span_name, engine=self.engine):
+                yield
+
+    def lookup(self, user_id):
+        """Look up user by ID."""
+        with self._instrument("lookup"):
+            return self.directory.lookup(user_id)
+
+    def lookup_many(self, user_ids):
+        """Look up several users by ID."""
+        with self._instrument("lookup_many"):
+            return self.directory.lookup_many(user_ids)
+
+    def warm_up(self):
+        """Warm up the wrapped directory."""
+        self.directory.warm_up()
+
+    def may_contain(self, user_id):
+        """Whether a user ID could possibly be in the wrapped directory."""
+        return self.directory.may_contain(user_id)
+
+
+def construct_directory(config, engine, kwargs):
+    """
+    Construct a given directory, with engine and kwargs, uninstrumented.
 
     Looks up the directory through the `jacquard.directory_engines` entry
     point group and instantiates the given class with `**kwargs`.
+
+    This is for directories which contain others, such as the union
+    directory, so that lookups are only recorded once, for the outermost
+    directory.
     """
     cls = plug("directory_engines", engine, config=config)()
     return cls.from_configuration(config, kwargs)
+
+
+def open_directory(config, engine, kwargs):
+    """
+    Open a given directory, with engine and kwargs.
+
+    This is as `construct_directory`, except that the directory is wrapped in
+    an `InstrumentedDirectory`, to record the latency of its lookups in
+    `LOOKUP_DURATION` and as tracing spans.
+    """
+    directory = construct_directory(config, engine, kwargs)
+    return InstrumentedDirectory(directory, engine)
@@ -5,6 +5,18 @@ Currently this part of the code is rather ill-defined in its scope with much
 of the rest of the codebase duplicating code which should belong here.
 """
 
+from jacquard.experiments.catalogue import (
+    CatalogueEntry,
+    ExperimentCatalogue,
+    load_catalogue,
+    save_catalogue,
+)
 from jacquard.experiments.experiment import Experiment
 
-__all__ = ("Experiment",)
+__all__ = (
+    "Experiment",
+    "CatalogueEntry",
+    "ExperimentCatalogue",
+    "load_catalogue",
+    "save_catalogue",
+)
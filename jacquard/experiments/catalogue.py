@@ -0,0 +1,138 @@
+"""Catalogue of the experiments in a store."""
+
+import collections
+
+EXPERIMENTS_INDEX_KEY = "experiments-index"
+
+EXPERIMENT_KEY_PREFIX = "experiments/"
+
+# Summary of one experiment: enough to list it without loading and parsing
+# its full definition. `launched` and `concluded` are as stored in the
+# definition, or None.
+CatalogueEntry = collections.namedtuple(
+    "CatalogueEntry", ("id", "name", "state", "launched", "concluded")
+)
+
+
+def _experiment_ids(store):
+    prefix_length = len(EXPERIMENT_KEY_PREFIX)
+
+    return {
+        key[prefix_length:] for key in store if key.startswith(EXPERIMENT_KEY_PREFIX)
+    }
+
+
+def _state(launched, concluded):
+    if concluded is not None:
+        return "concluded"
+    if launched is not None:
+        return "active"
+    return "draft"
+
+
+def catalogue_entry(description):
+    """Summarise an experiment from its JSON definition."""
+    launched = description.get("launched")
+    concluded = description.get("concluded")
+
+    return CatalogueEntry(
+        id=description["id"],
+        name=description.get("name", description["id"]),
+        state=_state(launched, concluded),
+        launched=launched,
+        concluded=concluded,
+    )
+
+
+class ExperimentCatalogue(object):
+    """
+    Summaries of all the experiments in a store, by ID.
+
+    This is kept in storage alongside the experiments themselves and updated
+    whenever one is saved, so that listing experiments does not mean loading
+    every experiment in the store.
+    """
+
+    def __init__(self, entries=()):
+        """Construct from an iterable of `CatalogueEntry`."""
+        self._entries_by_id = {entry.id: entry for entry in entries}
+
+    @classmethod
+    def from_json(cls, description):
+        """Decode from the storage representation."""
+        return cls(
+            CatalogueEntry(
+                id=entry["id"],
+                name=entry["name"],
+                state=entry["state"],
+                launched=entry.get("launched"),
+                concluded=entry.get("concluded"),
+            )
+            for entry in description
+        )
+
+    def to_json(self):
+        """Encode into the storage representation."""
+        return [
+            {key: value for key, value in entry._asdict().items() if value is not None}
+            for entry in self
+        ]
+
+    @classmethod
+    def build(cls, store):
+        """Build from scratch by scanning every key in a store."""
+        entries = []
+
+        for experiment_id in _experiment_ids(store):
+            key = EXPERIMENT_KEY_PREFIX + experiment_id
+            description = {"id": experiment_id, **store[key]}
+            entries.append(catalogue_entry(description))
+
+        return cls(entries)
+
+    def __iter__(self):
+        """Iterate over entries, in order of ID."""
+        for experiment_id in sorted(self._entries_by_id):
+            yield self._entries_by_id[experiment_id]
+
+    def __len__(self):
+        """Number of experiments."""
+        return len(self._entries_by_id)
+
+    def __contains__(self, experiment_id):
+        """Whether there is an experiment with a given ID."""
+        return experiment_id in self._entries_by_id
+
+    def update(self, description):
+        """Add or replace the entry for an experiment's JSON definition."""
+        entry = catalogue_entry(description)
+        self._entries_by_id[entry.id] = entry
+
+
+def load_catalogue(store):
+    """
+    Load the experiment catalogue from a store.
+
+    If there is no catalogue in the store - for instance, because the data were
+    written by an older version of Jacquard - or it does not list exactly the
+    experiments in the store - for instance, because some were copied in by
+    `storage-import` - one is built by loading every experiment. It is not
+    written back; callers which are making changes should `save_catalogue`
+    themselves, and saving any experiment does so.
+    """
+    try:
+        description = store[EXPERIMENTS_INDEX_KEY]
+    except KeyError:
+        return ExperimentCatalogue.build(store)
+
+    catalogue = ExperimentCatalogue.from_json(description)
+
+    if {entry.id for entry in catalogue} != _experiment_ids(store):
+        return ExperimentCatalogue.build(store)
+
+    return catalogue
+
+
+def save_catalogue(store, catalogue):
+    """Write the experiment catalogue to a store."""
+    store[EXPERIMENTS_INDEX_KEY] = catalogue.to_json()
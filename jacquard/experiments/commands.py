@@ -8,7 +8,12 @@ import yaml
 import dateutil.tz
 
 from jacquard.utils import is_recursive
-from jacquard.buckets import NotEnoughBucketsException, close, release
+from jacquard.buckets import (
+    NotEnoughBucketsException,
+    close,
+    release,
+    get_num_buckets,
+)
 from jacquard.storage import retrying
 from jacquard.commands import BaseCommand, CommandError
 from jacquard.constraints import ConstraintContext
@@ -77,7 +82,7 @@ class Launch(BaseCommand):
                     store,
                     experiment.id,
                     specialised_constraints,
-                    experiment.branch_launch_configuration(),
+                    experiment.branch_launch_configuration(get_num_buckets(store)),
                 )
             except NotEnoughBucketsException as e:
                 raise CommandError(
@@ -153,7 +158,7 @@ class Conclude(BaseCommand):
                 store,
                 experiment.id,
                 experiment.constraints,
-                experiment.branch_launch_configuration(),
+                experiment.branch_launch_configuration(get_num_buckets(store)),
             )
 
             if options.promote_branch:
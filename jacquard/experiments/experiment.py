@@ -1,12 +1,34 @@
 """Experiment definition abstraction class."""
 
+import copy
+import json
+import hashlib
 import contextlib
 
-import dateutil.parser
-
-from jacquard.utils import check_keys
+from jacquard.utils import LRUCache, check_keys, parse_timestamp
 from jacquard.buckets import NUM_BUCKETS
 from jacquard.constraints import Constraints, ConstraintContext
+from jacquard.experiments.catalogue import (
+    EXPERIMENT_KEY_PREFIX,
+    load_catalogue,
+    save_catalogue,
+)
+
+# Number of parsed experiments retained in the process-wide cache.
+CACHE_SIZE = 256
+
+
+_CACHE = LRUCache(CACHE_SIZE)
+
+
+def clear_cache():
+    """Drop all cached parsed experiments."""
+    _CACHE.clear()
+
+
+def _digest(definition):
+    encoded = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
 
 
 class Experiment(object):
@@ -107,39 +129,69 @@ class Experiment(object):
             kwargs["constraints"] = Constraints.from_json(obj["constraints"])
 
         with contextlib.suppress(KeyError):
-            kwargs["launched"] = dateutil.parser.parse(obj["launched"])
+            kwargs["launched"] = parse_timestamp(obj["launched"])
 
         with contextlib.suppress(KeyError):
-            kwargs["concluded"] = dateutil.parser.parse(obj["concluded"])
+            kwargs["concluded"] = parse_timestamp(obj["concluded"])
 
         return cls(obj["id"], obj["branches"], **kwargs)
 
     @classmethod
     def from_store(cls, store, experiment_id):
-        """Create instance from a store lookup by ID."""
-        json_repr = dict(
-            store["experiments/{experiment_id}".format(experiment_id=experiment_id)]
+        """
+        Create instance from a store lookup by ID.
+
+        Parsed experiments are cached by the contents of their definitions, so
+        an unchanged experiment is only parsed once per process.
+        """
+        return cls._from_definition(
+            experiment_id, store[EXPERIMENT_KEY_PREFIX + experiment_id]
         )
+
+    @classmethod
+    def _from_definition(cls, experiment_id, definition):
+        json_repr = dict(definition)
         # Be resilient to missing ID
         if "id" not in json_repr:
             json_repr["id"] = experiment_id
-        return cls.from_json(json_repr)
+
+        cache_key = (cls, _digest(json_repr))
+
+        try:
+            experiment = _CACHE.get(cache_key)
+        except KeyError:
+            experiment = cls.from_json(json_repr)
+            _CACHE.put(cache_key, experiment)
+
+        # Callers are free to change the instance they get, including its
+        # branches and constraints, but not the cached one.
+        return copy.deepcopy(experiment)
 
     @classmethod
     def enumerate(cls, store):
         """
-        Iterator over all named experiments in a store.
+        Iterator over all named experiments in a store, in order of ID.
 
-        Includes inactive experiments.
+        Includes inactive experiments. The experiments are found from the
+        catalogue, and fetched together if the store supports `get_many`.
         """
-        prefix = "experiments/"
+        experiment_ids = [entry.id for entry in load_catalogue(store)]
+        keys = [EXPERIMENT_KEY_PREFIX + x for x in experiment_ids]
+
+        get_many = getattr(store, "get_many", None)
+
+        if get_many is not None:
+            definitions = get_many(keys)
+        else:
+            definitions = {key: store[key] for key in keys if key in store}
 
-        for key in store:
-            if not key.startswith(prefix):
+        for experiment_id, key in zip(experiment_ids, keys):
+            try:
+                definition = definitions[key]
+            except KeyError:
                 continue
 
-            experiment_id = key[len(prefix):]
-            yield cls.from_store(store, experiment_id)
+            yield cls._from_definition(experiment_id, definition)
 
     def to_json(self):
         """Serialise as canonical JSON."""
@@ -167,10 +219,18 @@ class Experiment(object):
         return representation
 
     def save(self, store):
-        """Save into the given store using the ID as the key."""
-        store[
-            "experiments/{experiment_id}".format(experiment_id=self.id)
-        ] = self.to_json()
+        """
+        Save into the given store using the ID as the key.
+
+        This also updates the experiment's entry in the catalogue.
+        """
+        definition = self.to_json()
+
+        catalogue = load_catalogue(store)
+        catalogue.update(definition)
+
+        store[EXPERIMENT_KEY_PREFIX + self.id] = definition
+        save_catalogue(store, catalogue)
 
     def branch(self, branch_id):
         """
@@ -186,18 +246,22 @@ class Experiment(object):
         check_keys((branch_id,), branches_by_id.keys(), exception=LookupError)
         return branches_by_id[branch_id]
 
-    def _num_buckets(self, bucket_description):
+    def _num_buckets(self, bucket_description, total_buckets):
         percent = bucket_description.get("percent", 100 // len(self.branches))
-        return (NUM_BUCKETS * percent) // 100
+        return (total_buckets * percent) // 100
 
-    def branch_launch_configuration(self):
+    def branch_launch_configuration(self, total_buckets=NUM_BUCKETS):
         """
         Launch configuration for the branches of this experiment.
 
         This is the format expected for the `branches` argument of `release`
         and `close`, to actually decide which buckets see this experiment.
+        `total_buckets` is the number of buckets in use in the store.
         """
-        return [(x["id"], self._num_buckets(x), x["settings"]) for x in self.branches]
+        return [
+            (x["id"], self._num_buckets(x, total_buckets), x["settings"])
+            for x in self.branches
+        ]
 
     def includes_user(self, user_entry):
         """
@@ -205,12 +269,17 @@ class Experiment(object):
 
         A (hopefully constant time) predicate.
         """
-        try:
-            specialised_constraints = self._specialised_constraints
-        except AttributeError:
-            specialised_constraints = self.constraints.specialise(
-                ConstraintContext(era_start_date=self.launched)
+        memo = getattr(self, "_specialised_constraints", None)
+
+        # Copies of cached experiments share this, but may be relaunched.
+        if memo is None or memo[0] != self.launched:
+            memo = (
+                self.launched,
+                self.constraints.specialise(
+                    ConstraintContext(era_start_date=self.launched)
+                ),
             )
-            self._specialised_constraints = specialised_constraints
+            self._specialised_constraints = memo
 
+        _, specialised_constraints = memo
         return specialised_constraints.matches_user(user_entry)
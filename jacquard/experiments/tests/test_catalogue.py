@@ -0,0 +1,148 @@
+from unittest.mock import Mock, patch
+
+from jacquard.cli import main
+from jacquard.storage.dummy import DummyStore
+from jacquard.experiments.experiment import clear_cache
+from jacquard.experiments import Experiment, load_catalogue
+
+BRANCHES = [{"id": "bar", "settings": {"pony": "gravity"}}]
+
+
+def test_catalogue_is_built_from_unindexed_store():
+    store = DummyStore(
+        "",
+        data={
+            "experiments/foo": {"branches": BRANCHES, "name": "Foo"},
+            "experiments/bar": {"branches": BRANCHES, "launched": "2017-01-01"},
+            "defaults": {},
+        },
+    )
+
+    with store.transaction(read_only=True) as transaction:
+        catalogue = load_catalogue(transaction)
+
+    assert [(x.id, x.name, x.state) for x in catalogue] == [
+        ("bar", "bar", "active"),
+        ("foo", "Foo", "draft"),
+    ]
+
+
+def test_save_keeps_catalogue_in_sync():
+    config = Mock()
+    config.storage = DummyStore(
+        "", data={"experiments/foo": {"branches": BRANCHES}, "defaults": {}}
+    )
+
+    main(("launch", "foo"), config=config)
+    assert config.storage["experiments-index"] == [
+        {
+            "id": "foo",
+            "name": "foo",
+            "state": "active",
+            "launched": config.storage["experiments/foo"]["launched"],
+        }
+    ]
+
+    main(("conclude", "foo", "--no-promote-branch"), config=config)
+    (entry,) = config.storage["experiments-index"]
+    assert entry["state"] == "concluded"
+    assert entry["concluded"] == config.storage["experiments/foo"]["concluded"]
+
+
+def test_catalogue_is_used_when_up_to_date():
+    store = DummyStore("", data={})
+
+    with store.transaction() as transaction:
+        Experiment("foo", BRANCHES, name="Foo").save(transaction)
+
+    with patch(
+        "jacquard.experiments.catalogue.ExperimentCatalogue.build"
+    ) as build, store.transaction(read_only=True) as transaction:
+        catalogue = load_catalogue(transaction)
+
+    build.assert_not_called()
+    assert [(x.id, x.name) for x in catalogue] == [("foo", "Foo")]
+
+
+def test_catalogue_is_rebuilt_when_missing_experiments():
+    store = DummyStore("", data={})
+
+    with store.transaction() as transaction:
+        Experiment("foo", BRANCHES).save(transaction)
+        transaction["experiments/unindexed"] = {"branches": BRANCHES}
+
+    with store.transaction(read_only=True) as transaction:
+        experiments = list(Experiment.enumerate(transaction))
+
+    assert [x.id for x in experiments] == ["foo", "unindexed"]
+
+
+def test_catalogue_is_rebuilt_after_storage_import():
+    source = DummyStore("", data={})
+    config = Mock()
+    config.storage = DummyStore("", data={})
+
+    with source.transaction() as transaction:
+        Experiment("foo", BRANCHES).save(transaction)
+
+    with config.storage.transaction() as transaction:
+        Experiment("bar", BRANCHES).save(transaction)
+
+    with patch("jacquard.storage.commands.open_engine", return_value=source):
+        main(("storage-import", "dummy", ""), config=config)
+
+    with config.storage.transaction(read_only=True) as transaction:
+        experiments = list(Experiment.enumerate(transaction))
+
+    assert [x.id for x in experiments] == ["bar", "foo"]
+
+
+def test_enumerate_works_on_plain_mappings():
+    store = {}
+    Experiment("foo", BRANCHES).save(store)
+    Experiment("bar", BRANCHES).save(store)
+
+    assert [x.id for x in Experiment.enumerate(store)] == ["bar", "foo"]
+
+
+def test_parsed_experiments_are_cached_by_contents():
+    clear_cache()
+    store = DummyStore("", data={"experiments/foo": {"branches": BRANCHES}})
+
+    with patch.object(Experiment, "from_json", wraps=Experiment.from_json) as parse:
+        with store.transaction(read_only=True) as transaction:
+            first = Experiment.from_store(transaction, "foo")
+            second = Experiment.from_store(transaction, "foo")
+
+    assert parse.call_count == 1
+    assert first is not second
+    assert first.branches == second.branches
+
+
+def test_changed_experiments_are_reparsed():
+    clear_cache()
+    store = DummyStore("", data={"experiments/foo": {"branches": BRANCHES}})
+
+    with store.transaction(read_only=True) as transaction:
+        assert Experiment.from_store(transaction, "foo").name == "foo"
+
+    with store.transaction() as transaction:
+        transaction["experiments/foo"] = {"branches": BRANCHES, "name": "Foo"}
+
+    with store.transaction(read_only=True) as transaction:
+        assert Experiment.from_store(transaction, "foo").name == "Foo"
+
+
+def test_changes_to_returned_experiments_do_not_affect_cache():
+    clear_cache()
+    store = DummyStore("", data={"experiments/foo": {"branches": BRANCHES}})
+
+    with store.transaction(read_only=True) as transaction:
+        experiment = Experiment.from_store(transaction, "foo")
+        experiment.name = "Changed"
+        experiment.branches[0]["settings"]["pony"] = "changed"
+        experiment.branches.append({"id": "baz", "settings": {}})
+
+        experiment = Experiment.from_store(transaction, "foo")
+        assert experiment.name == "foo"
+        assert experiment.branches == BRANCHES
@@ -0,0 +1,243 @@
+"""
+Process-wide performance metrics.
+
+This is a deliberately minimal implementation of counters and histograms
+which can be rendered in the Prometheus text exposition format. Metrics are
+declared at module level, next to the code they measure, and are collected
+in `REGISTRY`.
+
+Metrics are per-process: where a server runs several worker processes, each
+one reports its own values.
+"""
+
+import math
+import time
+import threading
+import contextlib
+
+# Default histogram bucket upper bounds, in seconds. Chosen for operations
+# which normally take anything from tens of microseconds to a second or so.
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+
+    if not pairs:
+        return ""
+
+    return "{{{labels}}}".format(
+        labels=",".join(
+            '{name}="{value}"'.format(name=name, value=_escape_label_value(value))
+            for name, value in pairs
+        )
+    )
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Registry(object):
+    """Collection of metrics, to be rendered together."""
+
+    def __init__(self):
+        """Construct empty."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric, which must have a unique name."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(
+                    "Duplicate metric name: {name}".format(name=metric.name)
+                )
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        """Look up a metric by name."""
+        return self._metrics[name]
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda x: x.name)
+
+        lines = []
+
+        for metric in metrics:
+            lines.append(
+                "# HELP {name} {documentation}".format(
+                    name=metric.name, documentation=metric.documentation
+                )
+            )
+            lines.append(
+                "# TYPE {name} {type}".format(name=metric.name, type=metric.type)
+            )
+            lines.extend(metric.render_samples())
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric(object):
+    """Base class for metrics with an optional set of labels."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        """Construct and register."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+        if registry is not None:
+            registry.register(self)
+
+    def _label_values(self, labels):
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                "Expected labels {expected}, got {actual}".format(
+                    expected=", ".join(self.labelnames),
+                    actual=", ".join(sorted(labels.keys())),
+                )
+            )
+        return tuple(str(labels[x]) for x in self.labelnames)
+
+    def render_samples(self):
+        """Generate sample lines in the Prometheus text format."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """Increment the count for the given labels."""
+        key = self._label_values(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current count for the given labels."""
+        return self._values.get(self._label_values(labels), 0)
+
+    def render_samples(self):
+        """Generate sample lines in the Prometheus text format."""
+        with self._lock:
+            values = sorted(self._values.items())
+
+        for labelvalues, value in values:
+            yield "{name}{labels} {value}".format(
+                name=self.name,
+                labels=_format_labels(self.labelnames, labelvalues),
+                value=_format_value(value),
+            )
+
+
+class Histogram(Metric):
+    """Distribution of observed values, typically durations in seconds."""
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        """Construct, with the given bucket upper bounds."""
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        """Record a single observation for the given labels."""
+        key = self._label_values(labels)
+
+        with self._lock:
+            try:
+                bucket_counts, totals = self._values[key]
+            except KeyError:
+                bucket_counts = [0] * len(self.buckets)
+                totals = [0, 0.0]
+                self._values[key] = bucket_counts, totals
+
+            for idx, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[idx] += 1
+                    break
+
+            totals[0] += 1
+            totals[1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Context manager which observes the duration of its body."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        """Number of observations for the given labels."""
+        try:
+            _, (count, _) = self._values[self._label_values(labels)]
+        except KeyError:
+            return 0
+        return count
+
+    def render_samples(self):
+        """Generate sample lines in the Prometheus text format."""
+        with self._lock:
+            values = sorted(
+                (key, (list(bucket_counts), list(totals)))
+                for key, (bucket_counts, totals) in self._values.items()
+            )
+
+        for labelvalues, (bucket_counts, (count, total)) in values:
+            cumulative = 0
+
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield "{name}_bucket{labels} {value}".format(
+                    name=self.name,
+                    labels=_format_labels(
+                        self.labelnames,
+                        labelvalues,
+                        extra=(("le", _format_value(upper_bound)),),
+                    ),
+                    value=cumulative,
+                )
+
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield "{name}_sum{labels} {value}".format(
+                name=self.name, labels=labels, value=_format_value(total)
+            )
+            yield "{name}_count{labels} {value}".format(
+                name=self.name, labels=labels, value=count
+            )
@@ -7,6 +7,9 @@ Types in the ODM should derive from `Model`.
 import sys
 
 from jacquard.odm import inflection
+from jacquard.odm.fields import BaseField
+
+_MISSING = object()
 
 
 class ModelMeta(type):
@@ -20,11 +23,19 @@ class ModelMeta(type):
         Standard constructor.
 
         This is overridden so that on Python <= 3.5, we can find all `Field`s
-        in the class and set their names.
+        in the class and set their names, and so that the table of fields and
+        the storage name can be computed once rather than on every use.
         """
         super().__init__(name, bases, namespace)
         self._dub_fields()
 
+        self.field_table = self._find_fields()
+
+        self._storage_name = inflection.tableize(name)
+        self._format_storage_key = "{storage_name}/{{pk}}".format(
+            storage_name=self._storage_name
+        ).format
+
     def _dub_fields(self):
         if sys.version_info >= (3, 6):
             return
@@ -38,16 +49,33 @@ class ModelMeta(type):
 
             set_name(self, field_name)
 
+    def _find_fields(self):
+        field_table = {}
+
+        for klass in reversed(self.__mro__):
+            for field_name, field in vars(klass).items():
+                if isinstance(field, BaseField):
+                    field_table[field_name] = field
+
+        return field_table
+
     @property
     def storage_name(self):
         """Base name used in storage."""
-        return inflection.tableize(self.__name__)
+        return self._storage_name
 
 
 class Model(object, metaclass=ModelMeta):
     """Object type, mapped into document store."""
 
-    __slots__ = ("pk", "_fields", "session")
+    __slots__ = (
+        "pk",
+        "_fields",
+        "_decoded",
+        "_loaded_fields",
+        "_changed_fields",
+        "session",
+    )
 
     def __init__(self, pk, **fields):
         """
@@ -58,6 +86,9 @@ class Model(object, metaclass=ModelMeta):
         """
         self.pk = pk
         self._fields = {}
+        self._decoded = {}
+        self._loaded_fields = None
+        self._changed_fields = set()
         self.session = None
 
         for field_name, value in fields.items():
@@ -78,6 +109,24 @@ class Model(object, metaclass=ModelMeta):
         """
         return data
 
+    def changed_fields(self):
+        """
+        Names of the fields changed since this instance was loaded or saved.
+
+        Fields which have been set back to the value they were loaded with do
+        not count as changed. For instances which have never been loaded or
+        saved, this is all of the fields which have been set.
+        """
+        if self._loaded_fields is None:
+            return set(self._changed_fields)
+
+        return {
+            field_name
+            for field_name in self._changed_fields
+            if self._fields.get(field_name, _MISSING)
+            != self._loaded_fields.get(field_name, _MISSING)
+        }
+
     def mark_dirty(self):
         """
         Inform the attached session about changes.
@@ -91,7 +140,7 @@ class Model(object, metaclass=ModelMeta):
     @classmethod
     def storage_key(cls, pk):
         """Key within the document store for a particular pk."""
-        return "{storage_name}/{pk}".format(storage_name=cls.storage_name, pk=pk)
+        return cls._format_storage_key(pk=pk)
 
     def __repr__(self):  # noqa: D400
         """Python reproducer. Handy for debugging!"""
@@ -102,7 +151,7 @@ class Model(object, metaclass=ModelMeta):
             args=", ".join(
                 "{field}={value!r}".format(
                     field=field_name,
-                    value=getattr(cls, field_name).transform_from_storage(
+                    value=cls.field_table[field_name].transform_from_storage(
                         field_raw_value
                     ),
                 )
@@ -11,8 +11,14 @@ class BaseField(object, metaclass=abc.ABCMeta):
     Subclasses should override `transform_to_storage` and
     `transform_from_storage`. They may optionally also override `validate`,
     but should call `super().validate` if doing so.
+
+    Fields whose decoded values are immutable should set `immutable`. Their
+    values are then decoded once per instance and shared between reads,
+    until the field is next set.
     """
 
+    immutable = False
+
     def __init__(self, *, null=False, default=None):
         """
         Construct the field.
@@ -50,12 +56,23 @@ class BaseField(object, metaclass=abc.ABCMeta):
         if obj is None:
             return self
 
+        if self.immutable:
+            try:
+                return obj._decoded[self.name]
+            except KeyError:
+                pass
+
         try:
             raw_value = obj._fields[self.name]
         except KeyError:
-            return copy.copy(self.default)
+            value = copy.copy(self.default)
+        else:
+            value = self.transform_from_storage(raw_value)
+
+        if self.immutable:
+            obj._decoded[self.name] = value
 
-        return self.transform_from_storage(raw_value)
+        return value
 
     def __set__(self, obj, value):
         """Write descriptor."""
@@ -64,6 +81,8 @@ class BaseField(object, metaclass=abc.ABCMeta):
         else:
             obj._fields[self.name] = self.transform_to_storage(value)
 
+        obj._decoded.pop(self.name, None)
+        obj._changed_fields.add(self.name)
         obj.mark_dirty()
 
     def __set_name__(self, owner, name):
@@ -78,6 +97,8 @@ class BaseField(object, metaclass=abc.ABCMeta):
 class TextField(BaseField):
     """Plain text field."""
 
+    immutable = True
+
     def transform_to_storage(self, value):
         """Encode the value in JSON-compatible data types."""
         return str(value)
@@ -107,6 +128,11 @@ class ListField(BaseField):
         super().__init__(**kwargs)
         self.field = field
 
+    @property
+    def immutable(self):
+        """Decoded lists are tuples, so immutable if their contents are."""
+        return self.field.immutable
+
     def transform_to_storage(self, value):
         """Encode the value in JSON-compatible data types."""
         return [self.field.transform_to_storage(x) for x in value]
@@ -127,11 +153,17 @@ class ListField(BaseField):
 class EncodeDecodeField(BaseField):
     """Field with callbacks for transforming in and out of storage."""
 
-    def __init__(self, *, encode, decode, **kwargs):
-        """Construct from encode/decode callbacks."""
+    def __init__(self, *, encode, decode, immutable=False, **kwargs):
+        """
+        Construct from encode/decode callbacks.
+
+        Pass `immutable=True` if `decode` returns immutable values, which
+        allows them to be memoised.
+        """
         super().__init__(**kwargs)
         self.encode = encode
         self.decode = decode
+        self.immutable = immutable
 
     def transform_to_storage(self, value):
         """Encode the value in JSON-compatible data types."""
@@ -4,8 +4,8 @@ import contextlib
 import collections
 import collections.abc
 
+from jacquard.tracing import HOOKS, event
 from jacquard.odm.utils import method_dispatch
-from jacquard.odm.fields import BaseField
 
 RAISE = object()
 EMPTY = object()
@@ -16,7 +16,7 @@ class Session(object):
     """Single interaction session, for a document store."""
 
     @method_dispatch
-    def __init__(self, get, put, delete):
+    def __init__(self, get, put, delete, get_many=None):
         """
         Standard constructor.
 
@@ -28,10 +28,16 @@ class Session(object):
         `delete` is a callable which takes a string key and either removes the
         corresponding entry or, if the entry does not exist, raises a
         LookupError.
+
+        `get_many`, if given, is a callable which takes a list of string keys
+        and returns a dict of those which exist to their associated data. It
+        is used for `get_many` and `prefetch`; without it, those fall back to
+        calling `get` for each key.
         """
         self.store_get = get
         self.store_put = put
         self.store_delete = delete
+        self.store_get_many = get_many
         self._instances = collections.defaultdict(dict)
         self._dirty = collections.defaultdict(set)
 
@@ -41,10 +47,14 @@ class Session(object):
         Constructor from mutable mappings.
 
         Passes through to the standard constructor with `__getitem__`,
-        `__setitem__` and `__delitem__`.
+        `__setitem__` and `__delitem__`, and `get_many` if the mapping has it
+        (as does `TransactionMap`).
         """
         self.__init__(
-            get=store.__getitem__, put=store.__setitem__, delete=store.__delitem__
+            get=store.__getitem__,
+            put=store.__setitem__,
+            delete=store.__delitem__,
+            get_many=getattr(store, "get_many", None),
         )
         self.store = store
 
@@ -113,11 +123,63 @@ class Session(object):
 
             return default
 
+        return self._load(model, pk, data)
+
+    def get_many(self, model, pks, default=RAISE):
+        """
+        Look up several instances by PK.
+
+        This is equivalent to calling `get` for each PK, returning a list of
+        the results, except that any instances not already in the session are
+        fetched from the document store together.
+        """
+        pks = list(pks)
+        self.prefetch(model, pks)
+        return [self.get(model, pk, default=default) for pk in pks]
+
+    def prefetch(self, model, pks):
+        """
+        Load several instances into the session in one go.
+
+        Later `get`s for these PKs are then served from the session. PKs which
+        do not exist in the document store are ignored.
+        """
+        model_instances = self._instances[model]
+        pks = [pk for pk in dict.fromkeys(pks) if pk not in model_instances]
+
+        if not pks:
+            return
+
+        storage_keys = [model.storage_key(pk) for pk in pks]
+
+        if self.store_get_many is not None:
+            found = self.store_get_many(storage_keys)
+        else:
+            found = {}
+            for storage_key in storage_keys:
+                try:
+                    found[storage_key] = self.store_get(storage_key)
+                except KeyError:
+                    pass
+
+        for pk, storage_key in zip(pks, storage_keys):
+            try:
+                data = found[storage_key]
+            except KeyError:
+                continue
+
+            self._load(model, pk, data)
+
+    def _load(self, model, pk, data):
+        if HOOKS:
+            event("odm.load", model=model.__name__, pk=pk)
+
         # Use the upgrade path such as it is
         data = model.transitional_upgrade_raw_data(data)
 
         instance = model(pk=pk)
-        instance._fields = data
+        instance._fields = dict(data)
+        instance._loaded_fields = data
         instance.session = self
 
         self._instances[model][pk] = instance
@@ -140,7 +202,13 @@ class Session(object):
         self._dirty[model].add(pk)
 
     def flush(self):
-        """Write all pending changes to the document store."""
+        """
+        Write all pending changes to the document store.
+
+        Instances which were loaded from the store are only written if any of
+        their fields have actually changed, and only the changed fields are
+        validated.
+        """
         for model, dirty_pks in self._dirty.items():
             model_instances = self._instances[model]
             model_storage_key = model.storage_key
@@ -158,20 +226,29 @@ class Session(object):
                         pass
                     continue
 
-                # Validate all of the fields
-                for field_name, field in vars(model).items():
-                    if not isinstance(field, BaseField):
+                if instance._loaded_fields is None:
+                    changed_fields = instance._fields.keys()
+                else:
+                    changed_fields = instance.changed_fields()
+
+                    if not changed_fields:
                         continue
 
+                field_table = model.field_table
+
+                for field_name in changed_fields:
                     try:
-                        raw_value = instance._fields[field_name]
+                        field = field_table[field_name]
                     except KeyError:
                         continue
 
-                    field.validate(raw_value)
+                    field.validate(instance._fields[field_name])
 
                 self.store_put(storage_key, dict(instance._fields))
 
+                instance._loaded_fields = dict(instance._fields)
+                instance._changed_fields.clear()
+
         self._dirty.clear()
 
 
@@ -1,6 +1,13 @@
 import pytest
 
-from jacquard.odm import Model, Session, TextField
+from jacquard.odm import (
+    CREATE,
+    Model,
+    Session,
+    JSONField,
+    TextField,
+    EncodeDecodeField,
+)
 
 
 class Example(Model):
@@ -8,6 +15,14 @@ class Example(Model):
     defaulted_field = TextField(null=False, default="Pony")
 
 
+class Decoded(Model):
+    value = EncodeDecodeField(
+        encode=lambda x: x["number"], decode=lambda x: {"number": x}
+    )
+    frozen_value = EncodeDecodeField(encode=list, decode=tuple, immutable=True)
+    json_value = JSONField()
+
+
 def test_builtin_model_key():
     assert Example.storage_key(1) == "examples/1"
 
@@ -183,3 +198,146 @@ def test_basic_repr_functions_properly():
     instance.name = "Bees"
 
     assert repr(instance) == "Example(pk=1, name='Bees')"
+
+
+def test_immutable_decoded_values_are_shared_between_reads():
+    instance = Decoded(pk=1, frozen_value=(1, 2))
+
+    assert instance.frozen_value is instance.frozen_value
+
+
+def test_memoised_values_are_invalidated_on_set():
+    instance = Decoded(pk=1, frozen_value=(1, 2))
+    instance.frozen_value
+
+    instance.frozen_value = (3, 4)
+
+    assert instance.frozen_value == (3, 4)
+
+
+def test_mutable_decoded_values_are_not_shared_between_reads():
+    instance = Decoded(pk=1, value={"number": 1}, json_value={"a": 1})
+
+    instance.value["number"] = 2
+    instance.json_value["a"] = 2
+
+    assert instance.value == {"number": 1}
+    assert instance.json_value == {"a": 1}
+
+
+def test_get_many():
+    data = {"examples/1": {"name": "Paula"}, "examples/2": {"name": "Paul"}}
+    session = Session(data)
+
+    instances = session.get_many(Example, [2, 1, 3], default=None)
+
+    assert [x.name for x in instances[:2]] == ["Paul", "Paula"]
+    assert instances[2] is None
+    assert instances[0] is session.get(Example, 2)
+
+
+def test_get_many_raises_for_missing_by_default():
+    session = Session({"examples/1": {"name": "Paula"}})
+
+    with pytest.raises(KeyError):
+        session.get_many(Example, [1, 2])
+
+
+def test_get_many_creates_missing_instances():
+    data = {}
+    session = Session(data)
+
+    instances = session.get_many(Example, [1, 2], default=CREATE)
+    session.flush()
+
+    assert [x.pk for x in instances] == [1, 2]
+    assert data == {"examples/1": {}, "examples/2": {}}
+
+
+def test_prefetch_fetches_in_bulk():
+    bulk_fetches = []
+
+    def get(key):
+        raise AssertionError("Unexpected single get of {key}".format(key=key))
+
+    def get_many(keys):
+        bulk_fetches.append(keys)
+        return {"examples/1": {"name": "Paula"}}
+
+    session = Session(get=get, put=None, delete=None, get_many=get_many)
+
+    session.prefetch(Example, [1, 1])
+    session.prefetch(Example, [1])
+
+    assert session.get(Example, 1).name == "Paula"
+    assert bulk_fetches == [["examples/1"]]
+
+
+def test_unchanged_instances_are_not_written():
+    writes = []
+    data = {"examples/1": {"name": "Paula"}}
+    session = Session(
+        get=data.__getitem__,
+        put=lambda key, value: writes.append(key),
+        delete=data.__delitem__,
+    )
+
+    instance = session.get(Example, 1)
+    instance.mark_dirty()
+    instance.name = "Paul"
+    instance.name = "Paula"
+    session.flush()
+
+    assert writes == []
+
+
+def test_only_changed_fields_are_written_and_validated():
+    data = {"examples/1": {"name": "Paula", "defaulted_field": None}}
+    session = Session(data)
+
+    instance = session.get(Example, 1)
+    instance.name = "Paul"
+    session.flush()
+
+    assert data == {"examples/1": {"name": "Paul", "defaulted_field": None}}
+
+
+def test_changes_are_tracked_from_the_last_flush():
+    writes = []
+    data = {}
+    session = Session(
+        get=data.__getitem__,
+        put=lambda key, value: writes.append(value),
+        delete=data.__delitem__,
+    )
+
+    instance = Example(pk=1, name="Paula")
+    session.add(instance)
+    session.flush()
+
+    instance.name = "Paula"
+    session.flush()
+
+    instance.name = "Paul"
+    session.flush()
+
+    assert writes == [{"name": "Paula"}, {"name": "Paul"}]
+
+
+def test_field_table_includes_inherited_fields():
+    class DerivedExample(Example):
+        extra = TextField()
+
+    assert DerivedExample.field_table == {
+        "name": Example.name,
+        "defaulted_field": Example.defaulted_field,
+        "extra": DerivedExample.extra,
+    }
+
+
+def test_storage_name_is_computed_per_class():
+    class DerivedExample(Example):
+        pass
+
+    assert DerivedExample.storage_key("a") == "derived_examples/a"
+    assert Example.storage_key("a") == "examples/a"
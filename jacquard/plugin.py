@@ -1,45 +1,167 @@
 """Plugin-loading subsystem."""
 
 import sys
+import time
 import logging
 import functools
+import threading
 
-import pkg_resources
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:  # Python < 3.8
+    import importlib_metadata
+
+from jacquard.metrics import Histogram
 
 DEFAULT_PLUGIN_DIRECTORY = "/etc/jacquard/plugins"
 LOGGER = logging.getLogger("jacquard.plugin")
 
+LOAD_DURATION = Histogram(
+    "jacquard_plugin_load_duration_seconds",
+    "Time taken to first load each plugin, including imports, by group.",
+    labelnames=("group",),
+)
 
-def plug_all(group, config=None):
+
+def _iter_entry_points(group):
+    entry_points = importlib_metadata.entry_points()
+
+    try:
+        select = entry_points.select
+    except AttributeError:
+        # Older versions return a dict of lists, keyed by group
+        return entry_points.get(group, ())
+
+    return select(group=group)
+
+
+class PluginRegistry(object):
     """
-    Load all plugins within a given group.
+    Cache of the plugins available in each group.
 
-    Currently, this enumerates through entry points in the `jacquard.<group>`
-    group.
+    Entry points are enumerated once per group, and each `[plugins:<group>]`
+    config section once per distinct set of contents, after which plugins are
+    found by name with a dict lookup. The time taken to first load each plugin
+    is recorded in `load_times` and the `LOAD_DURATION` metric.
 
-    Returns an iterable of `(name, plugin)` pairs. Plugins are callables
-    which, when called, load the actual plugin and return it.
+    If plugins are installed or removed while running, `invalidate` must be
+    called for them to be seen.
     """
-    LOGGER.debug("Enumerating plugins in group %s", group)
 
-    # Add /etc/jacquard/plugins to the search path if not already there
-    if DEFAULT_PLUGIN_DIRECTORY not in sys.path:
-        sys.path.append(DEFAULT_PLUGIN_DIRECTORY)
-        pkg_resources.working_set.add_entry(DEFAULT_PLUGIN_DIRECTORY)
+    def __init__(self):
+        """Construct with nothing cached."""
+        self._lock = threading.Lock()
+        self._entry_points = {}
+        self._config_entry_points = {}
+        self.load_times = {}
+
+    def invalidate(self):
+        """Forget all cached entry points, so they are scanned again."""
+        with self._lock:
+            self._entry_points.clear()
+            self._config_entry_points.clear()
+
+    def _scan(self, group):
+        LOGGER.debug("Enumerating plugins in group %s", group)
+
+        # Add /etc/jacquard/plugins to the search path if not already there
+        if DEFAULT_PLUGIN_DIRECTORY not in sys.path:
+            sys.path.append(DEFAULT_PLUGIN_DIRECTORY)
+
+        entry_points_group = "jacquard.{group}".format(group=group)
+
+        entry_points = {}
+
+        for entry_point in _iter_entry_points(entry_points_group):
+            entry_points[entry_point.name] = entry_point
+
+        return entry_points
+
+    def _scan_config_section(self, group, config_section):
+        entry_points_group = "jacquard.{group}".format(group=group)
+
+        return {
+            key: importlib_metadata.EntryPoint(
+                name=key, value=value, group=entry_points_group
+            )
+            for key, value in config_section
+        }
+
+    def entry_points(self, group, config=None):
+        """
+        Map of plugin names to entry points within a given group.
+
+        Plugins from `config` take precedence over installed ones of the same
+        name.
+        """
+        try:
+            entry_points = self._entry_points[group]
+        except KeyError:
+            with self._lock:
+                entry_points = self._entry_points.get(group)
+
+                if entry_points is None:
+                    entry_points = self._scan(group)
+                    self._entry_points[group] = entry_points
+
+        if config is None:
+            return entry_points
+
+        config_section = tuple(
+            config.get("plugins:{group}".format(group=group), {}).items()
+        )
+
+        if not config_section:
+            return entry_points
+
+        cache_key = (group, config_section)
+
+        try:
+            config_entry_points = self._config_entry_points[cache_key]
+        except KeyError:
+            config_entry_points = self._scan_config_section(group, config_section)
+
+            with self._lock:
+                self._config_entry_points[cache_key] = config_entry_points
+
+        return {**entry_points, **config_entry_points}
+
+    def loader(self, group, entry_point):
+        """Callable which loads a plugin from an entry point, and times it."""
+
+        def load():
+            start_time = time.perf_counter()
+            plugin = entry_point.load()
+            duration = time.perf_counter() - start_time
+
+            key = (group, entry_point.name)
+
+            # Only the first load of a plugin does any importing
+            if key not in self.load_times:
+                self.load_times[key] = duration
+                LOAD_DURATION.observe(duration, group=group)
+
+            return plugin
+
+        return load
 
-    entry_points_group = "jacquard.{group}".format(group=group)
 
-    for entry_point in pkg_resources.iter_entry_points(entry_points_group):
-        yield entry_point.name, entry_point.load
+REGISTRY = PluginRegistry()
 
-    if config is not None:
-        config_section = config.get("plugins:{group}".format(group=group), {})
 
-        for key, value in config_section.items():
-            entry_point_line = "{key} = {value}".format(key=key, value=value)
+def plug_all(group, config=None):
+    """
+    Load all plugins within a given group.
 
-            entry_point = pkg_resources.EntryPoint.parse(entry_point_line)
-            yield entry_point.name, entry_point.resolve
+    Currently, this enumerates through entry points in the `jacquard.<group>`
+    group, as cached in `REGISTRY`.
+
+    Returns an iterable of `(name, plugin)` pairs. Plugins are callables
+    which, when called, load the actual plugin and return it; nothing is
+    imported until then.
+    """
+    for name, entry_point in REGISTRY.entry_points(group, config=config).items():
+        yield name, REGISTRY.loader(group, entry_point)
 
 
 def plug(group, name, config=None):
@@ -54,18 +176,14 @@ def plug(group, name, config=None):
     As with `plug_all` the returned plugin is lazy: a callable which, when
     called, actually loads and instantiates the plugin.
     """
-    candidate = None
-
-    for point_name, resolver in plug_all(group, config=config):
-        if point_name != name:
-            continue
-
-        candidate = resolver
-
-    if candidate is None:
+    try:
+        entry_point = REGISTRY.entry_points(group, config=config)[name]
+    except KeyError:
         raise RuntimeError(
             "Could not find plugin for '{plugin_name}'".format(plugin_name=name)
-        )
+        ) from None
+
+    candidate = REGISTRY.loader(group, entry_point)
 
     @functools.wraps(candidate)
     def wrapped_loader(*args, **kwargs):
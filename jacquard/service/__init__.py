@@ -5,11 +5,29 @@ The primary means by which the Jacquard server is accessed in production is
 an HTTP API, which is the domain of this subsystem. It presents a WSGI HTTP
 application.
 
-The only user-facing API from this subsystem is `get_wsgi_app`, which takes a
-system configuration and returns a WSGI callable.
+The main user-facing API from this subsystem is `get_wsgi_app`, which takes a
+system configuration and returns a WSGI callable. Servers may also
+`warm_up` before serving.
 """
 
 from jacquard.service.wsgi import get_wsgi_app
+from jacquard.service.warmup import (
+    READINESS,
+    warm_up,
+    warm_up_after_fork,
+    warm_up_in_background,
+)
 from jacquard.service.endpoints import Endpoint
+from jacquard.service.directory import RequestDirectory
+from jacquard.service.compression import ResponseCompressor
 
-__all__ = ("get_wsgi_app", "Endpoint")
+__all__ = (
+    "get_wsgi_app",
+    "warm_up",
+    "warm_up_in_background",
+    "warm_up_after_fork",
+    "READINESS",
+    "Endpoint",
+    "RequestDirectory",
+    "ResponseCompressor",
+)
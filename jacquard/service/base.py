@@ -5,6 +5,8 @@ import copy
 
 import werkzeug.routing
 
+from jacquard.service.directory import RequestDirectory
+
 
 class Endpoint(metaclass=abc.ABCMeta):
     """
@@ -17,10 +19,16 @@ class Endpoint(metaclass=abc.ABCMeta):
     Instances have two states: bound and unbound. When the endpoint is loaded
     it is instantiated in an unbound state. Before it's actually *dispatched*,
     the dispatcher calls `bind` which copies the endpoint to produce a bound
-    version. Bound endpoints have context available in attributes: `reverse`
-    and `request`.
+    version. Bound endpoints have context available in attributes: `reverse`,
+    `request` and `directory`.
+
+    Endpoints whose responses are shared between many clients, rather than
+    being specific to a user, may set `cacheable` so that their compressed
+    responses are cached.
     """
 
+    cacheable = False
+
     def __init__(self, config):
         """Constructor from system config."""
         self.config = config
@@ -50,7 +58,9 @@ class Endpoint(metaclass=abc.ABCMeta):
         called on bound instances, so you can rely on `self.request` and
         friends existing.
 
-        Return JSON structures.
+        Return JSON structures. Alternatively, a `werkzeug.wrappers.Response`
+        may be returned, which is passed through unaltered: this is useful
+        for streaming responses.
         """
         raise NotImplementedError
 
@@ -77,6 +87,7 @@ class Endpoint(metaclass=abc.ABCMeta):
         instance = copy.copy(self)
         instance._request = request
         instance._reverse = reverse
+        instance._directory = None
         return instance
 
     @property
@@ -89,6 +100,28 @@ class Endpoint(metaclass=abc.ABCMeta):
                 "Unbound endpoint: `request` is only available on bound " "endpoints"
             )
 
+    @property
+    def directory(self):
+        """
+        User directory for this request.
+
+        This is a `RequestDirectory` over the configured directory, which
+        deduplicates and batches lookups within the request. Prefer it to
+        `config.directory` in endpoints.
+        """
+        try:
+            directory = self._directory
+        except AttributeError:
+            raise AttributeError(
+                "Unbound endpoint: `directory` is only available on bound endpoints"
+            )
+
+        if directory is None:
+            directory = RequestDirectory(self.config.directory)
+            self._directory = directory
+
+        return directory
+
     def reverse(self, name, **kwargs):
         """Look up URL for a given endpoint with given kwargs."""
         try:
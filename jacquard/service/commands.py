@@ -1,13 +1,15 @@
 """Command-line utilities for HTTP service subsystem."""
 
+import os
 import pathlib
 
 import werkzeug.debug
 import werkzeug.serving
 import werkzeug.contrib.profiler
 
-from jacquard.service import get_wsgi_app
+from jacquard.service import warm_up, get_wsgi_app, warm_up_after_fork
 from jacquard.commands import BaseCommand
+from jacquard.service.prefork import PreforkServer
 
 
 class RunServer(BaseCommand):
@@ -59,3 +61,84 @@ class RunServer(BaseCommand):
             threaded=False,
             processes=1,
         )
+
+
+class Serve(BaseCommand):
+    """
+    Run a production server.
+
+    The configuration, plugins and storage engine are loaded, and caches
+    warmed up, once, in a master process, which then forks a pool of worker
+    processes sharing one listening socket. By default there is one worker
+    per CPU core.
+
+    Send SIGHUP to the master process to gracefully restart the workers, or
+    SIGTERM to shut down once in-flight requests have finished.
+    """
+
+    help = "run a production server"
+
+    def add_arguments(self, parser):
+        """Add argparse arguments."""
+        parser.add_argument(
+            "-p", "--port", type=int, default=1212, help="port to bind to"
+        )
+        parser.add_argument(
+            "-b", "--bind", type=str, default="::1", help="address to bind to"
+        )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="number of worker processes (default: number of CPUs)",
+        )
+        parser.add_argument(
+            "--threaded",
+            action="store_true",
+            help="handle each request on its own thread within workers",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=int,
+            default=30,
+            help="seconds to wait for workers to finish requests when stopping",
+        )
+        parser.add_argument(
+            "--no-warm-up",
+            action="store_false",
+            dest="warm_up",
+            help="do not fill caches before forking workers",
+        )
+
+    def handle(self, config, options):
+        """Run command."""
+        app = get_wsgi_app(config)
+
+        if options.warm_up:
+            # Warm up before forking so that workers share the warm caches,
+            # rather than each filling them separately. The directory's pooled
+            # connections must not be shared between processes, so it is
+            # warmed up in each worker instead.
+            warm_up(config, directory=False)
+        else:
+            # Open storage before forking so workers share its initial state
+            # rather than each loading it separately.
+            config.storage
+
+        def after_fork():
+            config.storage.reinitialise_after_fork()
+
+            if options.warm_up:
+                warm_up_after_fork(config)
+
+        server = PreforkServer(
+            app,
+            host=options.bind,
+            port=options.port,
+            workers=options.workers,
+            threaded=options.threaded,
+            graceful_timeout=options.graceful_timeout,
+            after_fork=after_fork,
+        )
+        server.run()
@@ -0,0 +1,118 @@
+"""
+HTTP response compression.
+
+Responses are compressed according to the client's `Accept-Encoding` header.
+gzip is always available; brotli is used when the optional `brotli` package
+is installed. Small responses are sent as-is since compressing them tends to
+cost more in CPU than it saves in bandwidth.
+"""
+
+import gzip
+import hashlib
+import collections
+
+from jacquard.utils import LRUCache
+from jacquard.metrics import Counter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this (in bytes) are never compressed.
+DEFAULT_MINIMUM_SIZE = 1024
+
+# Number of compressed bodies retained for cacheable endpoints.
+DEFAULT_CACHE_SIZE = 64
+
+CACHE_LOOKUPS = Counter(
+    "jacquard_http_compression_cache_lookups_total",
+    "Lookups in the compressed response cache, by result.",
+    labelnames=("result",),
+)
+
+
+def _gzip(body):
+    return gzip.compress(body, compresslevel=6)
+
+
+def _brotli(body):
+    return brotli.compress(body, quality=5)
+
+
+def available_encodings():
+    """Content codings supported in this process, in order of preference."""
+    encodings = collections.OrderedDict()
+
+    if brotli is not None:
+        encodings["br"] = _brotli
+
+    encodings["gzip"] = _gzip
+
+    return encodings
+
+
+class ResponseCompressor(object):
+    """
+    Negotiating response compressor.
+
+    Bodies are only compressed if they are at least `minimum_size` bytes long.
+    Compressed bodies from cacheable endpoints are kept in a small LRU cache,
+    keyed by encoding and a digest of the uncompressed body, so that
+    repeatedly serving the same document does not repeatedly compress it.
+    """
+
+    def __init__(
+        self, *, minimum_size=DEFAULT_MINIMUM_SIZE, cache_size=DEFAULT_CACHE_SIZE
+    ):
+        """Construct with threshold and cache size."""
+        self.minimum_size = minimum_size
+        self.cache_size = cache_size
+        self.encodings = available_encodings()
+
+        self._cache = LRUCache(cache_size)
+
+    def select_encoding(self, accept_encodings):
+        """
+        Pick a content coding given the client's acceptable encodings.
+
+        `accept_encodings` is a Werkzeug `Accept` object, as found on
+        `Request.accept_encodings`. Returns None for the identity coding.
+        """
+        return accept_encodings.best_match(list(self.encodings.keys()))
+
+    def compress(self, body, accept_encodings, *, cacheable=False):
+        """
+        Compress a response body.
+
+        Returns a pair of the (possibly) compressed body and the content coding
+        used, or None if the body was left uncompressed.
+        """
+        if len(body) < self.minimum_size:
+            return body, None
+
+        encoding = self.select_encoding(accept_encodings)
+
+        if encoding is None:
+            return body, None
+
+        compress = self.encodings[encoding]
+
+        if not cacheable or self.cache_size <= 0:
+            return compress(body), encoding
+
+        cache_key = (encoding, hashlib.sha1(body).digest())
+
+        try:
+            compressed_body = self._cache.get(cache_key)
+        except KeyError:
+            pass
+        else:
+            CACHE_LOOKUPS.inc(result="hit")
+            return compressed_body, encoding
+
+        CACHE_LOOKUPS.inc(result="miss")
+        compressed_body = compress(body)
+        self._cache.put(cache_key, compressed_body)
+
+        return compressed_body, encoding
@@ -0,0 +1,82 @@
+"""Request-scoped user directory."""
+
+from jacquard.metrics import Counter
+
+LOOKUPS = Counter(
+    "jacquard_http_directory_lookups_total",
+    "User lookups made through request-scoped directories, by whether they "
+    "went to the underlying directory or were saved by deduplication.",
+    labelnames=("result",),
+)
+
+
+class RequestDirectory(object):
+    """
+    Deduplicating facade over a user directory, for a single request.
+
+    Each user is looked up in the underlying directory at most once, and
+    `lookup_many` and `prefetch` batch any users not already seen into one
+    call. Lookups answered without going to the directory are counted as
+    saved, both on the instance and in the `LOOKUPS` metric.
+
+    Entries are kept for the lifetime of the facade, so this should not be
+    used for unbounded numbers of users, as in streaming endpoints.
+    """
+
+    def __init__(self, directory):
+        """Wrap a given directory."""
+        self.directory = directory
+        self.backend_calls = 0
+        self.saved_calls = 0
+        self._entries = {}
+
+    def may_contain(self, user_id):
+        """Whether a user ID could possibly be in the directory."""
+        return self.directory.may_contain(user_id)
+
+    def lookup(self, user_id):
+        """Look up user by ID, at most once per request."""
+        try:
+            user_entry = self._entries[user_id]
+        except KeyError:
+            pass
+        else:
+            self._record_saved(1)
+            return user_entry
+
+        self.backend_calls += 1
+        LOOKUPS.inc(result="backend")
+
+        user_entry = self.directory.lookup(user_id)
+        self._entries[user_id] = user_entry
+        return user_entry
+
+    def lookup_many(self, user_ids):
+        """Look up several users by ID, batching any not already seen."""
+        user_ids = list(user_ids)
+
+        self._record_saved(sum(1 for x in user_ids if x in self._entries))
+        self.prefetch(user_ids)
+
+        return {user_id: self._entries[user_id] for user_id in user_ids}
+
+    def prefetch(self, user_ids):
+        """Look up any of several users not already seen, in one batch."""
+        unseen_user_ids = [
+            user_id
+            for user_id in dict.fromkeys(user_ids)
+            if user_id not in self._entries
+        ]
+
+        if not unseen_user_ids:
+            return
+
+        self.backend_calls += 1
+        LOOKUPS.inc(result="backend")
+
+        self._entries.update(self.directory.lookup_many(unseen_user_ids))
+
+    def _record_saved(self, count):
+        if count:
+            self.saved_calls += count
+            LOOKUPS.inc(count, result="saved")
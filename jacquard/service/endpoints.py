@@ -1,12 +1,20 @@
 """Built-in, core HTTP endpoints."""
 
+import json
+import time
+import itertools
+import contextlib
+
+import werkzeug.wrappers
 from werkzeug.exceptions import NotFound, MethodNotAllowed
 
-from jacquard.odm import EMPTY, Session
+from jacquard.odm import Session
+from jacquard.metrics import REGISTRY
 from jacquard.users import get_settings
-from jacquard.buckets import NUM_BUCKETS, Bucket, user_bucket
-from jacquard.experiments import Experiment
+from jacquard.buckets import load_index, user_bucket, get_num_buckets
+from jacquard.experiments import Experiment, load_catalogue
 from jacquard.service.base import Endpoint
+from jacquard.service.warmup import READINESS
 
 
 class Root(Endpoint):
@@ -16,6 +24,7 @@ class Root(Endpoint):
     Essentially a directory of the main endpoints available.
     """
 
+    cacheable = True
     url = "/"
 
     def handle(self):
@@ -39,7 +48,7 @@ class User(Endpoint):
 
     def handle(self, user):
         """Dispatch request."""
-        settings = get_settings(user, self.config.storage, self.config.directory)
+        settings = get_settings(user, self.config.storage, self.directory)
 
         return {**settings, "user": user}
 
@@ -51,43 +60,36 @@ class ExperimentsOverview(Endpoint):
     Gives basic details on all experiments in the system, regardless of state.
     """
 
+    cacheable = True
     url = "/experiments"
 
     def handle(self):
         """Dispatch request."""
         with self.config.storage.transaction(read_only=True) as store:
             active_experiments = store.get("active-experiments", ())
-            experiments = list(Experiment.enumerate(store))
+            catalogue = load_catalogue(store)
 
         return [
             {
-                "id": experiment.id,
-                "url": self.reverse("experiment", experiment=experiment.id),
-                "state": "active"
-                if experiment.id in active_experiments
-                else "inactive",
-                "name": experiment.name,
+                "id": entry.id,
+                "url": self.reverse("experiment", experiment=entry.id),
+                "state": "active" if entry.id in active_experiments else "inactive",
+                "name": entry.name,
             }
-            for experiment in experiments
+            for entry in catalogue
         ]
 
 
 class ExperimentDetail(Endpoint):
     """Full experiment details."""
 
+    cacheable = True
     url = "/experiments/<experiment>"
 
     def handle(self, experiment):
         """Dispatch request."""
         with self.config.storage.transaction(read_only=True) as store:
-            try:
-                experiment_config = Experiment.from_store(store, experiment)
-            except LookupError:
-                raise NotFound(
-                    "No experiment with ID {experiment_id!r}".format(
-                        experiment_id=experiment
-                    )
-                )
+            experiment_config = _load_experiment(store, experiment)
 
             branches = [x["id"] for x in experiment_config.branches]
 
@@ -101,6 +103,38 @@ class ExperimentDetail(Endpoint):
         }
 
 
+def _load_experiment(store, experiment_id):
+    try:
+        return Experiment.from_store(store, experiment_id)
+    except LookupError:
+        raise NotFound(
+            "No experiment with ID {experiment_id!r}".format(
+                experiment_id=experiment_id
+            )
+        )
+
+
+def _branches_by_bucket(store, session, experiment_config, num_buckets):
+    """Map of bucket indices to the IDs of the branches they cover."""
+    index = load_index(store, session, num_buckets)
+    branches_by_bucket = {}
+
+    for branch in experiment_config.branches:
+        for idx in index.buckets([experiment_config.id, branch["id"]]):
+            branches_by_bucket[idx] = branches_by_bucket.get(idx, ()) + (branch["id"],)
+
+    return branches_by_bucket
+
+
+def _relevant_settings(experiment_config):
+    relevant_settings = set()
+
+    for branch_config in experiment_config.branches:
+        relevant_settings.update(branch_config["settings"].keys())
+
+    return relevant_settings
+
+
 class ExperimentPartition(Endpoint):
     """Grouping of users by branch in a given experiment."""
 
@@ -116,29 +150,22 @@ class ExperimentPartition(Endpoint):
         with self.config.storage.transaction(read_only=True) as store:
             session = Session(store)
 
-            try:
-                experiment_config = Experiment.from_store(store, experiment)
-            except LookupError:
-                raise NotFound(
-                    "No experiment with ID {experiment_id!r}".format(
-                        experiment_id=experiment
-                    )
-                )
+            experiment_config = _load_experiment(store, experiment)
 
-            buckets = [
-                session.get(Bucket, idx, default=EMPTY) for idx in range(NUM_BUCKETS)
-            ]
+            num_buckets = get_num_buckets(store)
+            branches_by_bucket = _branches_by_bucket(
+                store, session, experiment_config, num_buckets
+            )
 
             branch_ids = [branch["id"] for branch in experiment_config.branches]
             branches = {x: [] for x in branch_ids}
 
-            relevant_settings = set()
+            relevant_settings = _relevant_settings(experiment_config)
 
-            for branch_config in experiment_config.branches:
-                relevant_settings.update(branch_config["settings"].keys())
+            self.directory.prefetch(user_ids)
 
             for user_id in user_ids:
-                user_entry = self.config.directory.lookup(user_id)
+                user_entry = self.directory.lookup(user_id)
 
                 if not experiment_config.includes_user(user_entry):
                     continue
@@ -150,15 +177,116 @@ class ExperimentPartition(Endpoint):
                 if any(x in relevant_settings for x in user_overrides.keys()):
                     continue
 
-                bucket = buckets[user_bucket(user_id)]
+                bucket_idx = user_bucket(user_id, num_buckets)
 
-                for branch_id, members in branches.items():
-                    if bucket.covers([experiment_config.id, branch_id]):
-                        members.append(user_id)
+                for branch_id in branches_by_bucket.get(bucket_idx, ()):
+                    branches[branch_id].append(user_id)
 
         return {"branches": branches}
 
 
+class ExperimentPartitionStream(Endpoint):
+    """
+    Streaming grouping of users by branch in a given experiment.
+
+    The request body is a list of user IDs, one per line. The response is
+    newline-delimited JSON, with one `{"user": ..., "branch": ...}` record
+    for each user on a branch of the experiment.
+
+    Users are handled in chunks of `chunk_size`, with one batched directory
+    lookup per chunk, so memory use does not grow with the number of users.
+    All chunks are read from the same storage transaction, which is held
+    until the response is closed. Lines which are not valid UTF-8 are decoded
+    with replacement characters rather than failing mid-response.
+    """
+
+    url = "/experiments/<experiment>/partition-stream"
+
+    chunk_size = 1000
+
+    def handle(self, experiment):
+        """Dispatch request."""
+        if self.request.method != "POST":
+            raise MethodNotAllowed()
+
+        with contextlib.ExitStack() as stack:
+            store = stack.enter_context(self.config.storage.transaction(read_only=True))
+            session = Session(store)
+
+            experiment_config = _load_experiment(store, experiment)
+
+            num_buckets = get_num_buckets(store)
+            branches_by_bucket = _branches_by_bucket(
+                store, session, experiment_config, num_buckets
+            )
+
+            response = werkzeug.wrappers.Response(
+                self._generate_records(
+                    store, experiment_config, branches_by_bucket, num_buckets
+                ),
+                mimetype="application/x-ndjson",
+            )
+            response.call_on_close(stack.pop_all().close)
+
+        return response
+
+    def _posted_user_ids(self):
+        for line in iter(self.request.stream.readline, b""):
+            user_id = line.strip().decode("utf-8", errors="replace")
+
+            if user_id:
+                yield user_id
+
+    def _generate_records(
+        self, store, experiment_config, branches_by_bucket, num_buckets
+    ):
+        relevant_settings = _relevant_settings(experiment_config)
+        posted_user_ids = self._posted_user_ids()
+
+        while True:
+            chunk = list(itertools.islice(posted_user_ids, self.chunk_size))
+
+            if not chunk:
+                break
+
+            # Bucketing is cheap, so it is done first to avoid looking up
+            # users who could not be in the experiment anyway.
+            candidates = []
+
+            for user_id in chunk:
+                bucket_idx = user_bucket(user_id, num_buckets)
+                branch_ids = branches_by_bucket.get(bucket_idx)
+
+                if branch_ids:
+                    candidates.append((user_id, branch_ids))
+
+            if not candidates:
+                continue
+
+            user_entries = self.config.directory.lookup_many(
+                [user_id for user_id, _ in candidates]
+            )
+
+            records = []
+
+            for user_id, branch_ids in candidates:
+                if not experiment_config.includes_user(user_entries[user_id]):
+                    continue
+
+                user_overrides = store.get(
+                    "overrides/{user_id}".format(user_id=user_id), {}
+                )
+
+                if any(x in relevant_settings for x in user_overrides.keys()):
+                    continue
+
+                for branch_id in branch_ids:
+                    records.append(json.dumps({"user": user_id, "branch": branch_id}))
+
+            if records:
+                yield ("\n".join(records) + "\n").encode("utf-8")
+
+
 class Defaults(Endpoint):
     """
     Global defaults lookup.
@@ -166,9 +294,90 @@ class Defaults(Endpoint):
     Potentially useful for archival.
     """
 
+    cacheable = True
     url = "/defaults"
 
     def handle(self):
         """Dispatch request."""
         with self.config.storage.transaction(read_only=True) as store:
             return store.get("defaults", {})
+
+
+class Metrics(Endpoint):
+    """
+    Performance metrics.
+
+    Reported in the Prometheus text exposition format, for scraping.
+    """
+
+    url = "/metrics"
+
+    def handle(self):
+        """Dispatch request."""
+        return werkzeug.wrappers.Response(
+            REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class Ready(Endpoint):
+    """
+    Readiness check.
+
+    Reports whether this process has finished warming up, with a 503 status
+    while it has not, so that load balancers can hold off sending it traffic.
+    """
+
+    url = "/ready"
+
+    def handle(self):
+        """Dispatch request."""
+        description = READINESS.to_json()
+
+        return werkzeug.wrappers.Response(
+            json.dumps(description) + "\n",
+            status=200 if description["ready"] else 503,
+            mimetype="application/json",
+        )
+
+
+class Health(Endpoint):
+    """
+    Health check.
+
+    Reports on readiness and on the health of the storage engine - for
+    `redis-cloned`, including when the local copy of the data was last
+    confirmed current. Responds with a 503 status if not healthy.
+
+    If the `max_lag` query parameter is given, storage which was last synced
+    more than that many seconds ago is also reported as unhealthy. Note that
+    `redis-cloned` storage confirms its state when polling, as well as on
+    changes, so this should be comfortably more than its poll interval.
+    """
+
+    url = "/health"
+
+    def handle(self):
+        """Dispatch request."""
+        readiness = READINESS.to_json()
+
+        if "storage" in readiness["steps"] or readiness["ready"]:
+            storage = self.config.storage.health()
+        else:
+            # Opening storage would block until its initial sync is done.
+            storage = None
+
+        healthy = readiness["ready"] and storage is not None and storage["healthy"]
+
+        max_lag = self.request.args.get("max_lag", type=float)
+        last_synced = storage.get("last_synced") if storage else None
+
+        if healthy and max_lag is not None and last_synced is not None:
+            healthy = time.time() - last_synced <= max_lag
+
+        description = {"healthy": healthy, "readiness": readiness, "storage": storage}
+
+        return werkzeug.wrappers.Response(
+            json.dumps(description) + "\n",
+            status=200 if healthy else 503,
+            mimetype="application/json",
+        )
@@ -0,0 +1,272 @@
+"""
+Pre-forking HTTP server.
+
+A small master/worker server in the style of gunicorn: the master process
+binds the listening socket and builds the WSGI application, then forks a
+number of worker processes which accept connections from the shared socket.
+Anything loaded before the fork - configuration, plugins, storage state - is
+shared copy-on-write between the workers.
+
+Signals to the master:
+
+SIGTERM, SIGINT
+  Stop the workers gracefully, then exit.
+
+SIGHUP
+  Gracefully restart all the workers.
+
+Workers which exit unexpectedly are replaced, and workers exit by themselves
+if the master dies.
+"""
+
+import os
+import time
+import signal
+import socket
+import logging
+import threading
+
+import werkzeug.serving
+
+LOGGER = logging.getLogger("jacquard.service.prefork")
+
+# Seconds to wait for workers to finish their current requests on shutdown
+# before they are killed outright.
+DEFAULT_GRACEFUL_TIMEOUT = 30
+
+# Minimum interval, in seconds, between replacements of crashed workers.
+RESPAWN_INTERVAL = 1
+
+
+def _bind_socket(host, port, backlog):
+    family = werkzeug.serving.select_address_family(host, port)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(werkzeug.serving.get_sockaddr(host, port, family))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer(object):
+    """
+    Master process of a pre-forking server.
+
+    `app` is the WSGI application, constructed before any workers are forked.
+    `workers` is the number of worker processes; if `threaded` is set, each
+    worker serves requests on a thread per request rather than serially.
+    `after_fork`, if given, is called with no arguments in each new worker
+    before it starts serving - to restart anything, such as background
+    threads, which does not survive a fork. It is called on the thread which
+    then serves requests, so that anything opened per thread is opened for
+    that thread; if `threaded` is set, requests are served on threads of
+    their own.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        host,
+        port,
+        workers,
+        threaded=False,
+        backlog=128,
+        graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT,
+        after_fork=None
+    ):
+        """Construct with app and serving options."""
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.threaded = threaded
+        self.backlog = backlog
+        self.graceful_timeout = graceful_timeout
+        self.after_fork = after_fork
+
+        self.socket = None
+        self.workers = set()
+        self.master_pid = None
+
+        self._stopping = False
+        self._restart_requested = False
+
+    def run(self):
+        """Bind, fork workers, and supervise them until told to stop."""
+        self.master_pid = os.getpid()
+        self.socket = _bind_socket(self.host, self.port, self.backlog)
+
+        LOGGER.info(
+            "Listening on %s:%s with %d worker(s)",
+            self.host,
+            self.socket.getsockname()[1],
+            self.num_workers,
+        )
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+
+        try:
+            self._spawn_workers()
+
+            while not self._stopping:
+                if self._restart_requested:
+                    self._restart_requested = False
+                    self._restart_workers()
+
+                self._reap_workers()
+
+                if not self._stopping and len(self.workers) < self.num_workers:
+                    self._spawn_workers()
+                    time.sleep(RESPAWN_INTERVAL)
+                else:
+                    time.sleep(0.5)
+        finally:
+            self._stop_workers(self.workers)
+            self.socket.close()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_restart(self, signum, frame):
+        self._restart_requested = True
+
+    def _spawn_workers(self):
+        while len(self.workers) < self.num_workers:
+            pid = os.fork()
+
+            if pid == 0:
+                exit_code = 1
+                try:
+                    self._run_worker()
+                    exit_code = 0
+                except BaseException:
+                    LOGGER.exception("Worker %d crashed", os.getpid())
+                finally:
+                    os._exit(exit_code)
+
+            LOGGER.debug("Spawned worker %d", pid)
+            self.workers.add(pid)
+
+    def _reap_workers(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+
+            if pid == 0:
+                return
+
+            if pid in self.workers:
+                self.workers.discard(pid)
+
+                if not self._stopping:
+                    LOGGER.warning(
+                        "Worker %d exited unexpectedly (status %d)", pid, status
+                    )
+
+    def _restart_workers(self):
+        LOGGER.info("Restarting workers")
+        old_workers = set(self.workers)
+        self.workers.clear()
+        self._spawn_workers()
+        self._stop_workers(old_workers)
+
+    def _stop_workers(self, workers):
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout
+        remaining = set(workers)
+
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    reaped_pid, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    reaped_pid = pid
+
+                if reaped_pid == pid:
+                    remaining.discard(pid)
+
+            if remaining:
+                time.sleep(0.1)
+
+        for pid in remaining:
+            LOGGER.warning("Worker %d did not stop in time, killing", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+    def _run_worker(self):
+        server = werkzeug.serving.make_server(
+            self.host,
+            self.port,
+            self.app,
+            threaded=self.threaded,
+            fd=self.socket.fileno(),
+        )
+        # Have `server_close` wait for in-flight requests in threaded mode.
+        server.daemon_threads = False
+
+        stop_requested = threading.Event()
+
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.set())
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        serving = threading.Event()
+        after_fork_errors = []
+
+        def serve():
+            try:
+                if self.after_fork is not None:
+                    self.after_fork()
+            except BaseException as e:
+                after_fork_errors.append(e)
+                return
+
+            serving.set()
+            server.serve_forever()
+
+        # `shutdown` must be called from a different thread than the one
+        # running `serve_forever`, so requests are served on a secondary
+        # thread and the main thread waits for signals.
+        serving_thread = threading.Thread(
+            name="Jacquard-Worker", target=serve, daemon=True
+        )
+        serving_thread.start()
+
+        LOGGER.debug("Worker %d serving", os.getpid())
+
+        while not stop_requested.wait(timeout=1):
+            if not serving_thread.is_alive():
+                break
+
+            # Orphaned workers are reparented, so would otherwise keep serving
+            # on the inherited socket indefinitely.
+            if os.getppid() != self.master_pid:
+                LOGGER.warning("Master exited, stopping worker %d", os.getpid())
+                break
+
+        # `shutdown` waits for `serve_forever` to finish, so would never return
+        # if it had not started.
+        if serving.is_set():
+            server.shutdown()
+
+        server.server_close()
+
+        if after_fork_errors:
+            raise after_fork_errors[0]
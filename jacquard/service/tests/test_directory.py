@@ -0,0 +1,76 @@
+import datetime
+from unittest.mock import Mock
+
+import dateutil.tz
+
+from jacquard.service import RequestDirectory
+from jacquard.directory.base import UserEntry
+from jacquard.directory.dummy import DummyDirectory
+
+
+def get_directory():
+    now = datetime.datetime.now(dateutil.tz.tzutc())
+    backend = DummyDirectory(
+        users=(
+            UserEntry(id=1, join_date=now, tags=()),
+            UserEntry(id=2, join_date=now, tags=("foo",)),
+        )
+    )
+    backend.lookup = Mock(wraps=backend.lookup)
+    backend.lookup_many = Mock(wraps=backend.lookup_many)
+    return backend, RequestDirectory(backend)
+
+
+def test_lookup_goes_to_backend_once_per_user():
+    backend, directory = get_directory()
+
+    assert directory.lookup(1).id == 1
+    assert directory.lookup(1).id == 1
+
+    backend.lookup.assert_called_once_with(1)
+    assert directory.backend_calls == 1
+    assert directory.saved_calls == 1
+
+
+def test_lookup_remembers_missing_users():
+    backend, directory = get_directory()
+
+    assert directory.lookup(3) is None
+    assert directory.lookup(3) is None
+
+    assert backend.lookup.call_count == 1
+
+
+def test_prefetch_batches_unseen_users():
+    backend, directory = get_directory()
+
+    directory.lookup(1)
+    directory.prefetch([1, 2, 2, 3])
+
+    backend.lookup_many.assert_called_once_with([2, 3])
+    backend.lookup.reset_mock()
+    assert directory.lookup(2).id == 2
+    backend.lookup.assert_not_called()
+
+
+def test_prefetch_of_seen_users_does_not_go_to_backend():
+    backend, directory = get_directory()
+
+    directory.prefetch([1, 2])
+    directory.prefetch([2, 1])
+
+    assert backend.lookup_many.call_count == 1
+    assert directory.backend_calls == 1
+
+
+def test_lookup_many_counts_seen_users_as_saved():
+    backend, directory = get_directory()
+
+    directory.lookup(1)
+    users = directory.lookup_many([1, 2, 3])
+
+    assert users[1].id == 1
+    assert users[2].id == 2
+    assert users[3] is None
+    assert directory.backend_calls == 2
+    assert directory.saved_calls == 1
@@ -1,18 +1,23 @@
+import gzip
 import json
+import time
 import datetime
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock, patch
 
 import dateutil.tz
 import werkzeug.test
 from werkzeug.datastructures import MultiDict
 
-from jacquard.service import get_wsgi_app
+from jacquard.buckets import NUM_BUCKETS, release
 from jacquard.storage.dummy import DummyStore
 from jacquard.directory.base import UserEntry
+from jacquard.constraints import Constraints
 from jacquard.directory.dummy import DummyDirectory
+from jacquard.service import READINESS, ResponseCompressor, get_wsgi_app
+from jacquard.service.endpoints import ExperimentPartitionStream
 
 
-def get_test_client():
+def get_test_client(**kwargs):
     config = Mock()
     config.storage = DummyStore(
         "",
@@ -35,7 +40,7 @@ def get_test_client():
         )
     )
 
-    wsgi = get_wsgi_app(config)
+    wsgi = get_wsgi_app(config, **kwargs)
     return werkzeug.test.Client(wsgi)
 
 
@@ -112,8 +117,220 @@ def test_experiment_partition():
     assert set(result["branches"].keys()) == {"bar"}
 
 
+def test_experiment_partition_batches_directory_lookups():
+    params = MultiDict([("u", "1"), ("u", "2"), ("u", "1"), ("u", "4")])
+
+    def missing_users(self, user_ids):
+        return {user_id: None for user_id in user_ids}
+
+    with patch.object(
+        DummyDirectory, "lookup_many", autospec=True, side_effect=missing_users
+    ) as lookup_many:
+        post("/experiments/foo/partition", params)
+
+    lookup_many.assert_called_once_with(ANY, ["1", "2", "4"])
+
+
 def test_experiment_partition_on_missing_experiment_gets_404():
     params = MultiDict([("u", "1"), ("u", "2"), ("u", "3"), ("u", "4")])
     client = get_test_client()
     _, status, _ = client.post("/experiments/bar/partition", data=params)
     assert status == "404 NOT FOUND"
+
+
+def test_small_responses_are_not_compressed():
+    _, _, headers = get_test_client().get(
+        "/defaults", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in headers
+
+
+def test_responses_are_gzipped_when_accepted():
+    client = get_test_client(compressor=ResponseCompressor(minimum_size=0))
+    data, status, headers = client.get("/defaults", headers={"Accept-Encoding": "gzip"})
+    assert status == "200 OK"
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(b"".join(data)).decode("utf-8")) == {
+        "pony": "gravity"
+    }
+
+
+def test_responses_are_not_compressed_without_accept_encoding():
+    client = get_test_client(compressor=ResponseCompressor(minimum_size=0))
+    _, _, headers = client.get("/defaults")
+    assert "Content-Encoding" not in headers
+    assert headers["Vary"] == "Accept-Encoding"
+
+
+def test_compressed_responses_are_cached_for_cacheable_endpoints():
+    compressor = ResponseCompressor(minimum_size=0)
+    client = get_test_client(compressor=compressor)
+    client.get("/defaults", headers={"Accept-Encoding": "gzip"})
+    client.get("/users/1", headers={"Accept-Encoding": "gzip"})
+    assert len(compressor._cache) == 1
+
+
+def get_launched_test_client():
+    data = {
+        "active-experiments": ["foo"],
+        "experiments/foo": {
+            "id": "foo",
+            "constraints": {"excluded_tags": ["excluded"]},
+            "branches": [{"id": "bar", "settings": {"pony": "horse"}}],
+        },
+        "overrides/5": {"pony": "zebra"},
+    }
+    release(
+        data,
+        "foo",
+        Constraints(excluded_tags=["excluded"]),
+        [("bar", NUM_BUCKETS, {"pony": "horse"})],
+    )
+
+    config = Mock()
+    config.storage = DummyStore("", data=data)
+    now = datetime.datetime.now(dateutil.tz.tzutc())
+    config.directory = DummyDirectory(
+        users=(
+            UserEntry(id=1, join_date=now, tags=("excluded",)),
+            UserEntry(id=2, join_date=now, tags=()),
+            UserEntry(id=3, join_date=now, tags=()),
+            UserEntry(id=5, join_date=now, tags=()),
+        )
+    )
+    return werkzeug.test.Client(get_wsgi_app(config))
+
+
+def test_experiment_partition_stream():
+    client = get_launched_test_client()
+    data, status, headers = client.post(
+        "/experiments/foo/partition-stream", data=b"1\n2\n3\n4\n5\n"
+    )
+    assert status == "200 OK"
+    assert headers["Content-Type"] == "application/x-ndjson"
+
+    records = [json.loads(line) for line in b"".join(data).splitlines()]
+    assert records == [
+        {"user": "2", "branch": "bar"},
+        {"user": "3", "branch": "bar"},
+    ]
+
+
+def test_experiment_partition_stream_matches_partition():
+    client = get_launched_test_client()
+    user_ids = [str(x) for x in range(1, 7)]
+
+    data, _, _ = client.post(
+        "/experiments/foo/partition", data=MultiDict([("u", x) for x in user_ids])
+    )
+    partition = json.loads(b"".join(data).decode("utf-8"))
+
+    data, _, _ = client.post(
+        "/experiments/foo/partition-stream",
+        data="".join(x + "\n" for x in user_ids).encode("utf-8"),
+    )
+    streamed = {}
+
+    for line in b"".join(data).splitlines():
+        record = json.loads(line)
+        streamed.setdefault(record["branch"], []).append(record["user"])
+
+    assert streamed == partition["branches"]
+
+
+def test_experiment_partition_stream_uses_one_transaction():
+    client = get_launched_test_client()
+
+    with patch.object(ExperimentPartitionStream, "chunk_size", 2), patch.object(
+        DummyStore, "begin", autospec=True, side_effect=DummyStore.begin
+    ) as begin, patch.object(
+        DummyStore, "rollback", autospec=True, side_effect=DummyStore.rollback
+    ) as rollback:
+        data, _, _ = client.post(
+            "/experiments/foo/partition-stream", data=b"1\n2\n3\n4\n5\n"
+        )
+        b"".join(data)
+        data.close()
+
+    assert begin.call_count == 1
+    assert rollback.call_count == 1
+
+
+def test_experiment_partition_stream_replaces_invalid_utf8():
+    client = get_launched_test_client()
+    data, status, _ = client.post(
+        "/experiments/foo/partition-stream", data=b"\xff\xfe\n2\n"
+    )
+    assert status == "200 OK"
+
+    records = [json.loads(line) for line in b"".join(data).splitlines()]
+    assert {"user": "2", "branch": "bar"} in records
+
+
+def test_get_on_experiment_partition_stream_gets_405():
+    assert (
+        get_status("/experiments/foo/partition-stream")[0] == "405 METHOD NOT ALLOWED"
+    )
+
+
+def test_experiment_partition_stream_on_missing_experiment_gets_404():
+    client = get_test_client()
+    _, status, _ = client.post("/experiments/bar/partition-stream", data=b"1\n")
+    assert status == "404 NOT FOUND"
+
+
+def test_metrics_report_request_latency():
+    client = get_test_client()
+    client.get("/defaults")
+
+    data, status, headers = client.get("/metrics")
+    assert status == "200 OK"
+    assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    metrics = b"".join(data).decode("utf-8")
+    assert (
+        'jacquard_http_request_duration_seconds_count{endpoint="defaults",status="200"}'
+        in metrics
+    )
+
+
+def test_health_reports_storage():
+    status, description = get_status("/health")
+    description = json.loads(description.decode("utf-8"))
+
+    assert status == "200 OK"
+    assert description["healthy"]
+    assert description["storage"] == {"healthy": True}
+
+
+def test_health_is_unhealthy_when_storage_is():
+    with patch.object(DummyStore, "health", return_value={"healthy": False}):
+        status, _ = get_status("/health")
+
+    assert status == "503 SERVICE UNAVAILABLE"
+
+
+def test_health_is_unhealthy_when_storage_lags():
+    last_synced = time.time() - 60
+    storage_health = {"healthy": True, "last_synced": last_synced}
+
+    with patch.object(DummyStore, "health", return_value=storage_health):
+        lagging_status, _ = get_status("/health?max_lag=30")
+        status, _ = get_status("/health?max_lag=120")
+
+    assert lagging_status == "503 SERVICE UNAVAILABLE"
+    assert status == "200 OK"
+
+
+def test_health_does_not_open_storage_before_warm_up_does():
+    READINESS.start()
+
+    try:
+        with patch.object(DummyStore, "health") as storage_health:
+            status, description = get_status("/health")
+    finally:
+        READINESS.finish()
+
+    storage_health.assert_not_called()
+    assert status == "503 SERVICE UNAVAILABLE"
+    assert json.loads(description.decode("utf-8"))["storage"] is None
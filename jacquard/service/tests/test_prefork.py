@@ -0,0 +1,318 @@
+import os
+import time
+import signal
+import socket
+import threading
+import multiprocessing
+import urllib.request
+from unittest.mock import ANY, Mock, patch
+
+import pytest
+
+from jacquard.cli import main
+from jacquard.storage.dummy import DummyStore
+from jacquard.service.prefork import PreforkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+AFTER_FORK_CALLS = []
+
+
+def app(environ, start_response):
+    path = environ["PATH_INFO"]
+
+    if path == "/crash":
+        os._exit(1)
+
+    if path == "/hang":
+        time.sleep(60)
+
+    if path == "/after-fork-calls":
+        body = str(len(AFTER_FORK_CALLS))
+    elif path == "/after-fork-thread":
+        body = str(int(AFTER_FORK_CALLS == [threading.get_ident()]))
+    else:
+        body = str(os.getpid())
+
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [body.encode("ascii")]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(port, path="/"):
+    url = "http://127.0.0.1:{port}{path}".format(port=port, path=path)
+
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return int(response.read())
+
+
+def wait_for_worker(port, *, exclude=(), timeout=10):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            pid = get(port)
+        except OSError:
+            pass
+        else:
+            if pid not in exclude:
+                return pid
+
+        time.sleep(0.1)
+
+    raise AssertionError("No worker responded in time")
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+
+    # Orphaned workers may be left as zombies if nothing reaps them
+    try:
+        with open("/proc/{pid}/stat".format(pid=pid)) as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def wait_for_exit(pid, timeout=10):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if not is_running(pid):
+            return
+
+        time.sleep(0.1)
+
+    raise AssertionError("Process {pid} did not exit".format(pid=pid))
+
+
+@pytest.fixture
+def start_server():
+    masters = []
+
+    def start(**kwargs):
+        port = free_port()
+        server = PreforkServer(app, host="127.0.0.1", port=port, **kwargs)
+
+        master = multiprocessing.get_context("fork").Process(target=server.run)
+        master.start()
+        masters.append(master)
+
+        return master, port
+
+    yield start
+
+    # Stop gracefully so that workers do not outlive the test
+    for master in masters:
+        if master.is_alive():
+            os.kill(master.pid, signal.SIGTERM)
+            master.join(timeout=10)
+
+        if master.is_alive():
+            master.kill()
+            master.join()
+
+
+def test_workers_serve_requests(start_server):
+    master, port = start_server(workers=2)
+
+    worker_pid = wait_for_worker(port)
+
+    assert worker_pid != master.pid
+    assert worker_pid != os.getpid()
+
+
+def test_sigterm_stops_master_and_workers(start_server):
+    master, port = start_server(workers=2)
+    worker_pid = wait_for_worker(port)
+
+    os.kill(master.pid, signal.SIGTERM)
+    master.join(timeout=10)
+
+    assert master.exitcode == 0
+    wait_for_exit(worker_pid)
+
+
+def test_workers_exit_when_master_is_killed(start_server):
+    master, port = start_server(workers=1)
+    worker_pid = wait_for_worker(port)
+
+    master.kill()
+    master.join()
+
+    wait_for_exit(worker_pid)
+
+
+def test_crashed_workers_are_replaced(start_server):
+    _, port = start_server(workers=1)
+    worker_pid = wait_for_worker(port)
+
+    with pytest.raises(OSError):
+        get(port, "/crash")
+
+    assert wait_for_worker(port, exclude={worker_pid}) != worker_pid
+    wait_for_exit(worker_pid)
+
+
+def test_sighup_restarts_workers(start_server):
+    master, port = start_server(workers=1)
+    worker_pid = wait_for_worker(port)
+
+    os.kill(master.pid, signal.SIGHUP)
+
+    assert wait_for_worker(port, exclude={worker_pid}) != worker_pid
+    wait_for_exit(worker_pid)
+    assert master.is_alive()
+
+
+def test_workers_which_do_not_stop_in_time_are_killed(start_server):
+    master, port = start_server(workers=1, graceful_timeout=1)
+    worker_pid = wait_for_worker(port)
+
+    def hang():
+        try:
+            get(port, "/hang")
+        except OSError:
+            pass
+
+    threading.Thread(target=hang, daemon=True).start()
+    time.sleep(0.5)
+
+    start_time = time.monotonic()
+    os.kill(master.pid, signal.SIGTERM)
+    master.join(timeout=20)
+    stop_time = time.monotonic() - start_time
+
+    assert master.exitcode == 0
+    assert 1 <= stop_time < 10
+    wait_for_exit(worker_pid)
+
+
+def record_after_fork():
+    AFTER_FORK_CALLS.append(threading.get_ident())
+
+
+def test_after_fork_is_called_in_workers(start_server):
+    _, port = start_server(workers=1, after_fork=record_after_fork)
+    wait_for_worker(port)
+
+    assert get(port, "/after-fork-calls") == 1
+    assert AFTER_FORK_CALLS == []
+
+
+def test_after_fork_is_called_on_the_serving_thread(start_server):
+    _, port = start_server(workers=1, after_fork=record_after_fork)
+    wait_for_worker(port)
+
+    assert get(port, "/after-fork-thread") == 1
+
+
+def fail_after_fork():
+    raise RuntimeError("Failed")
+
+
+def test_workers_exit_when_after_fork_fails(start_server):
+    master, port = start_server(workers=1, after_fork=fail_after_fork)
+    time.sleep(1)
+
+    with pytest.raises(OSError):
+        get(port)
+
+    assert master.is_alive()
+
+
+def test_rejects_zero_workers():
+    with pytest.raises(ValueError):
+        PreforkServer(app, host="127.0.0.1", port=0, workers=0)
+
+
+def get_config():
+    config = Mock()
+    config.storage = DummyStore("", data={})
+    return config
+
+
+def test_serve_passes_options_to_server():
+    config = get_config()
+
+    with patch("jacquard.service.commands.PreforkServer") as server, patch(
+        "jacquard.service.commands.warm_up"
+    ) as warm_up:
+        main(
+            [
+                "serve",
+                "--bind",
+                "127.0.0.1",
+                "--port",
+                "8080",
+                "--workers",
+                "3",
+                "--threaded",
+                "--graceful-timeout",
+                "5",
+            ],
+            config=config,
+        )
+
+    warm_up.assert_called_once_with(config, directory=False)
+    server.assert_called_once_with(
+        ANY,
+        host="127.0.0.1",
+        port=8080,
+        workers=3,
+        threaded=True,
+        graceful_timeout=5,
+        after_fork=ANY,
+    )
+    server.return_value.run.assert_called_once_with()
+
+
+def test_serve_reinitialises_storage_and_warms_up_directory_in_workers():
+    config = get_config()
+
+    with patch("jacquard.service.commands.PreforkServer") as server, patch(
+        "jacquard.service.commands.warm_up"
+    ), patch.object(config.storage, "reinitialise_after_fork") as reinitialise:
+        main(["serve"], config=config)
+        server.call_args[1]["after_fork"]()
+
+    reinitialise.assert_called_once_with()
+    config.directory.warm_up.assert_called_once_with()
+
+
+def test_serve_without_warm_up_does_not_warm_up_directory_in_workers():
+    config = get_config()
+
+    with patch("jacquard.service.commands.PreforkServer") as server:
+        main(["serve", "--no-warm-up"], config=config)
+        server.call_args[1]["after_fork"]()
+
+    config.directory.warm_up.assert_not_called()
+
+
+def test_serve_defaults():
+    config = get_config()
+
+    with patch("jacquard.service.commands.PreforkServer") as server, patch(
+        "jacquard.service.commands.warm_up"
+    ) as warm_up:
+        main(["serve", "--no-warm-up"], config=config)
+
+    warm_up.assert_not_called()
+    server.assert_called_once_with(
+        ANY,
+        host="::1",
+        port=1212,
+        workers=os.cpu_count() or 1,
+        threaded=False,
+        graceful_timeout=30,
+        after_fork=ANY,
+    )
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import threading
+import multiprocessing
+from unittest.mock import Mock, patch
+
+import pytest
+import werkzeug.test
+
+from jacquard.service import (
+    READINESS,
+    warm_up,
+    get_wsgi_app,
+    warm_up_after_fork,
+    warm_up_in_background,
+)
+from jacquard.experiments import Experiment
+from jacquard.storage.dummy import DummyStore
+from jacquard.directory.dummy import DummyDirectory
+from jacquard.experiments.experiment import clear_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_readiness():
+    yield
+    READINESS.finish()
+
+
+def get_config():
+    config = Mock()
+    config.storage = DummyStore(
+        "",
+        data={
+            "defaults": {"pony": "gravity"},
+            "experiments/foo": {
+                "branches": [{"id": "bar", "settings": {"pony": "horse"}}]
+            },
+        },
+    )
+    config.directory = DummyDirectory(users=())
+    return config
+
+
+def get_ready(config):
+    client = werkzeug.test.Client(get_wsgi_app(config))
+    data, status, headers = client.get("/ready")
+    return status, json.loads(b"".join(data).decode("utf-8"))
+
+
+def test_ready_without_warm_up():
+    status, description = get_ready(get_config())
+
+    assert status == "200 OK"
+    assert description["ready"]
+
+
+def test_not_ready_while_warming_up():
+    READINESS.start()
+
+    status, description = get_ready(get_config())
+
+    assert status == "503 SERVICE UNAVAILABLE"
+    assert description == {"ready": False, "state": "warming", "steps": {}}
+
+
+def test_ready_after_warm_up():
+    config = get_config()
+    warm_up(config)
+
+    status, description = get_ready(config)
+
+    assert status == "200 OK"
+    assert set(description["steps"]) == {"storage", "caches", "directory"}
+
+
+def test_warm_up_can_skip_directory():
+    config = get_config()
+    config.directory = Mock()
+
+    warm_up(config, directory=False)
+
+    config.directory.warm_up.assert_not_called()
+    assert set(READINESS.to_json()["steps"]) == {"storage", "caches"}
+
+
+def test_warm_up_fills_experiment_cache():
+    clear_cache()
+    config = get_config()
+
+    warm_up(config)
+
+    with patch.object(Experiment, "from_json") as parse:
+        with config.storage.transaction(read_only=True) as store:
+            Experiment.from_store(store, "foo")
+
+    parse.assert_not_called()
+
+
+def test_failed_warm_up_is_not_ready():
+    config = get_config()
+    config.directory.warm_up = Mock(side_effect=RuntimeError("no database"))
+
+    with pytest.raises(RuntimeError):
+        warm_up(config)
+
+    status, description = get_ready(config)
+
+    assert status == "503 SERVICE UNAVAILABLE"
+    assert description["state"] == "failed"
+    assert description["error"] == "no database"
+
+
+def test_warm_up_after_fork_warms_up_directory_when_ready():
+    config = get_config()
+    config.directory = Mock()
+
+    warm_up_after_fork(config)
+
+    config.directory.warm_up.assert_called_once_with()
+    assert READINESS.is_ready()
+
+
+def _report_readiness_after_fork(config, results):
+    warm_up_after_fork(config)
+
+    deadline = time.monotonic() + 10
+
+    while not READINESS.is_ready() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    results.put(READINESS.to_json())
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_warming_up_restarts_in_workers_forked_while_warming_up():
+    config = get_config()
+    storage_opened = threading.Event()
+    release_storage = threading.Event()
+
+    def open_storage(config):
+        storage_opened.set()
+        release_storage.wait(timeout=10)
+
+    with patch("jacquard.service.warmup._open_storage", open_storage):
+        warm_up_in_background(config)
+        assert storage_opened.wait(timeout=10)
+
+        # The worker is forked while the warm-up thread is blocked, and the
+        # thread is not inherited.
+        release_storage.set()
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        worker = context.Process(
+            target=_report_readiness_after_fork, args=(config, results)
+        )
+        worker.start()
+
+    description = results.get(timeout=20)
+    worker.join(timeout=10)
+
+    assert description["ready"]
+    assert description["state"] == "ready"
@@ -0,0 +1,176 @@
+"""
+Warming up before serving.
+
+Storage and directories are otherwise opened lazily, and caches filled, by
+the first requests to need them - which makes the first requests after a
+deploy slow. Warming up does all of this ahead of time, and `READINESS`
+tracks whether it has finished, for the `/ready` endpoint.
+"""
+
+import time
+import logging
+import threading
+
+from jacquard.odm import EMPTY, Session
+from jacquard.experiments import Experiment
+from jacquard.buckets import Bucket, get_num_buckets
+
+LOGGER = logging.getLogger("jacquard.service.warmup")
+
+
+class Readiness(object):
+    """
+    Warm-up state of this process.
+
+    A process which never warms up is considered ready from the start, as
+    it would have been before warming up was possible.
+    """
+
+    def __init__(self):
+        """Construct in the ready state."""
+        self._lock = threading.Lock()
+        self.state = "ready"
+        self.step_durations = {}
+        self.error = None
+
+    def is_ready(self):
+        """Whether the process is ready to serve requests."""
+        return self.state == "ready"
+
+    def start(self):
+        """Mark warming up as started."""
+        with self._lock:
+            self.state = "warming"
+            self.step_durations = {}
+            self.error = None
+
+    def record_step(self, step, duration):
+        """Record the time taken by one step of warming up."""
+        with self._lock:
+            self.step_durations[step] = duration
+
+    def finish(self, error=None):
+        """Mark warming up as finished, possibly unsuccessfully."""
+        with self._lock:
+            if error is None:
+                self.state = "ready"
+            else:
+                self.state = "failed"
+                self.error = str(error)
+
+    def to_json(self):
+        """JSON description, as served by the `/ready` endpoint."""
+        with self._lock:
+            description = {
+                "ready": self.state == "ready",
+                "state": self.state,
+                "steps": dict(self.step_durations),
+            }
+
+            if self.error is not None:
+                description["error"] = self.error
+
+            return description
+
+
+READINESS = Readiness()
+
+
+def _open_storage(config):
+    # Opening `redis-cloned` storage blocks until the initial sync is done.
+    config.storage
+
+
+def _prime_caches(config):
+    with config.storage.transaction(read_only=True) as store:
+        store.get("defaults", {})
+
+        # Fills the cache of parsed experiments
+        for _ in Experiment.enumerate(store):
+            pass
+
+        # Fills the caches of shared settings and constraints
+        session = Session(store)
+        num_buckets = get_num_buckets(store)
+
+        for bucket in session.get_many(Bucket, range(num_buckets), default=EMPTY):
+            bucket.decoded_entries()
+
+
+def _open_directory(config):
+    config.directory.warm_up()
+
+
+def warm_up(config, *, directory=True):
+    """
+    Warm up storage, caches and the directory for a given config.
+
+    This opens storage, waiting for any initial sync; loads defaults, every
+    experiment and every bucket, filling the process-wide caches; and opens
+    the directory and its connections. Progress is reflected in `READINESS`.
+
+    `config.directory` is opened separately for each thread, so only the
+    calling thread's directory is warmed up - for the Django directory, by
+    checking a connection in to its SQLAlchemy engine's pool. Set `directory`
+    to False to skip it - for instance, before forking, since pooled
+    connections must not be shared between processes; `warm_up_after_fork`
+    then warms it up in each worker.
+    """
+    steps = [("storage", _open_storage), ("caches", _prime_caches)]
+
+    if directory:
+        steps.append(("directory", _open_directory))
+
+    READINESS.start()
+
+    try:
+        for step, fn in steps:
+            start_time = time.perf_counter()
+            fn(config)
+            duration = time.perf_counter() - start_time
+
+            LOGGER.info("Warmed up %s in %.3fs", step, duration)
+            READINESS.record_step(step, duration)
+    except Exception as e:
+        LOGGER.exception("Warming up failed")
+        READINESS.finish(error=e)
+        raise
+
+    READINESS.finish()
+
+
+def warm_up_in_background(config):
+    """
+    Warm up on a background thread, returning immediately.
+
+    `READINESS` is marked as warming up before this returns, so that a server
+    started straight afterwards reports not being ready until warming up is
+    done.
+    """
+    READINESS.start()
+
+    def run():
+        # Errors are logged and recorded in `READINESS` by `warm_up`.
+        try:
+            warm_up(config)
+        except Exception:
+            pass
+
+    thread = threading.Thread(name="Jacquard-WarmUp", target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_up_after_fork(config):
+    """
+    Finish warming up in a newly forked worker process.
+
+    Caches filled before forking are inherited, but a warm-up thread is not,
+    so if warming up had not finished it is restarted in the background.
+    Otherwise just the directory is warmed up, for the calling thread, which
+    should be the one which goes on to serve requests.
+    """
+    if READINESS.is_ready():
+        config.directory.warm_up()
+    else:
+        warm_up_in_background(config)
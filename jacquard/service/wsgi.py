@@ -1,6 +1,7 @@
 """Main WSGI application."""
 
 import json
+import time
 import logging
 
 import werkzeug.routing
@@ -8,26 +9,65 @@ import werkzeug.wrappers
 import werkzeug.exceptions
 
 from jacquard.plugin import plug_all
+from jacquard.tracing import span, add_hook
+from jacquard.metrics import Histogram
+from jacquard.service.compression import ResponseCompressor
 
 LOGGER = logging.getLogger("jacquard.service.wsgi")
 
+REQUEST_DURATION = Histogram(
+    "jacquard_http_request_duration_seconds",
+    "Time taken to handle HTTP requests, by endpoint and status code.",
+    labelnames=("endpoint", "status"),
+)
+
 
 def _get_endpoints(config):
     return {name: cls()(config) for name, cls in plug_all("http_endpoints")}
 
 
+_LOADED_TRACE_HOOKS = set()
+
+
+def _load_trace_hooks(config):
+    for name, plugin in plug_all("trace_hooks"):
+        if name in _LOADED_TRACE_HOOKS:
+            continue
+
+        add_hook(plugin()(config))
+        _LOADED_TRACE_HOOKS.add(name)
+
+
 def _get_url_map(endpoints):
     urls = [endpoint.build_rule(name) for name, endpoint in endpoints.items()]
     return werkzeug.routing.Map(urls)
 
 
-def get_wsgi_app(config):
-    """Get the main WSGI handler, by config."""
+def get_wsgi_app(config, *, compressor=None):
+    """
+    Get the main WSGI handler, by config.
+
+    Responses are compressed through `compressor`, a `ResponseCompressor`. If
+    not given, one with the default settings is used.
+
+    Any trace hooks declared as plugins are also registered here.
+    """
+    if compressor is None:
+        compressor = ResponseCompressor()
+
+    _load_trace_hooks(config)
+
     endpoints = _get_endpoints(config)
     url_map = _get_url_map(endpoints)
 
+    endpoint_names = {endpoint: name for name, endpoint in endpoints.items()}
+
     def application(environ, start_response):
         """WSGI callable."""
+        start_time = time.perf_counter()
+        endpoint_name = "unmatched"
+        status = 500
+
         try:
             urls = url_map.bind_to_environ(environ)
 
@@ -42,21 +82,46 @@ def get_wsgi_app(config):
             request = werkzeug.wrappers.Request(environ)
 
             endpoint, kwargs = urls.match()
+            endpoint_name = endpoint_names[endpoint]
 
             endpoint = endpoint.bind(reverse=reverse, request=request)
 
-            response = endpoint.handle(**kwargs)
+            with span("http.request", endpoint=endpoint_name):
+                response = endpoint.handle(**kwargs)
+
+            if isinstance(response, werkzeug.wrappers.Response):
+                # Endpoints may take full control of the response, for
+                # instance to stream it. Note that for streamed responses,
+                # the recorded duration excludes generating the body.
+                status = response.status_code
+                return response(environ, start_response)
 
             encoded_response = (json.dumps(response) + "\n").encode("utf-8")
-            start_response(
-                "200 OK",
-                [
-                    ("Content-Type", "application/json"),
-                    ("Content-Length", str(len(encoded_response))),
-                ],
+
+            encoded_response, content_encoding = compressor.compress(
+                encoded_response,
+                request.accept_encodings,
+                cacheable=endpoint.cacheable,
             )
+
+            headers = [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(encoded_response))),
+                ("Vary", "Accept-Encoding"),
+            ]
+
+            if content_encoding is not None:
+                headers.append(("Content-Encoding", content_encoding))
+
+            status = 200
+            start_response("200 OK", headers)
             return [encoded_response]
         except werkzeug.exceptions.HTTPException as e:
+            status = e.code
             return e(environ, start_response)
+        finally:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start_time, endpoint=endpoint_name, status=status
+            )
 
     return application
@@ -1,10 +1,25 @@
 """Base class for storage engine implementations."""
 
 import abc
+import time
 import contextlib
 
+from jacquard.metrics import Counter, Histogram
 from jacquard.storage.utils import TransactionMap
 
+TRANSACTION_DURATION = Histogram(
+    "jacquard_storage_transaction_duration_seconds",
+    "Time spent in storage transactions, including commit or rollback.",
+    labelnames=("engine", "read_only"),
+)
+
+TRANSACTION_CACHE_LOOKUPS = Counter(
+    "jacquard_storage_cache_lookups_total",
+    "Key lookups within storage transactions, by whether the key had already "
+    "been read in that transaction.",
+    labelnames=("result",),
+)
+
 
 class StorageEngine(metaclass=abc.ABCMeta):
     """
@@ -81,6 +96,38 @@ class StorageEngine(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError
 
+    def get_many(self, keys):
+        """
+        Get the current values corresponding with several keys.
+
+        Returns a list with the value for each key, in order, or `None` where
+        there is no current value.
+
+        May be overloaded for efficiency - by default, calls get() for each
+        key. Only ever called in a transaction.
+        """
+        return [self.get(key) for key in keys]
+
+    def health(self):
+        """
+        Report on the health of the engine, as a JSON-compatible dict.
+
+        This must include a boolean `healthy` key, and may include others with
+        engine-specific details. It must not block on a transaction.
+
+        The default implementation always reports the engine as healthy.
+        """
+        return {"healthy": True}
+
+    def reinitialise_after_fork(self):
+        """
+        Restore the engine in a child process, after a fork.
+
+        Pre-forking servers call this in each worker. Engines which run
+        background threads, which do not survive a fork, should restart them
+        here. The default implementation does nothing.
+        """
+
     def encode_key(self, key):
         """
         Convert a given key for use in the storage engine.
@@ -122,6 +169,18 @@ class StorageEngine(metaclass=abc.ABCMeta):
         users of the API to deal with this. `Retry` is guaranteed not to be
         raised if the transaction was read-only.
         """
+        start_time = time.perf_counter()
+
+        try:
+            yield from self._run_transaction(read_only)
+        finally:
+            TRANSACTION_DURATION.observe(
+                time.perf_counter() - start_time,
+                engine=type(self).__name__,
+                read_only=read_only,
+            )
+
+    def _run_transaction(self, read_only):
         if read_only:
             self.begin_read_only()
         else:
@@ -134,6 +193,13 @@ class StorageEngine(metaclass=abc.ABCMeta):
         except Exception:
             self.rollback()
             raise
+        finally:
+            if transaction_map.cache_hits:
+                TRANSACTION_CACHE_LOOKUPS.inc(transaction_map.cache_hits, result="hit")
+            if transaction_map.cache_misses:
+                TRANSACTION_CACHE_LOOKUPS.inc(
+                    transaction_map.cache_misses, result="miss"
+                )
 
         if not transaction_map.changes and not transaction_map.deletions:
             # Don't bother running a commit if nothing actually changed
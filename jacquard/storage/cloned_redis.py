@@ -3,14 +3,17 @@
 import time
 import uuid
 import pickle
+import random
 import typing  # noqa: F401
 import logging
 import warnings
 import threading
+import urllib.parse
 
 import redis
 
 from jacquard.storage.base import StorageEngine
+from jacquard.storage.mirror import SnapshotMirror
 from jacquard.storage.exceptions import Retry
 
 LOGGER = logging.getLogger("jacquard.storage.cloned_redis")
@@ -19,15 +22,104 @@ LOGGER = logging.getLogger("jacquard.storage.cloned_redis")
 _REDIS_POOL = {}  # type: typing.Dict[str, _RedisDataPool]
 _REDIS_POOL_LOCK = threading.Lock()
 
+# Seconds between polls of the state key, in case a pub/sub message is missed.
+DEFAULT_POLL_INTERVAL = 30
+
+# Bounds, in seconds, for the backoff between attempts to reconnect pub/sub.
+DEFAULT_RECONNECT_DELAY = 1
+DEFAULT_MAX_RECONNECT_DELAY = 60
+
+# Options given in the connection string's query, rather than to Redis, with
+# their types and defaults.
+_OPTIONS = {
+    "poll_interval": (float, DEFAULT_POLL_INTERVAL),
+    "reconnect_delay": (float, DEFAULT_RECONNECT_DELAY),
+    "max_reconnect_delay": (float, DEFAULT_MAX_RECONNECT_DELAY),
+    "mirror": (str, None),
+}
+
+
+def _parse_connection_string(connection_string):
+    """Split a connection string into a Redis URL and a dict of options."""
+    options = {key: default for key, (_, default) in _OPTIONS.items()}
+
+    url = urllib.parse.urlsplit(connection_string)
+    query = urllib.parse.parse_qsl(url.query, keep_blank_values=True)
+
+    redis_query = []
+
+    for key, value in query:
+        if key in _OPTIONS:
+            convert, _ = _OPTIONS[key]
+            options[key] = convert(value)
+        else:
+            redis_query.append((key, value))
+
+    if len(redis_query) == len(query):
+        return connection_string, options
+
+    redis_url = url._replace(query=urllib.parse.urlencode(redis_query)).geturl()
+    return redis_url, options
+
+
+def _reconnect_delay(attempt, reconnect_delay, max_reconnect_delay):
+    """
+    Seconds to wait before a given (zero-based) attempt to reconnect.
+
+    The delay doubles with each attempt up to a maximum, and is jittered so
+    that many processes disconnected at once do not all reconnect at once.
+    """
+    # Capped so that float delays cannot overflow after many attempts
+    ceiling = min(max_reconnect_delay, reconnect_delay * 2 ** min(attempt, 32))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
 
 class _RedisDataPool(object):
 
     def __init__(self, connection_string):
         self.connection_string = connection_string
-        self.connection = redis.StrictRedis.from_url(connection_string)
+        self.redis_url, options = _parse_connection_string(connection_string)
+        self.poll_interval = options["poll_interval"]
+        self.reconnect_delay = options["reconnect_delay"]
+        self.max_reconnect_delay = options["max_reconnect_delay"]
+
+        self.connection = redis.StrictRedis.from_url(self.redis_url)
         self.lock = threading.Lock()
         self.pubsub_semaphore = threading.Semaphore(0)
 
+        self.state_key = None
+        self.current_data = {}
+
+        # Health information, as reported by `health`
+        self.pubsub_connected = False
+        self.last_synced = None
+        self.snapshot_size = 0
+        self.last_load_duration = None
+
+        # Agents sync from Redis themselves. With a mirror, only one process
+        # per host is the agent, and publishes its state for the others.
+        self.mirror = None
+        self.mirror_snapshot = None
+        self.is_agent = True
+
+        if options["mirror"] is not None:
+            self.mirror = SnapshotMirror(options["mirror"])
+            self.is_agent = self.mirror.acquire(blocking=False)
+
+        if not self.is_agent:
+            LOGGER.info("Reading state for %s from mirror", connection_string)
+            self.sync_update()
+            self.start_election_thread()
+            return
+
+        # PubSub thread also does the initial sync
+        self.start_pubsub_thread()
+
+        LOGGER.debug("Waiting for pubsub semaphore...")
+        self.pubsub_semaphore.acquire()
+        LOGGER.debug("Done with connection init on %s", connection_string)
+
+    def start_pubsub_thread(self):
         pubsub_thread = threading.Thread(
             name="Redis-PubSub:{connection_string}".format(
                 connection_string=self.connection_string
@@ -35,21 +127,90 @@ class _RedisDataPool(object):
             target=self.pubsub_thread,
             daemon=True,
         )
-        # PubSub thread also does the initial sync
-        LOGGER.debug("Launching pubsub thread for %s", connection_string)
+        LOGGER.debug("Launching pubsub thread for %s", self.connection_string)
         pubsub_thread.start()
 
-        LOGGER.debug("Waiting for pubsub semaphore...")
-        self.pubsub_semaphore.acquire()
-        LOGGER.debug("Done with connection init on %s", connection_string)
+    def start_election_thread(self):
+        election_thread = threading.Thread(
+            name="Redis-Mirror:{connection_string}".format(
+                connection_string=self.connection_string
+            ),
+            target=self.election_thread,
+            daemon=True,
+        )
+        election_thread.start()
+
+    def election_thread(self):
+        # Wait for the current agent to exit, then take over from it.
+        self.mirror.acquire()
+        LOGGER.info("Became mirror agent for %s", self.connection_string)
+
+        with self.lock:
+            self.is_agent = True
+
+        self.start_pubsub_thread()
+
+    def reinitialise_after_fork(self):
+        # Threads do not survive a fork, and the lock may have been held by
+        # one of them at the time. The data already synchronised are kept,
+        # and a fresh pubsub thread resumes keeping them up to date - unless
+        # there is a mirror, whose agent lock stays with the parent.
+        self.lock = threading.Lock()
+        self.pubsub_semaphore = threading.Semaphore(0)
+        self.pubsub_connected = False
+
+        if self.mirror is not None:
+            self.is_agent = False
+            self.start_election_thread()
+        else:
+            self.start_pubsub_thread()
+
+    def refresh_from_mirror(self):
+        # Adopt the agent's latest snapshot, if it has changed since it was
+        # last adopted. Until then, state loaded or committed by this process
+        # is kept, which may be newer.
+        snapshot = self.mirror.snapshot()
+
+        if snapshot is None:
+            return
+
+        if snapshot is not self.mirror_snapshot:
+            self.mirror_snapshot = snapshot
+            self.state_key = snapshot.state_key
+            self.current_data = snapshot
+            self.snapshot_size = snapshot.size
+
+        if self.current_data is snapshot:
+            self.last_synced = self.mirror.last_modified
 
     def sync_update(self):
         with self.lock:
-            self.state_key = self.connection.get(b"jacquard-store:state-key")
-            LOGGER.debug("Got state key: %s", self.state_key)
+            # Readers only fall back to loading the state themselves if the
+            # mirror has not caught up, such as before the agent first syncs.
+            if not self.is_agent:
+                self.refresh_from_mirror()
+
+            state_key = self.connection.get(b"jacquard-store:state-key")
+            LOGGER.debug("Got state key: %s", state_key)
+
+            if state_key == self.state_key and self.last_synced is not None:
+                # Already up to date, so there is no need to fetch the data
+                self.mark_synced()
+                return
+
+            self.state_key = state_key
             self.load_state()
 
+    def mark_synced(self):
+        # Record that the local state was confirmed to be current.
+        self.last_synced = time.time()
+
+        if self.is_agent and self.mirror is not None:
+            self.mirror.publish(self.state_key, self.current_data)
+
     def load_state(self):
+        start_time = time.perf_counter()
+
         if self.state_key:
             raw_data = self.connection.get(b"jacquard-store:state:%s" % self.state_key)
 
@@ -59,13 +220,36 @@ class _RedisDataPool(object):
                     "{state_key}".format(state_key=self.state_key)
                 )
                 self.current_data = {}
+                self.snapshot_size = 0
             else:
                 self.current_data = pickle.loads(raw_data)
+                self.snapshot_size = len(raw_data)
         else:
             self.current_data = {}
+            self.snapshot_size = 0
+
+        self.last_load_duration = time.perf_counter() - start_time
+        self.mark_synced()
+
+    def health(self):
+        with self.lock:
+            if not self.is_agent:
+                self.refresh_from_mirror()
+
+            return {
+                "state_key": (
+                    self.state_key.decode("ascii") if self.state_key else None
+                ),
+                "role": "agent" if self.is_agent else "reader",
+                "pubsub_connected": self.pubsub_connected,
+                "last_synced": self.last_synced,
+                "snapshot_size": self.snapshot_size,
+                "last_load_duration": self.last_load_duration,
+            }
 
     def pubsub_thread(self):
         released_semaphore = False
+        reconnect_attempt = 0
 
         while True:
             try:
@@ -81,6 +265,8 @@ class _RedisDataPool(object):
                 LOGGER.debug("Resync finished.")
 
                 LOGGER.info("Connected to Redis pub/sub and synchronised state")
+                self.pubsub_connected = True
+                reconnect_attempt = 0
 
                 if not released_semaphore:
                     self.pubsub_semaphore.release()
@@ -88,7 +274,7 @@ class _RedisDataPool(object):
                     released_semaphore = True
 
                 while True:
-                    message = subscriber.get_message(timeout=30)
+                    message = subscriber.get_message(timeout=self.poll_interval)
 
                     LOGGER.debug("`get_message` finished")
 
@@ -105,6 +291,9 @@ class _RedisDataPool(object):
                             # Use sync_update to recheck the key with the
                             # lock taken
                             self.sync_update()
+                        else:
+                            with self.lock:
+                                self.mark_synced()
 
                         continue
 
@@ -138,27 +327,41 @@ class _RedisDataPool(object):
                     with self.lock:
                         new_key = message["data"]
                         if new_key == self.state_key:
+                            self.mark_synced()
                             continue
 
                         LOGGER.debug("Received state delta push: %s", new_key)
                         self.state_key = new_key
                         self.load_state()
             except redis.exceptions.ConnectionError:
+                self.pubsub_connected = False
+
+                delay = _reconnect_delay(
+                    reconnect_attempt, self.reconnect_delay, self.max_reconnect_delay
+                )
+                reconnect_attempt += 1
+
                 LOGGER.warning(
-                    "Disconnected from pub/sub on %s, " "attempting reconnect in 10s",
+                    "Disconnected from pub/sub on %s, attempting reconnect in %.1fs",
                     self.connection_string,
+                    delay,
                 )
                 # Wait and retry
-                time.sleep(10)
+                time.sleep(delay)
 
     def get_state(self):
         with self.lock:
+            if not self.is_agent:
+                self.refresh_from_mirror()
+
             return self.state_key, self.current_data
 
-    def set_state(self, state_key, data):
+    def set_state(self, state_key, data, snapshot_size):
         with self.lock:
             self.state_key = state_key
             self.current_data = data
+            self.snapshot_size = snapshot_size
+            self.mark_synced()
 
 
 def _get_shared_data(connection_string):
@@ -174,6 +377,14 @@ def _get_shared_data(connection_string):
         return new_pool
 
 
+def _reinitialise_pools_after_fork():
+    global _REDIS_POOL_LOCK
+    _REDIS_POOL_LOCK = threading.Lock()
+
+    for pool in _REDIS_POOL.values():
+        pool.reinitialise_after_fork()
+
+
 def resync_all_connections():
     """For testing purposes, immediately resync all connections."""
     with _REDIS_POOL_LOCK:
@@ -202,6 +413,28 @@ class ClonedRedisStore(StorageEngine, threading.local):
         The connection string is given as a URL configuring the connection.
         This is backed by `python-redis`, and the URL follows the format
         of `redis.StrictRedis.from_url`.
+
+        The following extra query parameters are also accepted:
+
+        `poll_interval`
+          Seconds between polls for changes, in case a pub/sub message is
+          missed (default 30).
+
+        `reconnect_delay`, `max_reconnect_delay`
+          Bounds on the seconds to wait before reconnecting pub/sub after a
+          disconnection (defaults 1 and 60). The delay doubles with each
+          failed attempt, with random jitter.
+
+        `mirror`
+          Path of a snapshot file through which to share the data between
+          the processes on a host, preferably on a `tmpfs`. One process syncs
+          from Redis and writes the snapshot, and the others memory-map it,
+          so that neither the data nor the Redis traffic are duplicated per
+          process. If the syncing process exits, another takes over.
+
+          Readers still check the state key in Redis when they first connect
+          and after a write conflict. Only if the mirror is behind it then do
+          they load the full state from Redis themselves.
         """
         self.connection_string = connection_string
         self.pool = _get_shared_data(connection_string)
@@ -216,7 +449,7 @@ class ClonedRedisStore(StorageEngine, threading.local):
     def commit(self, updates, deletions):
         """Commit transaction."""
         # Make synchronous connection
-        connection = redis.StrictRedis.from_url(self.connection_string)
+        connection = redis.StrictRedis.from_url(self.pool.redis_url)
 
         # Validate that the state key has not changed
         connection.watch(b"jacquard-store:state-key")
@@ -236,7 +469,8 @@ class ClonedRedisStore(StorageEngine, threading.local):
 
         new_state_key = str(uuid.uuid4()).encode("ascii")
 
-        # Write back new state
+        # Write back new state, copied since the current state is shared
+        self.transaction_data = dict(self.transaction_data)
         self.transaction_data.update(updates)
 
         for deletion in deletions:
@@ -265,7 +499,7 @@ class ClonedRedisStore(StorageEngine, threading.local):
             del self.state_key
             raise Retry()
 
-        self.pool.set_state(new_state_key, self.transaction_data)
+        self.pool.set_state(new_state_key, self.transaction_data, len(raw_data))
 
         LOGGER.debug("Committed state delta: %s -> %s", self.state_key, new_state_key)
 
@@ -284,3 +518,39 @@ class ClonedRedisStore(StorageEngine, threading.local):
     def keys(self):
         """All keys."""
         return self.transaction_data.keys()
+
+    def health(self):
+        """
+        Report on replication from Redis.
+
+        As well as the general `healthy` flag, this gives the local state key;
+        the Unix time at which the local state was last confirmed current, by
+        a load, a pub/sub message or a poll; whether the pub/sub connection is
+        up; and the size in bytes of the last snapshot, and the seconds taken
+        to load it.
+
+        Healthy means the pub/sub connection is up, and so changes are being
+        received as they happen. For processes reading a mirror, whose `role`
+        is `reader` rather than `agent`, it instead means that the agent has
+        confirmed the mirror current within the last two poll intervals.
+        """
+        health = self.pool.health()
+
+        if health["role"] == "agent":
+            healthy = health["pubsub_connected"]
+        else:
+            healthy = (
+                health["last_synced"] is not None
+                and time.time() - health["last_synced"] <= 2 * self.pool.poll_interval
+            )
+
+        return {"healthy": healthy, **health}
+
+    def reinitialise_after_fork(self):
+        """
+        Restart syncing in a child process, after a fork.
+
+        The data already synchronised are kept. Pools are shared by every
+        store in the process, so this restarts them all.
+        """
+        _reinitialise_pools_after_fork()
@@ -5,6 +5,14 @@ import threading
 
 from jacquard.storage.base import StorageEngine
 
+# Keys per query in `get_many`, kept within SQLite's limit on the number of
+# parameters in a statement.
+GET_MANY_BATCH_SIZE = 500
+
+GET_MANY_QUERY = """
+    SELECT "key", "value" FROM "configuration" WHERE "key" IN ({params})
+"""
+
 
 class FileStore(StorageEngine, threading.local):
     """Flat(ish)-file SQLite3-based storage engine."""
@@ -102,6 +110,20 @@ class FileStore(StorageEngine, threading.local):
         else:
             return rows[0][0]
 
+    def get_many(self, keys):
+        """Get several values, in batches of `GET_MANY_BATCH_SIZE`."""
+        values = {}
+
+        for offset in range(0, len(keys), GET_MANY_BATCH_SIZE):
+            end = offset + GET_MANY_BATCH_SIZE
+            batch = keys[offset:end]
+
+            query = GET_MANY_QUERY.format(params=", ".join("?" for _ in batch))
+
+            values.update(self.db.execute(query, batch))
+
+        return [values.get(key) for key in keys]
+
     def keys(self):
         """All keys."""
         return self._transaction_keys
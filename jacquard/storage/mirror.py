@@ -0,0 +1,219 @@
+"""
+Storage state shared between processes on one host.
+
+One process, the agent, writes each new state to a snapshot file, and the
+others memory-map it. Values are only decoded when they are looked up, so
+every process reads the same pages of the OS page cache rather than holding
+its own copy of the data. For the snapshot to stay in memory it is best kept
+on a `tmpfs` such as `/dev/shm`.
+
+The agent is whichever process holds a lock on `<path>.lock`. The lock is
+released by the OS if the agent dies, so another process can take over.
+"""
+
+import os
+import mmap
+import fcntl
+import struct
+import tempfile
+import collections.abc
+
+_MAGIC = b"JQSNAP01"
+
+# Magic, length of the state key and number of entries, followed by the
+# state key itself.
+_HEADER = struct.Struct("<8sII")
+
+# Offset and length of an entry's key, then offset and length of its value.
+# Entries are sorted by key.
+_ENTRY = struct.Struct("<QIQI")
+
+_UNPUBLISHED = object()
+
+
+def write_snapshot(path, state_key, data):
+    """
+    Write a mapping of string keys to string values to a snapshot file.
+
+    The file is replaced atomically, so processes with the previous snapshot
+    mapped keep a consistent view of it.
+    """
+    state_key = state_key or b""
+    items = sorted(
+        (key.encode("utf-8"), value.encode("utf-8")) for key, value in data.items()
+    )
+
+    index = bytearray()
+    blob = bytearray()
+    offset = _HEADER.size + len(state_key) + _ENTRY.size * len(items)
+
+    for key, value in items:
+        index += _ENTRY.pack(offset, len(key), offset + len(key), len(value))
+        blob += key
+        blob += value
+        offset += len(key) + len(value)
+
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory or ".", prefix=name + ".")
+
+    try:
+        # Readable by workers which have dropped privileges
+        os.fchmod(fd, 0o644)
+
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(state_key), len(items)))
+            f.write(state_key)
+            f.write(index)
+            f.write(blob)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Snapshot(collections.abc.Mapping):
+    """Read-only mapping over a memory-mapped snapshot."""
+
+    def __init__(self, buffer):
+        """Construct over a buffer containing a snapshot."""
+        magic, key_length, count = _HEADER.unpack_from(buffer)
+
+        if magic != _MAGIC:
+            raise ValueError("Not a Jacquard storage snapshot")
+
+        start = _HEADER.size
+        end = start + key_length
+
+        self._buffer = buffer
+        self._count = count
+        self._index_offset = end
+
+        self.state_key = bytes(buffer[start:end]) or None
+        self.size = len(buffer)
+
+    @classmethod
+    def open(cls, path):
+        """Map a snapshot file."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _entry(self, n):
+        return _ENTRY.unpack_from(self._buffer, self._index_offset + n * _ENTRY.size)
+
+    def __len__(self):
+        """Number of keys."""
+        return self._count
+
+    def __iter__(self):
+        """Iterate over keys, in order."""
+        for n in range(self._count):
+            key_offset, key_length, _, _ = self._entry(n)
+            key_end = key_offset + key_length
+            yield self._buffer[key_offset:key_end].decode("utf-8")
+
+    def __getitem__(self, key):
+        """Look up a value, by binary search over the keys."""
+        encoded_key = key.encode("utf-8")
+
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, value_offset, value_length = self._entry(middle)
+
+            key_end = key_offset + key_length
+            candidate = self._buffer[key_offset:key_end]
+
+            if candidate < encoded_key:
+                low = middle + 1
+            elif candidate > encoded_key:
+                high = middle
+            else:
+                value_end = value_offset + value_length
+                return self._buffer[value_offset:value_end].decode("utf-8")
+
+        raise KeyError(key)
+
+
+class SnapshotMirror(object):
+    """
+    Snapshot file shared between processes, with its agent lock.
+
+    Not thread-safe: callers should serialise access.
+    """
+
+    def __init__(self, path):
+        """Construct for a given snapshot path."""
+        self.path = path
+        self.last_modified = None
+
+        # POSIX record locks are per process and are not inherited over
+        # `fork`, and are dropped if any descriptor for the file is closed,
+        # so this is kept open for the lifetime of the mirror.
+        self._lock_file = open(path + ".lock", "ab")
+
+        self._identity = None
+        self._snapshot = None
+        self._published_key = _UNPUBLISHED
+
+    def acquire(self, blocking=True):
+        """
+        Become the agent for this snapshot.
+
+        If `blocking` is False, returns whether this succeeded without
+        waiting; otherwise waits until the current agent exits.
+        """
+        flags = fcntl.LOCK_EX
+
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+
+        try:
+            fcntl.lockf(self._lock_file, flags)
+        except OSError:
+            if blocking:
+                raise
+            return False
+
+        return True
+
+    def publish(self, state_key, data):
+        """
+        Make a state available to other processes.
+
+        Only the agent should call this. If the state is already published,
+        the snapshot's modification time is just updated, to show that it is
+        still current.
+        """
+        if state_key == self._published_key:
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                pass
+            else:
+                return
+
+        write_snapshot(self.path, state_key, data)
+        self._published_key = state_key
+
+    def snapshot(self):
+        """
+        The latest published snapshot, or None if there is none.
+
+        The file is only remapped when it has been replaced. `last_modified`
+        is updated to the time it was last published.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        identity = (stat.st_dev, stat.st_ino)
+
+        if identity != self._identity:
+            self._snapshot = Snapshot.open(self.path)
+            self._identity = identity
+
+        self.last_modified = stat.st_mtime
+        return self._snapshot
@@ -70,6 +70,14 @@ class RedisStore(StorageEngine, threading.local):
             self.redis.watch(key)
         return self.redis.get(key)
 
+    def get_many(self, keys):
+        """Get several values in one round trip."""
+        if not keys:
+            return []
+        if not self.omit_watch:
+            self.redis.watch(*keys)
+        return self.redis.mget(keys)
+
     def keys(self):
         """All keys."""
         return [
@@ -64,6 +64,16 @@ class StorageGauntlet(object):
         with self.storage.transaction(read_only=True) as store:
             assert store[key] == value
 
+    def test_get_many(self):
+        with self.storage.transaction() as store:
+            store["foo"] = "foo value"
+            store["bar"] = "bar value"
+        with self.storage.transaction(read_only=True) as store:
+            assert store.get_many(["foo", "baz", "bar"]) == {
+                "foo": "foo value",
+                "bar": "bar value",
+            }
+
     @hypothesis.given(
         data=hypothesis.strategies.dictionaries(
             arbitrary_key, arbitrary_json, average_size=2
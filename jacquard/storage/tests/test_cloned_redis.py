@@ -1,12 +1,21 @@
+import time
 import logging
+import itertools
 import unittest
 import unittest.mock
 
 import pytest
 import hypothesis.strategies
 
+from jacquard.storage.mirror import SnapshotMirror
 from jacquard.storage.exceptions import Retry
-from jacquard.storage.cloned_redis import ClonedRedisStore, resync_all_connections
+from jacquard.storage.cloned_redis import (
+    _RedisDataPool,
+    ClonedRedisStore,
+    _reconnect_delay,
+    resync_all_connections,
+    _parse_connection_string,
+)
 from jacquard.storage.testing_utils import (
     StorageGauntlet,
     arbitrary_key,
@@ -60,3 +69,172 @@ def test_raises_retry_on_concurrent_write(
                 b"jacquard-store:state-key", str(replacement_state).encode("ascii")
             )
             store[key] = value2
+
+
+@pytest.mark.skipif(fakeredis is None, reason="fakeredis is not installed")
+@unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis)
+def test_health_reports_replication_state():
+    storage = cloned_redis_storage_engine()
+
+    with storage.transaction() as store:
+        store["foo"] = "bar"
+
+    health = storage.health()
+
+    assert health["healthy"]
+    assert health["pubsub_connected"]
+    assert health["state_key"] is not None
+    assert health["snapshot_size"] > 0
+    assert health["last_synced"] <= time.time()
+
+
+@pytest.mark.skipif(fakeredis is None, reason="fakeredis is not installed")
+@unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis)
+def test_resync_skips_fetch_if_state_key_unchanged():
+    storage = cloned_redis_storage_engine()
+
+    with storage.transaction() as store:
+        store["foo"] = "bar"
+
+    with unittest.mock.patch.object(storage.pool, "load_state") as load_state:
+        resync_all_connections()
+
+    load_state.assert_not_called()
+
+
+@pytest.mark.skipif(fakeredis is None, reason="fakeredis is not installed")
+@unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis)
+def test_resync_fetches_if_state_key_changed():
+    storage = cloned_redis_storage_engine()
+
+    with storage.transaction() as store:
+        store["foo"] = "bar"
+
+    fakeredis.FakeStrictRedis().flushall()
+    resync_all_connections()
+
+    with storage.transaction(read_only=True) as store:
+        assert "foo" not in store
+
+
+def test_options_are_parsed_out_of_connection_string():
+    redis_url, options = _parse_connection_string(
+        "redis://localhost/0?poll_interval=5&socket_timeout=2&reconnect_delay=0.5"
+    )
+
+    assert redis_url == "redis://localhost/0?socket_timeout=2"
+    assert options["poll_interval"] == 5
+    assert options["reconnect_delay"] == 0.5
+
+
+def test_connection_string_without_options_is_unchanged():
+    redis_url, _ = _parse_connection_string("<fake redis connection>")
+    assert redis_url == "<fake redis connection>"
+
+
+def test_reconnect_delay_grows_with_jitter_up_to_maximum():
+    for attempt in range(10):
+        ceiling = min(60, 2 ** attempt)
+        delays = [_reconnect_delay(attempt, 1, 60) for _ in range(20)]
+
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+
+
+def test_reconnect_delay_is_bounded_after_many_attempts():
+    for attempt in (1000, 10 ** 6):
+        assert 30 <= _reconnect_delay(attempt, 0.5, 60) <= 60
+
+
+def test_reconnect_delays_are_jittered():
+    delays = {_reconnect_delay(3, 1, 60) for _ in itertools.repeat(None, 20)}
+    assert len(delays) > 1
+
+
+def mirrored_storage_engines(path):
+    fakeredis.FakeStrictRedis().flushall()
+    resync_all_connections()
+
+    connection_string = "<fake redis connection>?mirror={path}".format(path=path)
+
+    with unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis):
+        agent = ClonedRedisStore(connection_string)
+
+        # Within one process the agent lock is always granted, so the reader
+        # role is forced.
+        with unittest.mock.patch.object(
+            SnapshotMirror, "acquire", return_value=False
+        ), unittest.mock.patch.object(_RedisDataPool, "start_election_thread"):
+            reader = ClonedRedisStore(connection_string + "&poll_interval=30")
+
+    return agent, reader
+
+
+@pytest.mark.skipif(fakeredis is None, reason="fakeredis is not installed")
+@unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis)
+def test_reader_sees_agent_writes_through_mirror(tmpdir):
+    agent, reader = mirrored_storage_engines(tmpdir.join("snapshot"))
+
+    with agent.transaction() as store:
+        store["foo"] = "bar"
+
+    with reader.transaction(read_only=True) as store:
+        assert store["foo"] == "bar"
+
+    assert reader.pool.current_data is reader.pool.mirror_snapshot
+
+    health = reader.health()
+
+    assert health["healthy"]
+    assert health["role"] == "reader"
+    assert health["state_key"] == agent.health()["state_key"]
+
+
+@pytest.mark.skipif(fakeredis is None, reason="fakeredis is not installed")
+@unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis)
+def test_reader_sees_own_writes_before_mirror(tmpdir):
+    agent, reader = mirrored_storage_engines(tmpdir.join("snapshot"))
+
+    with reader.transaction() as store:
+        store["foo"] = "bar"
+
+    with reader.transaction(read_only=True) as store:
+        assert store["foo"] == "bar"
+
+    resync_all_connections()
+
+    with agent.transaction(read_only=True) as store:
+        assert store["foo"] == "bar"
+
+    with reader.transaction(read_only=True) as store:
+        assert store["foo"] == "bar"
+
+    assert reader.pool.current_data is reader.pool.mirror_snapshot
+
+
+@pytest.mark.skipif(fakeredis is None, reason="fakeredis is not installed")
+@unittest.mock.patch("redis.StrictRedis", fakeredis.FakeStrictRedis)
+def test_reader_does_not_load_state_while_mirror_is_current(tmpdir):
+    agent, reader = mirrored_storage_engines(tmpdir.join("snapshot"))
+
+    with unittest.mock.patch.object(reader.pool, "load_state") as load_state:
+        with agent.transaction() as store:
+            store["foo"] = "bar"
+
+        resync_all_connections()
+
+        with reader.transaction() as store:
+            assert store["foo"] == "bar"
+            store["foo"] = "baz"
+
+        resync_all_connections()
+
+        with agent.transaction() as store:
+            assert store["foo"] == "baz"
+            store["foo"] = "quux"
+
+        resync_all_connections()
+
+        with reader.transaction(read_only=True) as store:
+            assert store["foo"] == "quux"
+
+    load_state.assert_not_called()
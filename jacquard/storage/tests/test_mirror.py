@@ -0,0 +1,93 @@
+import os
+import multiprocessing
+
+import pytest
+
+from jacquard.storage.mirror import Snapshot, SnapshotMirror, write_snapshot
+
+
+def test_snapshot_round_trips_data(tmpdir):
+    path = str(tmpdir.join("snapshot"))
+    data = {"foo": '"bar"', "baz": "[1, 2]", "ünïcode": '"☃"', "": "null"}
+
+    write_snapshot(path, b"state", data)
+    snapshot = Snapshot.open(path)
+
+    assert snapshot.state_key == b"state"
+    assert dict(snapshot) == data
+    assert list(snapshot) == sorted(data, key=lambda x: x.encode("utf-8"))
+
+
+def test_snapshot_lookups_of_missing_keys(tmpdir):
+    path = str(tmpdir.join("snapshot"))
+
+    write_snapshot(path, b"state", {"bar": "1", "foo": "2"})
+    snapshot = Snapshot.open(path)
+
+    assert "baz" not in snapshot
+    assert snapshot.get("zzz") is None
+
+    with pytest.raises(KeyError):
+        snapshot["aaa"]
+
+
+def test_empty_snapshot(tmpdir):
+    path = str(tmpdir.join("snapshot"))
+
+    write_snapshot(path, None, {})
+    snapshot = Snapshot.open(path)
+
+    assert snapshot.state_key is None
+    assert len(snapshot) == 0
+
+
+def test_rejects_other_files(tmpdir):
+    path = tmpdir.join("snapshot")
+    path.write_binary(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        Snapshot.open(str(path))
+
+
+def test_mirror_remaps_only_when_replaced(tmpdir):
+    mirror = SnapshotMirror(str(tmpdir.join("snapshot")))
+
+    assert mirror.snapshot() is None
+
+    mirror.publish(b"state1", {"foo": "1"})
+    first = mirror.snapshot()
+
+    assert first["foo"] == "1"
+
+    # Republishing the same state only updates the modification time
+    mirror.publish(b"state1", {"foo": "ignored"})
+    assert mirror.snapshot() is first
+
+    mirror.publish(b"state2", {"foo": "2"})
+    second = mirror.snapshot()
+
+    assert second is not first
+    assert second["foo"] == "2"
+
+    # The old snapshot stays readable
+    assert first["foo"] == "1"
+
+
+def _try_acquire(path, results):
+    results.put(SnapshotMirror(path).acquire(blocking=False))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_only_one_process_is_agent(tmpdir):
+    path = str(tmpdir.join("snapshot"))
+
+    mirror = SnapshotMirror(path)
+    assert mirror.acquire(blocking=False)
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_try_acquire, args=(path, results))
+    process.start()
+    process.join()
+
+    assert results.get() is False
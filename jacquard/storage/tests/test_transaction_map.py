@@ -13,3 +13,29 @@ def test_duplicate_accesses_continue_to_raise_keyerror():
 
     with pytest.raises(KeyError):
         transaction_map["test"]
+
+
+def test_get_many_uses_and_fills_cache():
+    store = DummyStore("", data={"foo": 1, "bar": 2})
+    transaction_map = TransactionMap(store)
+
+    transaction_map["foo"]
+
+    assert transaction_map.get_many(["foo", "bar", "baz"]) == {"foo": 1, "bar": 2}
+    assert transaction_map.cache_hits == 1
+    assert transaction_map.cache_misses == 3
+
+    transaction_map.get_many(["bar", "baz"])
+
+    assert transaction_map.cache_hits == 3
+    assert transaction_map.cache_misses == 3
+
+
+def test_get_many_respects_pending_writes():
+    store = DummyStore("", data={"foo": 1})
+    transaction_map = TransactionMap(store)
+
+    transaction_map["foo"] = 2
+    transaction_map["bar"] = 3
+
+    assert transaction_map.get_many(["foo", "bar"]) == {"foo": 2, "bar": 3}
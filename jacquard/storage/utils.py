@@ -6,8 +6,16 @@ import functools
 import collections.abc
 
 from jacquard.plugin import plug
+from jacquard.metrics import Counter
+from jacquard.tracing import HOOKS, event
 from jacquard.storage.exceptions import Retry
 
+RETRIES = Counter(
+    "jacquard_storage_retries_total",
+    "Transactions reissued due to storage conflicts, by function.",
+    labelnames=("function",),
+)
+
 
 def retrying(fn):
     """Decorator: reissues the function if it raises Retry."""
@@ -21,6 +29,7 @@ def retrying(fn):
             except Retry:
                 callable_name = getattr(fn, "__name__", "anonymous function")
                 logger.debug("Retry issued from %s, reissuing", callable_name)
+                RETRIES.inc(function=getattr(fn, "__qualname__", callable_name))
 
     return wrapper
 
@@ -53,6 +62,8 @@ class TransactionMap(collections.abc.MutableMapping):
         self.changes = {}
         self.deletions = set()
         self._cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def _get_keys(self):
         """Get all (decoded) keys from storage engine."""
@@ -72,11 +83,20 @@ class TransactionMap(collections.abc.MutableMapping):
 
     def __getitem__(self, key):
         """Lookup by key. Respects any pending changes/deletions."""
+        if HOOKS:
+            event("storage.getitem", key=key)
+
         try:
             cached_value = self._cache[key]
         except KeyError:
+            self.cache_misses += 1
+
+            if HOOKS:
+                event("storage.get", key=key, engine=type(self.store).__name__)
+
             result = self.store.get(self.store.encode_key(key))
         else:
+            self.cache_hits += 1
             if cached_value is _MISSING:
                 raise KeyError(key)
             return cached_value
@@ -95,6 +115,58 @@ class TransactionMap(collections.abc.MutableMapping):
 
         return result
 
+    def get_many(self, keys):
+        """
+        Look up several keys at once. Respects any pending changes/deletions.
+
+        Returns a dict of each key which is present to its value; missing keys
+        are omitted. Keys which have not already been read in this transaction
+        are fetched together with `StorageEngine.get_many`.
+        """
+        values = {}
+        uncached_keys = []
+
+        for key in keys:
+            try:
+                cached_value = self._cache[key]
+            except KeyError:
+                uncached_keys.append(key)
+            else:
+                self.cache_hits += 1
+                if cached_value is not _MISSING:
+                    values[key] = cached_value
+
+        if not uncached_keys:
+            return values
+
+        self.cache_misses += len(uncached_keys)
+
+        if HOOKS:
+            event(
+                "storage.get_many",
+                keys=uncached_keys,
+                engine=type(self.store).__name__,
+            )
+
+        results = self.store.get_many(
+            [self.store.encode_key(key) for key in uncached_keys]
+        )
+
+        for key, result in zip(uncached_keys, results):
+            if result is None:
+                self._cache[key] = _MISSING
+                continue
+
+            if isinstance(result, bytes):
+                result = result.decode("utf-8")
+
+            result = json.loads(result)
+
+            self._cache[key] = result
+            values[key] = result
+
+        return values
+
     def __setitem__(self, key, value):
         """Overwrite or set key."""
         self._cache[key] = value
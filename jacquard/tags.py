@@ -0,0 +1,103 @@
+"""
+Interned user tags.
+
+Tags used in constraints are interned in a process-wide vocabulary, which
+assigns each distinct tag its own bit. Sets of tags can then be represented
+as integer bitmasks, so that checking constraints against a user's tags is a
+couple of bitwise operations rather than a loop over the tags.
+
+Only constraints intern tags. Users' tags are just looked up, and those
+which no constraint mentions have no bit, so the vocabulary does not grow
+with the tags that directories happen to return.
+"""
+
+import threading
+
+
+class TagVocabulary(object):
+    """Registry of tags and their bit positions."""
+
+    def __init__(self):
+        """Construct with no tags."""
+        self._bits = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Number of distinct tags interned."""
+        return len(self._bits)
+
+    def bit(self, tag):
+        """Bit for a given tag, which is assigned on first use."""
+        try:
+            return self._bits[tag]
+        except KeyError:
+            pass
+
+        with self._lock:
+            return self._bits.setdefault(tag, 1 << len(self._bits))
+
+    def intern(self, tags):
+        """Bitmask for an iterable of tags, assigning bits to any new tags."""
+        mask = 0
+
+        for tag in tags:
+            mask |= self.bit(tag)
+
+        return mask
+
+    def mask(self, tags):
+        """Bitmask for an iterable of tags, ignoring any not yet interned."""
+        mask = 0
+
+        for tag in tags:
+            mask |= self._bits.get(tag, 0)
+
+        return mask
+
+
+VOCABULARY = TagVocabulary()
+
+
+class TagSet(frozenset):
+    """
+    Frozen set of tags, with a memoised bitmask.
+
+    Directories should use these for `UserEntry.tags`; other containers work
+    but have their bitmasks recomputed each time they are matched. The mask
+    is recomputed if tags have been interned since, in case they include some
+    of these.
+    """
+
+    __slots__ = ("_memoised_mask",)
+
+    def __new__(cls, tags=()):
+        """Construct from an iterable of tags."""
+        self = super().__new__(cls, tags)
+        self._memoised_mask = (None, 0)
+        return self
+
+    @property
+    def mask(self):
+        """Bitmask for these tags."""
+        # The vocabulary only grows, so a mask computed after reading its
+        # size is valid for at least that size.
+        vocabulary_size = len(VOCABULARY)
+        memoised_size, mask = self._memoised_mask
+
+        if memoised_size != vocabulary_size:
+            mask = VOCABULARY.mask(self)
+            self._memoised_mask = (vocabulary_size, mask)
+
+        return mask
+
+    def __repr__(self):
+        """Python reproducer."""
+        return "TagSet({tags!r})".format(tags=sorted(self))
+
+
+def tag_mask(tags):
+    """Bitmask for a container of tags, which may be a `TagSet`."""
+    if isinstance(tags, TagSet):
+        return tags.mask
+
+    return VOCABULARY.mask(tags)
@@ -1,11 +1,18 @@
 import io
 import textwrap
+import functools
 import contextlib
 import unittest.mock
 
 import pytest
 
-from jacquard.cli import CommandError, main, argument_parser
+from jacquard.cli import (
+    CommandError,
+    main,
+    argument_parser,
+    _selected_command,
+    _build_argument_parser,
+)
 from jacquard.storage.dummy import DummyStore
 
 
@@ -117,3 +124,43 @@ def test_jacquard_help_with_args_is_subcommand_help():
         main(["help", "launch"], config=config)
 
     assert stdout_reference.getvalue() == stdout_actual.getvalue()
+
+
+@pytest.mark.parametrize(
+    "args, selected",
+    (
+        ([], None),
+        (["--help"], None),
+        (["help", "launch"], None),
+        (["launch", "foo"], ("commands", "launch")),
+        (["launch", "--help"], ("commands", "launch")),
+        (["-c", "launch", "storage-dump"], ("commands", "storage-dump")),
+        (["-v", "list", "experiments"], ("commands.list", "experiments")),
+        (["list"], None),
+        (["list", "--help"], None),
+    ),
+)
+def test_selected_command(args, selected):
+    assert _selected_command(args) == selected
+
+
+def test_only_selected_command_is_loaded():
+    loaded = []
+
+    def load(name):
+        loaded.append(name)
+        return lambda: unittest.mock.Mock(help=name, plumbing=False)
+
+    def fake_plug_all(group):
+        for name in ("selected", "other"):
+            yield name, functools.partial(load, name)
+
+    _build_argument_parser.cache_clear()
+
+    try:
+        with unittest.mock.patch("jacquard.cli.plug_all", fake_plug_all):
+            main(["selected"], config=unittest.mock.Mock())
+    finally:
+        _build_argument_parser.cache_clear()
+
+    assert loaded == ["selected"]
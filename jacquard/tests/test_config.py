@@ -4,6 +4,7 @@ import tempfile
 import textwrap
 
 from jacquard.config import load_config
+from jacquard.directory.utils import InstrumentedDirectory
 from jacquard.directory.dummy import DummyDirectory
 
 
@@ -49,7 +50,8 @@ def test_config_creates_storage_engine():
 def test_config_creates_directory():
     config = load_test_config()
 
-    assert isinstance(config.directory, DummyDirectory)
+    assert isinstance(config.directory, InstrumentedDirectory)
+    assert isinstance(config.directory.directory, DummyDirectory)
 
 
 def test_config_can_iterate_over_sections():
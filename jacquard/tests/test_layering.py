@@ -18,10 +18,12 @@ DEPENDENCIES = (
     ("buckets", "odm"),
     ("buckets", "storage"),
     ("buckets", "constraints"),
+    ("constraints", "tags"),
     ("cli", "commands"),
     ("cli", "plugin"),
     ("directory", "plugin"),
     ("directory", "commands"),
+    ("directory", "tags"),
     ("experiments", "buckets"),
     ("experiments", "constraints"),
     ("odm", "storage"),
@@ -43,6 +45,8 @@ EXCLUDED_COMPONENTS = (
     "utils_dev",  # Allowed to be included from wherever
     "config",  # Excluded due to necessary cyclical behaviour
     "constants",  # Allowed to be included from anywhere
+    "metrics",  # Allowed to be included from anywhere
+    "tracing",  # Allowed to be included from anywhere
 )
 
 
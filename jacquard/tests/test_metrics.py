@@ -0,0 +1,75 @@
+import pytest
+
+from jacquard.metrics import Counter, Registry, Histogram
+
+
+def test_counter_counts_by_label():
+    counter = Counter(
+        "test_total", "Test counter.", labelnames=("kind",), registry=None
+    )
+
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    counter.inc(kind="b")
+
+    assert counter.value(kind="a") == 3
+    assert counter.value(kind="b") == 1
+    assert counter.value(kind="c") == 0
+
+
+def test_counter_requires_declared_labels():
+    counter = Counter(
+        "test_total", "Test counter.", labelnames=("kind",), registry=None
+    )
+
+    with pytest.raises(ValueError):
+        counter.inc(sort="a")
+
+
+def test_duplicate_metric_names_are_rejected():
+    registry = Registry()
+    Counter("test_total", "Test counter.", registry=registry)
+
+    with pytest.raises(ValueError):
+        Counter("test_total", "Test counter.", registry=registry)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = Histogram(
+        "test_seconds", "Test histogram.", buckets=(0.1, 1), registry=registry
+    )
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_seconds Test histogram.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1.0"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 5.55",
+        "test_seconds_count 3",
+    ]
+
+
+def test_histogram_time_records_an_observation():
+    histogram = Histogram("test_seconds", "Test histogram.", registry=None)
+
+    with histogram.time():
+        pass
+
+    assert histogram.count() == 1
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = Counter(
+        "test_total", "Test counter.", labelnames=("kind",), registry=registry
+    )
+
+    counter.inc(kind='a "quoted"\nvalue')
+
+    assert 'test_total{kind="a \\"quoted\\"\\nvalue"} 1.0' in registry.render()
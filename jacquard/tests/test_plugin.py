@@ -0,0 +1,76 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from jacquard.storage.dummy import DummyStore
+from jacquard.plugin import REGISTRY, PluginRegistry, plug, importlib_metadata
+
+
+def entry_point(name, value):
+    return importlib_metadata.EntryPoint(
+        name=name, value=value, group="jacquard.test_plugins"
+    )
+
+
+ENTRY_POINTS = (
+    entry_point("path", "os:path"),
+    entry_point("json", "json:dumps"),
+)
+
+
+def test_entry_points_are_scanned_once():
+    registry = PluginRegistry()
+
+    with patch(
+        "jacquard.plugin._iter_entry_points", return_value=ENTRY_POINTS
+    ) as iter_entry_points:
+        registry.entry_points("test_plugins")
+        entry_points = registry.entry_points("test_plugins")
+
+    iter_entry_points.assert_called_once_with("jacquard.test_plugins")
+    assert sorted(entry_points) == ["json", "path"]
+
+
+def test_invalidate_rescans_entry_points():
+    registry = PluginRegistry()
+
+    with patch(
+        "jacquard.plugin._iter_entry_points", return_value=ENTRY_POINTS
+    ) as iter_entry_points:
+        registry.entry_points("test_plugins")
+        registry.invalidate()
+        registry.entry_points("test_plugins")
+
+    assert iter_entry_points.call_count == 2
+
+
+def test_config_plugins_override_entry_points():
+    registry = PluginRegistry()
+    config = {"plugins:test_plugins": {"json": "json:loads"}}
+
+    with patch("jacquard.plugin._iter_entry_points", return_value=ENTRY_POINTS):
+        entry_points = registry.entry_points("test_plugins", config=config)
+
+    assert entry_points["json"].value == "json:loads"
+    assert entry_points["path"].value == "os:path"
+
+
+def test_loads_are_timed():
+    registry = PluginRegistry()
+
+    with patch("jacquard.plugin._iter_entry_points", return_value=ENTRY_POINTS):
+        entry_point = registry.entry_points("test_plugins")["json"]
+
+    assert registry.loader("test_plugins", entry_point)() is json.dumps
+    assert ("test_plugins", "json") in registry.load_times
+
+
+def test_plug_loads_installed_plugin():
+    assert plug("storage_engines", "dummy")() is DummyStore
+    assert ("storage_engines", "dummy") in REGISTRY.load_times
+
+
+def test_plug_raises_runtime_error_for_missing_plugin():
+    with pytest.raises(RuntimeError):
+        plug("storage_engines", "does-not-exist")
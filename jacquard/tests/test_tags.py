@@ -0,0 +1,58 @@
+from jacquard.tags import VOCABULARY, TagSet, TagVocabulary, tag_mask
+
+
+def test_vocabulary_assigns_distinct_bits():
+    vocabulary = TagVocabulary()
+
+    assert vocabulary.bit("foo") == 1
+    assert vocabulary.bit("bar") == 2
+    assert vocabulary.bit("foo") == 1
+    assert len(vocabulary) == 2
+
+
+def test_vocabulary_masks_are_unions_of_bits():
+    vocabulary = TagVocabulary()
+
+    assert vocabulary.intern(["foo", "bar", "foo"]) == 3
+    assert vocabulary.mask(["foo", "bar"]) == 3
+    assert vocabulary.mask([]) == 0
+
+
+def test_vocabulary_masks_do_not_intern_tags():
+    vocabulary = TagVocabulary()
+    vocabulary.intern(["foo"])
+
+    assert vocabulary.mask(["foo", "bar", "baz"]) == 1
+    assert len(vocabulary) == 1
+
+
+def test_tag_set_is_a_frozenset():
+    tags = TagSet(["foo", "bar"])
+
+    assert tags == frozenset(["foo", "bar"])
+    assert "foo" in tags
+    assert "baz" not in tags
+
+
+def test_tag_set_mask_matches_other_containers():
+    VOCABULARY.intern(["foo", "bar"])
+
+    assert tag_mask(TagSet(["foo", "bar"])) == tag_mask(("bar", "foo")) != 0
+
+
+def test_tag_sets_do_not_intern_tags():
+    size = len(VOCABULARY)
+
+    tag_mask(TagSet(["test-not-interned"]))
+    tag_mask(("test-not-interned-either",))
+
+    assert len(VOCABULARY) == size
+
+
+def test_tag_set_mask_includes_tags_interned_later():
+    tags = TagSet(["test-interned-later"])
+    assert tag_mask(tags) == 0
+
+    VOCABULARY.intern(["test-interned-later"])
+
+    assert tag_mask(tags) == VOCABULARY.bit("test-interned-later")
@@ -0,0 +1,87 @@
+from jacquard.odm import Session
+from jacquard.buckets import Bucket
+from jacquard.tracing import (
+    TraceHook,
+    CountingHook,
+    span,
+    event,
+    add_hook,
+    remove_hook,
+)
+from jacquard.storage.dummy import DummyStore
+
+
+class RecordingCountingHook(CountingHook):
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+
+    def report(self, name, attributes, duration, counts):
+        self.reports.append((name, attributes, dict(counts)))
+
+
+def test_span_is_shared_no_op_without_hooks():
+    assert span("foo") is span("bar")
+
+
+def test_hooks_receive_spans_and_events():
+    calls = []
+
+    class Hook(TraceHook):
+        def span_started(self, name, attributes):
+            calls.append(("start", name, attributes))
+
+        def span_finished(self, name, attributes, duration):
+            calls.append(("finish", name, attributes))
+
+        def event(self, name, attributes):
+            calls.append(("event", name, attributes))
+
+    hook = Hook()
+    add_hook(hook)
+    try:
+        with span("outer", x=1):
+            event("thing", y=2)
+    finally:
+        remove_hook(hook)
+
+    assert calls == [
+        ("start", "outer", {"x": 1}),
+        ("event", "thing", {"y": 2}),
+        ("finish", "outer", {"x": 1}),
+    ]
+
+
+def test_counting_hook_counts_within_outermost_span():
+    hook = RecordingCountingHook()
+    add_hook(hook)
+    try:
+        event("ignored")
+        with span("request"):
+            event("a")
+            with span("inner"):
+                event("a")
+                event("b")
+    finally:
+        remove_hook(hook)
+
+    assert hook.reports == [("request", {}, {"a": 2, "b": 1, "inner": 1})]
+
+
+def test_storage_and_odm_emit_events():
+    storage = DummyStore("", data={"buckets/1": {"entries": []}})
+
+    hook = RecordingCountingHook()
+    add_hook(hook)
+    try:
+        with span("request"):
+            with storage.transaction(read_only=True) as store:
+                session = Session(store)
+                session.get(Bucket, 1)
+                session.get(Bucket, 1)
+                store.get("buckets/1")
+    finally:
+        remove_hook(hook)
+
+    ((_, _, counts),) = hook.reports
+    assert counts == {"storage.getitem": 2, "storage.get": 1, "odm.load": 1}
@@ -1,8 +1,12 @@
+import datetime
+from unittest.mock import patch
+
 import pytest
+import dateutil.tz
 import hypothesis
 import hypothesis.strategies
 
-from jacquard.utils import check_keys, is_recursive
+from jacquard.utils import LRUCache, check_keys, is_recursive, parse_timestamp
 
 
 def get_error(passed_keys, known_keys):
@@ -89,3 +93,73 @@ def test_deep_recursive_structures_are_detected():
     elements = ["foo", "bar"]
     elements.append({"bazz": {"quux": elements}})
     assert is_recursive(elements)
+
+
+@hypothesis.given(
+    date=hypothesis.strategies.datetimes(
+        timezones=hypothesis.strategies.sampled_from(
+            (
+                datetime.timezone.utc,
+                datetime.timezone(datetime.timedelta(hours=5, minutes=30)),
+                datetime.timezone(-datetime.timedelta(hours=8)),
+                dateutil.tz.tzutc(),
+            )
+        )
+    )
+)
+def test_parse_timestamp_round_trips_canonical_format(date):
+    with patch("dateutil.parser.parse") as dateutil_parse:
+        assert parse_timestamp(str(date)) == date
+
+    dateutil_parse.assert_not_called()
+
+
+@hypothesis.given(date=hypothesis.strategies.datetimes())
+def test_parse_timestamp_keeps_naive_timestamps_naive(date):
+    parsed_date = parse_timestamp(str(date))
+
+    assert parsed_date == date
+    assert parsed_date.tzinfo is None
+
+
+def test_parse_timestamp_accepts_iso_8601_separator():
+    assert parse_timestamp("2017-01-02T03:04:05+00:00") == datetime.datetime(
+        2017, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+    )
+
+
+def test_parse_timestamp_falls_back_to_dateutil_for_other_formats():
+    assert parse_timestamp("2 January 2017 03:04 UTC") == datetime.datetime(
+        2017, 1, 2, 3, 4, tzinfo=datetime.timezone.utc
+    )
+
+
+def test_parse_timestamp_rejects_invalid_dates():
+    with pytest.raises(ValueError):
+        parse_timestamp("2017-13-01 00:00:00+00:00")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    with pytest.raises(KeyError):
+        cache.get("b")
+
+
+def test_lru_cache_clear():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+
+    cache.clear()
+
+    with pytest.raises(KeyError):
+        cache.get("a")
@@ -0,0 +1,161 @@
+"""
+Lightweight tracing hooks.
+
+Hot paths in storage, the ODM, user directories and the HTTP service emit
+spans (timed, nestable operations) and events (instantaneous occurrences)
+through this module. These are passed on to every registered `TraceHook`.
+
+When no hooks are registered, tracing is effectively free: emitting code
+checks `HOOKS` - a plain list - before doing anything else::
+
+    if HOOKS:
+        event("storage.get", key=key)
+
+Hooks may be registered with `add_hook`, or by plugins in the
+`jacquard.trace_hooks` entry point group, which are loaded when the WSGI app
+is built. Plugins are called with the system config and must return a
+`TraceHook`.
+"""
+
+import time
+import logging
+import threading
+import collections
+
+LOGGER = logging.getLogger("jacquard.tracing")
+
+HOOKS = []
+
+
+class TraceHook(object):
+    """
+    Base class for trace hooks.
+
+    Subclasses may override any or all of the methods, which by default do
+    nothing. Hooks are called synchronously on whichever thread the traced
+    code runs, so should be quick and must be thread-safe.
+    """
+
+    def span_started(self, name, attributes):
+        """Handle the start of a span."""
+        pass
+
+    def span_finished(self, name, attributes, duration):
+        """Handle the end of a span, which took `duration` seconds."""
+        pass
+
+    def event(self, name, attributes):
+        """Handle a single event."""
+        pass
+
+
+def add_hook(hook):
+    """Register a trace hook."""
+    HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    """Deregister a previously registered trace hook."""
+    HOOKS.remove(hook)
+
+
+def event(name, **attributes):
+    """Emit an event to all hooks."""
+    for hook in HOOKS:
+        hook.event(name, attributes)
+
+
+class _Span(object):
+    __slots__ = ("name", "attributes", "start_time")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        for hook in HOOKS:
+            hook.span_started(self.name, self.attributes)
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.start_time
+        for hook in HOOKS:
+            hook.span_finished(self.name, self.attributes, duration)
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **attributes):
+    """
+    Context manager for a span.
+
+    If there are no hooks registered, a shared no-op context manager is
+    returned.
+    """
+    if not HOOKS:
+        return _NULL_SPAN
+    return _Span(name, attributes)
+
+
+class CountingHook(TraceHook):
+    """
+    Trace hook which counts everything within outermost spans.
+
+    For each outermost span on a thread - generally one HTTP request - this
+    counts the events and inner spans by name. When the outermost span
+    finishes, the counts are passed to `report`, which by default logs them.
+    """
+
+    def __init__(self):
+        """Construct with no active spans."""
+        self._local = threading.local()
+
+    def span_started(self, name, attributes):
+        """Handle the start of a span."""
+        depth = getattr(self._local, "depth", 0)
+
+        if depth == 0:
+            self._local.counts = collections.Counter()
+        else:
+            self._local.counts[name] += 1
+
+        self._local.depth = depth + 1
+
+    def span_finished(self, name, attributes, duration):
+        """Handle the end of a span."""
+        self._local.depth -= 1
+
+        if self._local.depth == 0:
+            counts = self._local.counts
+            del self._local.counts
+            self.report(name, attributes, duration, counts)
+
+    def event(self, name, attributes):
+        """Handle a single event."""
+        if getattr(self._local, "depth", 0):
+            self._local.counts[name] += 1
+
+    def report(self, name, attributes, duration, counts):
+        """Report the counts from an outermost span."""
+        LOGGER.info(
+            "%s %r took %.3fms: %s",
+            name,
+            attributes,
+            duration * 1000,
+            ", ".join(
+                "{name}={count}".format(name=key, count=value)
+                for key, value in sorted(counts.items())
+            ),
+        )
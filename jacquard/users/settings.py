@@ -1,7 +1,7 @@
 """Per-user settings lookup."""
 
 from jacquard.odm import EMPTY, Session
-from jacquard.buckets import Bucket, user_bucket
+from jacquard.buckets import Bucket, user_bucket, get_num_buckets
 
 
 def get_settings(user_id, storage, directory=None):
@@ -18,10 +18,12 @@ def get_settings(user_id, storage, directory=None):
         session = Session(store)
 
         defaults = store.get("defaults", {})
-        bucket_id = user_bucket(user_id)
+        bucket_id = user_bucket(user_id, get_num_buckets(store))
         bucket = session.get(Bucket, bucket_id, default=EMPTY)
 
-        if bucket.needs_constraints():
+        # The directory is only consulted if the bucket has constraints
+        # which could affect the settings, and the user could be in it.
+        if bucket.needs_constraints() and directory.may_contain(user_id):
             user_entry = directory.lookup(user_id)
         else:
             user_entry = None
@@ -1,7 +1,19 @@
 """General utility functions."""
 
-
+import re
 import difflib
+import datetime
+import threading
+import collections
+
+import dateutil.parser
+
+# Timestamps as written by `str(datetime)`, which is how Jacquard writes all
+# the dates it stores. The `T` separator of strict ISO 8601 is also allowed.
+_CANONICAL_TIMESTAMP = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:\.(\d{6}))?"
+    r"(?:([+-])(\d{2}):(\d{2}))?\Z"
+)
 
 
 def is_recursive(json_structure):
@@ -80,3 +92,94 @@ def check_keys(passed_keys, known_keys, exception=ValueError):
             suggestions=", ".join(close_matches),
         )
     )
+
+
+class LRUCache(object):
+    """
+    Thread-safe cache of bounded size.
+
+    Once full, the least recently used entry is evicted to make room for each
+    new one.
+    """
+
+    def __init__(self, size):
+        """Construct, empty, holding at most `size` entries."""
+        self.size = size
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Number of entries held."""
+        return len(self._values)
+
+    def get(self, key):
+        """Look up an entry, raising KeyError if it is not held."""
+        with self._lock:
+            value = self._values[key]
+            self._values.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Add or replace an entry."""
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._values.clear()
+
+
+def parse_timestamp(string):
+    """
+    Parse a timestamp string into a datetime.
+
+    Timestamps in the canonical format Jacquard itself writes, that of
+    `str(datetime)`, are parsed directly. Anything else - which in practice
+    means user-supplied dates, as from `load-experiment` - falls back to
+    dateutil's much slower general-purpose parser.
+    """
+    match = _CANONICAL_TIMESTAMP.match(string)
+
+    if match is None:
+        return dateutil.parser.parse(string)
+
+    (
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        microsecond,
+        offset_sign,
+        offset_hours,
+        offset_minutes,
+    ) = match.groups()
+
+    if offset_sign is None:
+        tzinfo = None
+    else:
+        offset = datetime.timedelta(
+            hours=int(offset_hours), minutes=int(offset_minutes)
+        )
+
+        if offset_sign == "-":
+            offset = -offset
+
+        tzinfo = datetime.timezone(offset)
+
+    return datetime.datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        int(microsecond or 0),
+        tzinfo=tzinfo,
+    )
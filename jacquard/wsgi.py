@@ -8,6 +8,19 @@ to target, picking up the WSGI application from `app`.
 In this case, the configuration file can be specified through the environment
 variable `JACQUARD_CONFIG`; if left unspecified, the file 'config.cfg' in the
 current working directory is assumed.
+
+Responses below `JACQUARD_COMPRESSION_THRESHOLD` bytes (default 1024) are
+not compressed.
+
+`JACQUARD_WARM_UP` controls warming up storage, caches and the directory:
+`background` (the default) warms up on a separate thread, with `/ready`
+reporting 503 until it is done; `blocking` warms up before the application
+is created; and `off` disables warming up.
+
+Where the application is loaded before forking workers, as with gunicorn's
+`--preload`, the storage engine must be reinitialised in each worker, and
+warming up finished there: for gunicorn, set `post_fork` from this module as
+the `post_fork` server hook.
 """
 
 import os
@@ -15,7 +28,13 @@ import logging
 
 from jacquard.utils import check_keys
 from jacquard.config import load_config
-from jacquard.service import get_wsgi_app
+from jacquard.service import (
+    ResponseCompressor,
+    warm_up,
+    get_wsgi_app,
+    warm_up_after_fork,
+    warm_up_in_background,
+)
 from jacquard.constants import DEFAULT_CONFIG_FILE_PATH
 
 LOG_LEVEL = os.environ.get("JACQUARD_LOG_LEVEL", "info").lower()
@@ -25,6 +44,11 @@ KNOWN_LOG_LEVELS = {
 
 check_keys((LOG_LEVEL,), KNOWN_LOG_LEVELS, RuntimeError)
 
+WARM_UP = os.environ.get("JACQUARD_WARM_UP", "background").lower()
+KNOWN_WARM_UP_MODES = ("background", "blocking", "off")
+
+check_keys((WARM_UP,), KNOWN_WARM_UP_MODES, RuntimeError)
+
 logging.basicConfig(level=KNOWN_LOG_LEVELS[LOG_LEVEL])
 
 wsgi_logger = logging.getLogger("jacquard.wsgi")
@@ -32,4 +56,24 @@ wsgi_logger.warning("Logging warnings in Jacquard")
 wsgi_logger.info("Logging informational messages in Jacquard")
 wsgi_logger.debug("Emitting debug messages from Jacquard")
 
-app = get_wsgi_app(load_config(DEFAULT_CONFIG_FILE_PATH))
+compressor = ResponseCompressor(
+    minimum_size=int(os.environ.get("JACQUARD_COMPRESSION_THRESHOLD", "1024"))
+)
+
+config = load_config(DEFAULT_CONFIG_FILE_PATH)
+
+if WARM_UP == "blocking":
+    warm_up(config)
+
+app = get_wsgi_app(config, compressor=compressor)
+
+if WARM_UP == "background":
+    warm_up_in_background(config)
+
+
+def post_fork(server, worker):
+    """Reinitialise storage and finish warming up in a new gunicorn worker."""
+    config.storage.reinitialise_after_fork()
+
+    if WARM_UP != "off":
+        warm_up_after_fork(config)
@@ -85,8 +85,13 @@ setup(
         'python-dateutil',
         'pyyaml',
         'sqlalchemy',
+        'importlib_metadata; python_version < "3.8"',
     ),
 
+    extras_require={
+        'brotli': ('brotli',),
+    },
+
     setup_requires=(
         'pytest-runner',
     ),
@@ -117,12 +122,16 @@ setup(
             'override = jacquard.users.commands:Override',
             'clear-overrides = jacquard.users.commands:OverrideClear',
             'runserver = jacquard.service.commands:RunServer',
+            'serve = jacquard.service.commands:Serve',
             'launch = jacquard.experiments.commands:Launch',
             'conclude = jacquard.experiments.commands:Conclude',
             'load-experiment = jacquard.experiments.commands:Load',
             'rollout = jacquard.buckets.commands:Rollout',
+            'rebucket = jacquard.buckets.commands:Rebucket',
             'settings-under-experiment = jacquard.experiments.commands:SettingsUnderActiveExperiments',
             'bugpoint = jacquard.commands_dev:Bugpoint',
+            'benchmark-decoding = jacquard.commands_dev:BenchmarkDecoding',
+            'plugin-timings = jacquard.commands_dev:PluginTimings',
         ),
         'jacquard.commands.list': (
             'experiments = jacquard.experiments.commands:ListExperiments',
@@ -144,7 +153,11 @@ setup(
             'experiments-overview = jacquard.service.endpoints:ExperimentsOverview',
             'experiment = jacquard.service.endpoints:ExperimentDetail',
             'experiment-partition = jacquard.service.endpoints:ExperimentPartition',
+            'experiment-partition-stream = jacquard.service.endpoints:ExperimentPartitionStream',
             'defaults = jacquard.service.endpoints:Defaults',
+            'metrics = jacquard.service.endpoints:Metrics',
+            'ready = jacquard.service.endpoints:Ready',
+            'health = jacquard.service.endpoints:Health',
         ),
     },
 )